@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 from abc import ABC
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
 
 import requests
 
+from api_client.http_session import ConnectionStats, create_pooled_session
+from api_client.rate_limiter import RateLimiter, rate_limit_method, shared_rate_limiter
+from api_client.retry_policy import RetryPolicy, outage_wait, shared_retry_policy
 from app.core.log_config import log_config
+from utils.worker_pool import WorkerPool
 
 log_config()
 
@@ -19,9 +26,77 @@ requests.packages.urllib3.disable_warnings(
 
 
 class APIClient(ABC):
-    RETRIES = 2  # Maximum attempts for API requests when failed
-    TIME_TO_WAIT = 3  # Waiting time to resend API request when failed
-    PAUSE_WHEN_EXCEEDING_API_LIMIT = 10
+    PAUSE_WHEN_EXCEEDING_API_LIMIT = 10  # When 'Retry-After' is not given
+    RATE_LIMITED_RETRIES = 5  # Maximum resending after exceeding API limit
+    POOL_CONNECTIONS = 4  # Number of hosts whose connection pools are kept
+    POOL_MAXSIZE = 32  # Keep-alive connections per host shared by threads
+
+    def __init__(
+        self,
+        pool_maxsize: int = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+    ):
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.retry_policy = retry_policy or shared_retry_policy
+        self.pool_maxsize = pool_maxsize or self.POOL_MAXSIZE
+        self.connection_stats = ConnectionStats()
+        self._session: requests.Session = None
+        self._session_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = None
+        self.worker_pool: WorkerPool = None  # set to send through a shared pool
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = create_pooled_session(
+                        self.connection_stats, self.POOL_CONNECTIONS, self.pool_maxsize
+                    )
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor | WorkerPool:
+        if self.worker_pool is not None:
+            return self.worker_pool
+        # a worker for each pooled connection to send requests concurrently
+        if self._executor is None:
+            with self._session_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.pool_maxsize, thread_name_prefix="api-client"
+                    )
+        return self._executor
+
+    def close(self):
+        with self._session_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _request_concurrently(self, func: Callable, keys: Iterable) -> dict:
+        """Call 'func' for each key concurrently and return results by key.
+        Keys which failed or returned None are left out, but an error of a server
+        outage is raised, for the caller to back off and try again later."""
+        futures = {key: self.executor.submit(func, key) for key in dict.fromkeys(keys)}
+        results = {}
+        for key, future in futures.items():
+            try:
+                result = future.result()
+            except requests.RequestException as e:
+                if outage_wait(e, 0) is not None:
+                    for other in futures.values():
+                        other.cancel()
+                    raise
+                logger.warning(f"Failed to request for '{key}': {e}")
+                continue
+            if result is not None:
+                results[key] = result
+        return results
 
     def _http_request(
         self,
@@ -34,8 +109,12 @@ class APIClient(ABC):
         query_params, body_params, headers = self.add_authorization_to_params(
             query, body, header
         )
-        for index in range(self.RETRIES):
+        attempts = RequestAttempts(self, uri)
+        while True:
+            wait = attempts.before_send()
             try:
+                if wait > 0:
+                    time.sleep(wait)
                 r = request(
                     uri,
                     verify=False,
@@ -43,20 +122,26 @@ class APIClient(ABC):
                     json=body_params,
                     headers=headers,
                 )
-                r.raise_for_status()
-                break
-            except requests.HTTPError as e:
-                if index == self.RETRIES - 1:
-                    break
-                code = e.response.status_code
-                if code == 404:  # wrong URI. no need to repeat
-                    break
-                elif code == 429:  # exceeds API limit
-                    time.sleep(self.PAUSE_WHEN_EXCEEDING_API_LIMIT)
-                else:
-                    logger.warning(str(e), exc_info=True)
-                    time.sleep(self.TIME_TO_WAIT)
-        return r
+            except BaseException as e:
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                delay = attempts.failed(e, retryable)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            delay = attempts.received(r)
+            if delay is None:
+                return r
+            time.sleep(delay)
+
+    def _rate_limit_key(self, uri: str) -> str:
+        # limits are applied for each host
+        return urlparse(uri).netloc
+
+    def set_rate_limits(self, uri: str, app_limits: str):
+        """Limit requests to the host of 'uri' before its responses tell the
+        limits, ex) app_limits '500:10,30000:600'"""
+        self.rate_limiter.set_limits(self._rate_limit_key(uri), app_limits)
 
     def add_authorization_to_params(self, query_params, body_params, headers) -> tuple:
         # Add the authorization to params or headers if API requires it
@@ -64,12 +149,75 @@ class APIClient(ABC):
 
     def get_request(self, uri, query=None, body=None, header=None) -> requests.Response:
         return self._http_request(
-            uri, requests.get, query=query, body=body, header=header
+            uri, self.session.get, query=query, body=body, header=header
         )
 
     def post_request(
         self, uri, query=None, body=None, header=None
     ) -> requests.Response:
         return self._http_request(
-            uri, requests.post, query=query, body=body, header=header
+            uri, self.session.post, query=query, body=body, header=header
         )
+
+
+class RequestAttempts:
+    """Rate limiting, retries and circuit breaking of one request of a client.
+
+    Sync and asyncio clients send the request themselves and report each
+    attempt here: they wait 'before_send()' seconds before sending, then call
+    'failed' if sending raised or 'received' with the response. Both record
+    the attempt to the circuit breaker, so a half-open probe is always
+    released, and return the seconds to wait before sending again, or None
+    when the request is over.
+    """
+
+    def __init__(self, client: APIClient, uri: str):
+        self.uri = uri
+        self.rate_limiter = client.rate_limiter
+        self.retry_policy = client.retry_policy
+        self.rate_limited_retries = client.RATE_LIMITED_RETRIES
+        self.default_pause = client.PAUSE_WHEN_EXCEEDING_API_LIMIT
+        self.key, self.method = client._rate_limit_key(uri), rate_limit_method(uri)
+        self.failures = 0
+        self.rate_limited = 0
+
+    def before_send(self) -> float:
+        """Raise CircuitOpenError if requests to the server are being shed"""
+        self.retry_policy.before_request(self.key, self.method)
+        return self.rate_limiter.reserve(self.key, self.method)
+
+    def failed(self, error: BaseException, retryable: bool) -> Optional[float]:
+        """'retryable' if no response was received, like on connection errors"""
+        self.retry_policy.record_failure(self.key)
+        if not retryable:
+            return None
+        self.failures += 1
+        if not self.retry_policy.should_retry(self.key, self.method, self.failures):
+            return None
+        logger.warning(f"{error!r} for url: {self.uri}")
+        return self.retry_policy.backoff(self.failures)
+
+    def received(self, r) -> Optional[float]:
+        if r.status_code >= 500:
+            self.retry_policy.record_failure(self.key)
+        else:
+            self.retry_policy.record_success(self.key)
+        self.rate_limiter.update_from_headers(self.key, self.method, r.headers)
+        if r.status_code < 400 or r.status_code == 404:
+            return None  # 404: wrong URI. no need to repeat
+        if r.status_code == 429:  # exceeds API limit, wait as much as told
+            self.rate_limited += 1
+            if self.rate_limited > self.rate_limited_retries:
+                return None
+            pause = self.rate_limiter.block(
+                self.key, self.method, r.headers, self.default_pause
+            )
+            logger.info(f"Rate limited for {pause}s: {self.method}")
+            return 0.0  # the rate limiter waits until the block is over
+        self.failures += 1
+        if not self.retry_policy.should_retry(
+            self.key, self.method, self.failures, r.status_code
+        ):
+            return None
+        logger.warning(f"{r.status_code} Error for url: {r.url}")
+        return self.retry_policy.backoff(self.failures)
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable, Iterable
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from api_client.api_client import RequestAttempts
+from api_client.retry_policy import outage_wait
+from api_client.riot_api_client import RiotAPIClient
+from api_client.single_flight import AsyncSingleFlight
+from api_client.utils import json_loads
+from api_client.value_object import MatchInfo, SummonerInfo, select_match_fields
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AsyncResponse:
+    """Response read in full, so it can be used after the connection is released"""
+
+    status_code: int
+    headers: CaseInsensitiveDict = field(default_factory=CaseInsensitiveDict)
+    content: bytes = b""
+
+    url: str = ""
+
+    def json(self):
+        return json_loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self.url}", response=self
+            )
+
+
+class AsyncRiotAPIClient:
+    """asyncio version of a RiotAPIClient.
+
+    URIs, authorization and response parsing are taken from the given sync client,
+    while requests are sent from an event loop with at most 'max_concurrency'
+    requests in flight. Sync code calls the coroutines through 'run', which executes
+    them on a background event loop shared by every caller thread. The caches of the
+    sync client are read and written on worker threads, not to block the loop.
+    """
+
+    MAX_CONCURRENCY = 256
+
+    def __init__(self, client: RiotAPIClient, max_concurrency: int = None):
+        self.client = client
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self._session: aiohttp.ClientSession = None
+        self._semaphore: asyncio.Semaphore = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._loop_thread: threading.Thread = None
+        self._loop_lock = threading.Lock()
+        # concurrent requests for the same data share one HTTP call
+        self.single_flight = AsyncSingleFlight()
+
+    ### Sync facade
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="riot-api-loop", daemon=True
+                )
+                self._loop_thread.start()
+        return self._loop
+
+    def run(self, aw: Awaitable):
+        """Run a coroutine on the background event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(aw, self._get_loop()).result()
+
+    def close(self):
+        with self._loop_lock:
+            if self._loop is None:
+                return
+            if self._session is not None:
+                asyncio.run_coroutine_threadsafe(
+                    self._session.close(), self._loop
+                ).result()
+                self._session = None
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+            self._semaphore = None
+
+    @classmethod
+    async def _off_loop(cls, func: Callable, *args):
+        # blocking work, such as the SQLite caches, runs on the default executor
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(func, *args)
+        )
+
+    ### Transport
+    def _get_session(self) -> aiohttp.ClientSession:
+        # must be called inside the event loop
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.max_concurrency,
+                ssl=False,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    @classmethod
+    def _stringify_params(cls, params: dict) -> dict:
+        if not params:
+            return None
+        return {k: str(v) for k, v in params.items() if v is not None}
+
+    async def _send(self, method: str, uri: str, query, body, headers) -> AsyncResponse:
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(
+                method,
+                uri,
+                params=self._stringify_params(query),
+                json=body,
+                headers=headers,
+            ) as r:
+                return AsyncResponse(
+                    r.status,
+                    CaseInsensitiveDict(r.headers),
+                    await r.read(),
+                    str(r.url),
+                )
+
+    async def _http_request(
+        self, method: str, uri: str, query=None, body=None, header=None
+    ) -> AsyncResponse:
+        query_params, body_params, headers = self.client.add_authorization_to_params(
+            query, body, header
+        )
+        attempts = RequestAttempts(self.client, uri)
+        while True:
+            wait = attempts.before_send()
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                r = await self._send(method, uri, query_params, body_params, headers)
+            except BaseException as e:
+                no_response = isinstance(
+                    e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+                )
+                delay = attempts.failed(e, no_response)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+                if no_response:
+                    raise requests.ConnectionError(str(e)) from e
+                if isinstance(e, aiohttp.ClientError):
+                    raise requests.RequestException(str(e)) from e
+                raise
+            delay = attempts.received(r)
+            if delay is None:
+                return r
+            await asyncio.sleep(delay)
+
+    async def get_request(self, uri, query=None, body=None, header=None):
+        return await self._http_request(
+            "GET", uri, query=query, body=body, header=header
+        )
+
+    async def post_request(self, uri, query=None, body=None, header=None):
+        return await self._http_request(
+            "POST", uri, query=query, body=body, header=header
+        )
+
+    async def _request_concurrently(self, func: Callable, keys: Iterable) -> dict:
+        keys = list(dict.fromkeys(keys))
+        results = await asyncio.gather(
+            *[func(key) for key in keys], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception) and outage_wait(result, 0) is not None:
+                raise result  # for the caller to back off, as the sync client
+        succeeded = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to request for '{key}': {result}")
+            elif result is not None:
+                succeeded[key] = result
+        return succeeded
+
+    ### Wrapper methods, same as RiotAPIClient
+    async def get_puuids_by_summoner_ids(self, summoner_ids: Iterable[str]) -> dict:
+        return await self._request_concurrently(
+            self.get_puuid_by_summoner_id, summoner_ids
+        )
+
+    async def get_summoners_by_puuids(
+        self, puuids: Iterable[str], update_criteria: float = -1
+    ) -> dict[str, SummonerInfo]:
+        return await self._request_concurrently(
+            lambda puuid: self.get_summoner_info_by_puuid(puuid, update_criteria),
+            puuids,
+        )
+
+    async def get_matches_data(self, match_ids: Iterable[str]) -> dict[str, MatchInfo]:
+        return await self._request_concurrently(self.get_match_data, match_ids)
+
+    async def get_recent_game_list(
+        self,
+        puuid: str,
+        count: int = None,
+        skip: int = None,
+        start_timestamp: int = None,
+        end_timestamp: int = None,
+    ):
+        uri, params = self.client._recent_game_list_request(
+            puuid, count, skip, start_timestamp, end_timestamp
+        )
+        response = await self.get_request(uri, query=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_summoner_data_by_puuid(
+        self, puuid: str, update_criteria: float = -1
+    ) -> dict:
+        uri = self.client._api_get_summoner_data_by_puuid(puuid)
+        response = await self.get_request(uri)
+        if response.status_code == 200:
+            data = response.json()
+            if not self.client._is_summoner_data_outdated(data, update_criteria):
+                return data
+        response = await self.post_request(uri)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_summoner_info_by_puuid(
+        self, puuid: str, update_criteria: float = -1
+    ) -> SummonerInfo:
+        return await self.single_flight.do(
+            (self.client.SUMMONER, puuid, update_criteria),
+            lambda: self._fetch_summoner_info(puuid, update_criteria),
+        )
+
+    async def _fetch_summoner_info(
+        self, puuid: str, update_criteria: float
+    ) -> SummonerInfo:
+        summoner_info = await self._off_loop(
+            self.client._get_cached_summoner, puuid, update_criteria
+        )
+        if summoner_info is None:
+            summoner_info = self.client._convert_json_to_summoner_info(
+                await self.get_summoner_data_by_puuid(puuid, update_criteria)
+            )
+            await self._off_loop(self.client.cache_summoner, summoner_info)
+        return summoner_info
+
+    async def get_puuid_by_summoner_id(self, summoner_id: str) -> str:
+        uri = self.client._api_get_a_summoner_by_summoner_id(summoner_id)
+        try:
+            return (await self.get_request(uri)).json()["puuid"]
+        except Exception as e:
+            logger.warning(e, exc_info=True)
+            return None
+
+    async def get_match_data(self, match_id: str) -> MatchInfo:
+        match_id = self.client._validate_match_id(match_id)
+        match_json = await self.single_flight.do(
+            (self.client.MATCH, match_id), lambda: self._fetch_match_json(match_id)
+        )
+        return self.client._convert_json_to_match_info(match_json)
+
+    async def _fetch_match_json(self, match_id: str) -> dict:
+        match_json = await self._off_loop(
+            self.client._get_cached_match, self.client.MATCH, match_id
+        )
+        if match_json is not None:
+            return select_match_fields(match_json)
+        uri = self.client._api_get_a_match_by_match_id(match_id)
+        try:
+            match_json = select_match_fields(
+                json_loads((await self.get_request(uri)).content)["info"]
+            )
+        except Exception as e:
+            logger.info(f"Error on getting '{uri}'")
+            logger.info(e, exc_info=True)
+            raise requests.HTTPError()
+        await self._off_loop(
+            self.client._cache_match, self.client.MATCH, match_id, match_json
+        )
+        return match_json
+
+    async def get_summoners_in_tier(self, tier, division, page: int = 1) -> list:
+        uri = self.client._api_get_league_page(tier, division, page)
+
+        async def fetch_entries():
+            return self.client._convert_json_to_league_entries(
+                tier, (await self.get_request(uri)).json()
+            )
+
+        entries = await self.single_flight.do((self.client.LEAGUE, uri), fetch_entries)
+        return list(entries)
@@ -1,14 +1,27 @@
 from __future__ import annotations
 import os
 
+from api_client.rate_limiter import RateLimiter
+from api_client.retry_policy import RetryPolicy
 from api_client.riot_api_client import RiotAPIClient
 
 
 class DirectRiotAPIClient(RiotAPIClient):
-    def __init__(self, platform: str, api_key: str = None):
-        super().__init__(platform)
+    def __init__(
+        self,
+        platform: str,
+        api_key: str = None,
+        pool_maxsize: int = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+    ):
+        super().__init__(platform, pool_maxsize, rate_limiter, retry_policy)
         self.API_KEY = api_key or os.getenv("RIOT_API_KEY")
 
+    def _rate_limit_key(self, uri: str) -> str:
+        # Riot applies limits for each API key in each routing value
+        return f"{self.API_KEY}@{super()._rate_limit_key(uri)}"
+
     def add_authorization_to_params(self, query_params, body_params, headers) -> tuple:
         api_key = {"X-Riot-Token": self.API_KEY}
         if headers:
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ConnectionStats:
+    """Thread-safe counters of connections opened and requests sent by a session"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def record_opened(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def reused(self) -> int:
+        # every request which did not open a new connection used a pooled one
+        return max(self.requests - self.opened, 0)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": max(self.requests - self.opened, 0),
+                "requests": self.requests,
+            }
+
+
+def _counting_pool_class(pool_class, stats: ConnectionStats):
+    class CountingConnectionPool(pool_class):
+        def _new_conn(self):
+            stats.record_opened()
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter keeping 'pool_maxsize' keep-alive connections per host
+    and counting how many of them are opened"""
+
+    def __init__(self, stats: ConnectionStats, *args, **kwargs):
+        self.stats = stats
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_class, self.stats)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.stats.record_request()
+        return super().send(request, *args, **kwargs)
+
+
+def create_pooled_session(
+    stats: ConnectionStats, pool_connections: int, pool_maxsize: int
+) -> requests.Session:
+    """Create a session sharing keep-alive connections between threads.
+
+    pool_connections: the number of hosts whose pools are cached
+    pool_maxsize: the number of connections kept alive per host
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(
+        stats,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,  # wait for an idle connection instead of opening extra
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
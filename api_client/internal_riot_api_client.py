@@ -1,5 +1,7 @@
 import logging
 
+from api_client.rate_limiter import RateLimiter
+from api_client.retry_policy import RetryPolicy
 from api_client.riot_api_client import RiotAPIClient
 from api_client.utils import utc_time_to_timestamp
 from api_client.value_object import SummonerInfo
@@ -10,8 +12,14 @@ logger = logging.getLogger(__name__)
 
 
 class InternalRiotAPIClient(RiotAPIClient):
-    def __init__(self, platform: str):
-        super().__init__(platform)
+    def __init__(
+        self,
+        platform: str,
+        pool_maxsize: int = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+    ):
+        super().__init__(platform, pool_maxsize, rate_limiter, retry_policy)
         self._set_server_address(self._platform)
 
     @RiotAPIClient.platform.setter
@@ -84,6 +92,21 @@ class InternalRiotAPIClient(RiotAPIClient):
         start_timestamp: int = None,
         end_timestamp: int = None,
     ) -> list[str]:
+        uri, params = self._recent_game_list_request(
+            puuid, count, skip, start_timestamp, end_timestamp
+        )
+        response = self.get_request(uri, query=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _recent_game_list_request(
+        self,
+        puuid: str,
+        count: int = None,
+        skip: int = None,
+        start_timestamp: int = None,
+        end_timestamp: int = None,
+    ) -> tuple[str, dict]:
         uri = f"{self.APPLICATION_SERVER}/summoners/{puuid}/match-ids"
         # uri = f"{self.GATEWAY_SERVER}/match/v5/matches/by-puuid/{puuid}/ids"
         SOLO_RANK_ID = 420
@@ -96,7 +119,7 @@ class InternalRiotAPIClient(RiotAPIClient):
             params["startTime"] = start_timestamp
         if end_timestamp is not None:
             params["endTime"] = end_timestamp
-        return self.get_request(uri, query=params).json()
+        return uri, params
 
     def get_summoner_data_by_puuid(
         self, puuid: str, update_criteria: float = -1
@@ -126,26 +149,47 @@ class InternalRiotAPIClient(RiotAPIClient):
         # data = response.json()
         # return data
 
-        uri = f"{self.APPLICATION_SERVER}/summoners/{puuid}"
+        uri = self._api_get_summoner_data_by_puuid(puuid)
         get_request = self.get_request(uri)
         if get_request.status_code == 200:
             data = get_request.json()
-            ranks = data.get("ranks", [])
-            if len(ranks) == 0:  # rank info has not been searched
-                return self.post_request(uri).json()
-            if update_criteria < 0:
+            if not self._is_summoner_data_outdated(data, update_criteria):
                 return data
-            solo_rank_info = self._filter_rank_info(ranks)
-            if solo_rank_info:
-                written_time = solo_rank_info.get("writtenTime", 0)
-                written_timestamp = utc_time_to_timestamp(written_time)
-                if written_timestamp >= update_criteria:
-                    return data
-        return self.post_request(uri).json()
+        response = self.post_request(uri)
+        response.raise_for_status()
+        return response.json()
+
+    def _api_get_summoner_data_by_puuid(self, puuid: str) -> str:
+        return f"{self.APPLICATION_SERVER}/summoners/{puuid}"
+
+    @classmethod
+    def _is_summoner_data_outdated(cls, data: dict, update_criteria: float) -> bool:
+        ranks = data.get("ranks", [])
+        if len(ranks) == 0:  # rank info has not been searched
+            return True
+        if update_criteria < 0:
+            return False
+        solo_rank_info = cls._filter_rank_info(ranks)
+        if solo_rank_info:
+            written_time = solo_rank_info.get("writtenTime", 0)
+            written_timestamp = utc_time_to_timestamp(written_time)
+            if written_timestamp >= update_criteria:
+                return False
+        return True
 
     def get_summoner_info_by_puuid(
         self, puuid: str, update_criteria: float = -1
     ) -> SummonerInfo:
-        return self._convert_json_to_summoner_info(
-            self.get_summoner_data_by_puuid(puuid, update_criteria)
+        return self.single_flight.do(
+            (self.SUMMONER, puuid, update_criteria),
+            lambda: self._fetch_summoner_info(puuid, update_criteria),
         )
+
+    def _fetch_summoner_info(self, puuid: str, update_criteria: float) -> SummonerInfo:
+        summoner_info = self._get_cached_summoner(puuid, update_criteria)
+        if summoner_info is None:
+            summoner_info = self._convert_json_to_summoner_info(
+                self.get_summoner_data_by_puuid(puuid, update_criteria)
+            )
+            self.cache_summoner(summoner_info)
+        return summoner_info
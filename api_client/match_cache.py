@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class MatchCache:
+    """Persistent cache of match data, which never changes once a match ends.
+
+    Compressed JSON is kept in a SQLite file by (kind, match ID), where kind is
+    'match' or 'timeline'. When the cache grows over 'max_bytes', the least
+    recently used entries are evicted down to EVICT_RATIO of it. The access
+    times of hits are written in groups of 'MAX_PENDING', before evicting and
+    on 'close', so a hit does not write to the file.
+    """
+
+    EVICT_RATIO = 0.9
+    MAX_PENDING = 256  # access times buffered before written
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection = None
+        self._pending: dict[tuple[str, str], float] = {}  # key: (kind, match ID)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # opened on first use, must be called with the lock
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS match_cache (
+                    kind TEXT NOT NULL,
+                    match_id TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (kind, match_id)
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS match_cache_accessed "
+                "ON match_cache (accessed)"
+            )
+            self._conn.commit()
+            self.size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM match_cache"
+            ).fetchone()[0]
+        return self._conn
+
+    def get(self, kind: str, match_id: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM match_cache WHERE kind = ? AND match_id = ?",
+                (kind, match_id),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._pending[(kind, match_id)] = time.time()
+            if len(self._pending) >= self.MAX_PENDING:
+                self._flush()
+                self.conn.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, kind: str, match_id: str, data):
+        blob = zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+        with self._lock:
+            old = self.conn.execute(
+                "SELECT size FROM match_cache WHERE kind = ? AND match_id = ?",
+                (kind, match_id),
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO match_cache VALUES (?, ?, ?, ?, ?)",
+                (kind, match_id, blob, len(blob), time.time()),
+            )
+            self._pending.pop((kind, match_id), None)
+            self.size += len(blob) - (old[0] if old else 0)
+            if self.size > self.max_bytes:
+                self._flush()
+                self._evict(int(self.max_bytes * self.EVICT_RATIO))
+            self.conn.commit()
+
+    def _flush(self):
+        # write the access times of hits, must be called with the lock
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "UPDATE match_cache SET accessed = ? WHERE kind = ? AND match_id = ?",
+            [(accessed, *key) for key, accessed in self._pending.items()],
+        )
+        self._pending.clear()
+
+    def _evict(self, target_bytes: int):
+        EVICT_BATCH = 256
+        while self.size > target_bytes:
+            rows = self.conn.execute(
+                "SELECT rowid, size FROM match_cache ORDER BY accessed LIMIT ?",
+                (EVICT_BATCH,),
+            ).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for rowid, size in rows:
+                evicted.append((rowid,))
+                self.size -= size
+                if self.size <= target_bytes:
+                    break
+            self.conn.executemany("DELETE FROM match_cache WHERE rowid = ?", evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM match_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush()
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from enum import Enum, auto
+
+TIERS = (
+    "IRON",
+    "BRONZE",
+    "SILVER",
+    "GOLD",
+    "PLATINUM",
+    "DIAMOND",
+    "MASTER",
+    "GRANDMASTER",
+    "CHALLENGER",
+)
+DIVISIONS = ("I", "II", "III", "IV")
+MAX_RANK_NUMBER = 27  # Challenger
+
+TIER_OFFSETS = {
+    "IRON": 4 * 1,
+    "BRONZE": 4 * 2,
+    "SILVER": 4 * 3,
+    "GOLD": 4 * 4,
+    "PLATINUM": 4 * 5,
+    "DIAMOND": 4 * 6,
+    "MASTER": 4 * 6 + 1,
+    "GRANDMASTER": 4 * 6 + 2,
+    "CHALLENGER": 4 * 6 + 3,
+}
+DIVISION_OFFSETS = {"I": 0, "II": -1, "III": -2, "IV": -3}
+# tier -> division -> rank number of every valid rank, and unranked
+RANK_NUMBERS = {
+    tier: {
+        division: TIER_OFFSETS[tier] + DIVISION_OFFSETS[division]
+        for division in DIVISIONS
+    }
+    for tier in TIERS
+}
+RANK_NUMBERS[""] = {"": 0}
+
+
+def rank_to_number(tier: str, division: str, strict: bool = False) -> int:
+    """Rank number from 1 (Iron 4) to 27 (Challenger), 0 for unranked.
+
+    An unknown tier or division counts as 0 unless 'strict', which raises
+    ValueError for it instead.
+    """
+    divisions = RANK_NUMBERS.get(tier)
+    if divisions is not None:
+        rank_number = divisions.get(division)
+        if rank_number is not None:
+            return rank_number
+    if strict:
+        if division not in DIVISION_OFFSETS:
+            raise ValueError(f"Division is not valid: {division}")
+        raise ValueError(f"Tier is not valid: {tier}")
+    return TIER_OFFSETS.get(tier, 0) + DIVISION_OFFSETS.get(division, 0)
+
+
+class TierGroup(Enum):
+    I34 = auto()  # Iron 4 ~ 3
+    I12 = auto()  # Iron 2 ~ 1
+    B34 = auto()  # Bronze 4 ~ 3
+    B12 = auto()  # Broneze 2 ~ 1
+    S34 = auto()  # Silver 4 ~ 3
+    S12 = auto()  # Silver 2 ~ 1
+    G34 = auto()  # Gold 4 ~ 3
+    G12 = auto()  # Gold 2 ~ 1
+    P34 = auto()  # Platinum 4 ~ 3
+    P12 = auto()  # Platinum 2 ~ 1
+    D34 = auto()  # Diamond 4 ~ 3
+    D12 = auto()  # Diamond 2 ~ 1
+    M1 = auto()  # Master
+    GM1 = auto()  # Grandmaster
+    C1 = auto()  # Challenger
+    A = auto()  # Apex = Challenger + Grandmaster
+    U = auto()  # Unranked
+
+    @classmethod
+    def get_from_rank(cls, tier: str, division: str) -> TierGroup:
+        return cls.get_from_rank_number(rank_to_number(tier, division))
+
+    @classmethod
+    def get_from_rank_number(cls, rank_number: int) -> TierGroup:
+        if 0 <= rank_number <= MAX_RANK_NUMBER:
+            return TIER_GROUPS_BY_RANK_NUMBER[rank_number]
+        return cls.U
+
+    def is_adjacent_rank(self, rank_number: int) -> bool:
+        mask = ADJACENT_RANK_MASKS[self._value_]
+        return rank_number >= 0 and mask >> rank_number & 1 == 1
+
+
+# rank number -> tier group, two divisions for each group below Master
+TIER_GROUPS_BY_RANK_NUMBER = (
+    (TierGroup.U,)
+    + tuple(
+        group
+        for group in (
+            TierGroup.I34,
+            TierGroup.I12,
+            TierGroup.B34,
+            TierGroup.B12,
+            TierGroup.S34,
+            TierGroup.S12,
+            TierGroup.G34,
+            TierGroup.G12,
+            TierGroup.P34,
+            TierGroup.P12,
+            TierGroup.D34,
+            TierGroup.D12,
+        )
+        for _ in range(2)
+    )
+    + (TierGroup.M1, TierGroup.GM1, TierGroup.C1)
+)
+
+# ranks of participants allowed in a match of each tier group
+ADJACENT_RANKS = {
+    TierGroup.I34: range(1, 4),
+    TierGroup.I12: range(2, 6),
+    TierGroup.B34: range(4, 8),
+    TierGroup.B12: range(6, 10),
+    TierGroup.S34: range(8, 12),
+    TierGroup.S12: range(10, 14),
+    TierGroup.G34: range(12, 16),
+    TierGroup.G12: range(14, 18),
+    TierGroup.P34: range(16, 20),
+    TierGroup.P12: range(18, 22),
+    TierGroup.D34: range(20, 24),
+    TierGroup.D12: range(22, 26),
+    TierGroup.M1: range(24, 28),
+    TierGroup.GM1: range(25, 28),
+    TierGroup.C1: range(25, 28),
+}
+# by value of tier group: bit 'rank_number' is set when the rank is adjacent
+ADJACENT_RANK_MASKS = [0] * (len(TierGroup) + 1)
+for _group, _ranks in ADJACENT_RANKS.items():
+    ADJACENT_RANK_MASKS[_group.value] = sum(1 << r for r in _ranks)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Callable
+from urllib.parse import urlparse
+
+# a path segment which is a fixed part of the endpoint, not an ID or a name
+_FIXED_SEGMENT = re.compile(r"^[a-z0-9-]{1,24}$")
+
+
+def rate_limit_method(uri: str) -> str:
+    """Get the method bucket of a URI by replacing its variable path segments,
+    such as puuids, match IDs, tiers and divisions, with '{}'.
+
+    ex) /lol/match/v5/matches/KR_5889814856 -> /lol/match/v5/matches/{}
+    """
+    path = urlparse(uri).path
+    return "/".join(
+        s if not s or (_FIXED_SEGMENT.match(s) and not s.isdigit()) else "{}"
+        for s in path.split("/")
+    )
+
+
+def parse_rate_limits(header_value: str) -> list[tuple[int, int]]:
+    """Parse Riot's rate limit header like '20:1,100:120' into (count, seconds) pairs"""
+    limits = []
+    if not header_value:
+        return limits
+    for pair in header_value.split(","):
+        count, seconds = pair.strip().split(":")
+        limits.append((int(count), int(seconds)))
+    return limits
+
+
+class TokenBucket:
+    """Token bucket allowing 'capacity' requests per 'period' seconds.
+    Tokens are reserved in advance, so the returned waiting time keeps
+    concurrent callers in order instead of letting them race for a token.
+    """
+
+    def __init__(self, capacity: int, period: float, now: float):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def _refill(self, now: float):
+        elapsed = max(now - self.updated, 0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
+
+    def sync_count(self, used: int, now: float):
+        # the server counted 'used' requests in the current window
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """Token-bucket limiter shared by API clients.
+
+    Buckets are kept for each key (an API key and host) as the application limit,
+    and for each (key, method) as the method limit. Limits are learned from
+    'X-App-Rate-Limit' and 'X-Method-Rate-Limit' response headers, or set with
+    'set_limits', and every request waits for a token of all of its buckets.
+    """
+
+    APP_LIMIT_HEADER = "X-App-Rate-Limit"
+    APP_COUNT_HEADER = "X-App-Rate-Limit-Count"
+    METHOD_LIMIT_HEADER = "X-Method-Rate-Limit"
+    METHOD_COUNT_HEADER = "X-Method-Rate-Limit-Count"
+    LIMIT_TYPE_HEADER = "X-Rate-Limit-Type"
+    RETRY_AFTER_HEADER = "Retry-After"
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._limits: dict[tuple, list[tuple[int, int]]] = {}
+        self._buckets: dict[tuple, list[TokenBucket]] = {}
+        self._blocked_until: dict[tuple, float] = {}
+
+    def _set_buckets(self, bucket_key: tuple, limits: list[tuple[int, int]]):
+        if self._limits.get(bucket_key) == limits:
+            return
+        now = self.clock()
+        self._limits[bucket_key] = limits
+        self._buckets[bucket_key] = [
+            TokenBucket(count, seconds, now) for count, seconds in limits
+        ]
+
+    def set_limits(self, key: str, app_limits: str = None, method_limits: dict = None):
+        """Set limits in advance, in the header format
+
+        app_limits: ex) '20:1,100:120'
+        method_limits: method -> limits, ex) {'/lol/match/v5/matches/{}': '2000:10'}
+        """
+        with self._lock:
+            if app_limits:
+                self._set_buckets((key,), parse_rate_limits(app_limits))
+            for method, limits in (method_limits or {}).items():
+                self._set_buckets((key, method), parse_rate_limits(limits))
+
+    def reserve(self, key: str, method: str) -> float:
+        """Take a token from every bucket of the request and
+        return the seconds to wait before sending it"""
+        with self._lock:
+            now = self.clock()
+            wait = 0
+            for bucket_key in ((key,), (key, method)):
+                for bucket in self._buckets.get(bucket_key, []):
+                    wait = max(wait, bucket.reserve(now))
+                blocked_until = self._blocked_until.get(bucket_key, 0)
+                wait = max(wait, blocked_until - now)
+            return wait
+
+    def acquire(self, key: str, method: str):
+        wait = self.reserve(key, method)
+        if wait > 0:
+            time.sleep(wait)
+
+    def update_from_headers(self, key: str, method: str, headers):
+        app_limits = parse_rate_limits(headers.get(self.APP_LIMIT_HEADER))
+        method_limits = parse_rate_limits(headers.get(self.METHOD_LIMIT_HEADER))
+        if not app_limits and not method_limits:
+            return
+        with self._lock:
+            now = self.clock()
+            for bucket_key, limits, count_header in (
+                ((key,), app_limits, self.APP_COUNT_HEADER),
+                ((key, method), method_limits, self.METHOD_COUNT_HEADER),
+            ):
+                if not limits:
+                    continue
+                self._set_buckets(bucket_key, limits)
+                counts = dict(
+                    (seconds, count)
+                    for count, seconds in parse_rate_limits(headers.get(count_header))
+                )
+                for bucket in self._buckets[bucket_key]:
+                    if bucket.period in counts:
+                        bucket.sync_count(counts[bucket.period], now)
+
+    def block(self, key: str, method: str, headers, default_pause: float) -> float:
+        """Stop the bucket which was exceeded until 'Retry-After' seconds passed.
+        Return the seconds it is blocked."""
+        try:
+            pause = float(headers.get(self.RETRY_AFTER_HEADER))
+        except (TypeError, ValueError):
+            pause = default_pause
+        limit_type = headers.get(self.LIMIT_TYPE_HEADER, "").lower()
+        bucket_key = (key, method) if limit_type == "method" else (key,)
+        with self._lock:
+            blocked_until = self.clock() + pause
+            if blocked_until > self._blocked_until.get(bucket_key, 0):
+                self._blocked_until[bucket_key] = blocked_until
+        return pause
+
+
+# shared by every client in a process, so threads using the same key are paced together
+shared_rate_limiter = RateLimiter()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without sending a request while the server is considered unhealthy"""
+
+    def __init__(self, *args, retry_after: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after  # seconds until a probe is let through
+
+
+def outage_wait(error: BaseException, pause: float) -> Optional[float]:
+    """Seconds to wait, 'pause' at least, if the error is of an outage of the
+    server, or None if it is of the request"""
+    if isinstance(error, CircuitOpenError):
+        return max(pause, error.retry_after)
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return pause
+    response = getattr(error, "response", None)
+    if isinstance(error, requests.HTTPError) and response is not None:
+        if response.status_code >= 500 or response.status_code == 429:
+            return pause
+    return None
+
+
+class CircuitBreaker:
+    """Stop sending requests to a server after consecutive failures.
+
+    After 'failure_threshold' consecutive failures the circuit opens and requests
+    are refused for 'recovery_time' seconds. Then a single probe request is let
+    through (half-open), which closes the circuit on success or opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_time: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.recovery_time:
+                return False
+            self.state = self.HALF_OPEN
+        if self._probing:  # only one probe at a time
+            return False
+        self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_time - self.clock())
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+        self._probing = False
+
+
+class RetryBudget:
+    """Allow retries of at most 'ratio' of the requests, plus 'min_retries'
+    to start with, so that retries can not multiply the load during outages"""
+
+    def __init__(self, ratio: float, min_retries: int):
+        self.ratio = ratio
+        self.max_tokens = float(min_retries)
+        self.tokens = float(min_retries)
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RetryPolicy:
+    """Decide whether and when a failed request is sent again.
+
+    - waiting time grows exponentially from 'base_delay' with full jitter
+    - each endpoint (method) has its own retry budget
+    - each server (key) has a circuit breaker shedding requests while it fails
+    """
+
+    RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+        budget_ratio: float = 0.2,
+        min_budget: int = 10,
+        failure_threshold: int = 10,
+        recovery_time: float = 15,
+        clock: Callable[[], float] = time.monotonic,
+        random: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.clock = clock
+        self.random = random
+        self._lock = threading.Lock()
+        self._budgets: dict[str, RetryBudget] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def _budget(self, method: str) -> RetryBudget:
+        if method not in self._budgets:
+            self._budgets[method] = RetryBudget(self.budget_ratio, self.min_budget)
+        return self._budgets[method]
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(
+                self.failure_threshold, self.recovery_time, self.clock
+            )
+        return self._breakers[key]
+
+    def circuit_state(self, key: str) -> str:
+        with self._lock:
+            return self._breaker(key).state
+
+    def before_request(self, key: str, method: str):
+        """Raise CircuitOpenError if requests to the server are being shed"""
+        with self._lock:
+            breaker = self._breaker(key)
+            if not breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Circuit is open for '{key}': {method}",
+                    retry_after=breaker.retry_after(),
+                )
+            self._budget(method).deposit()
+
+    def record_success(self, key: str):
+        with self._lock:
+            self._breaker(key).record_success()
+
+    def record_failure(self, key: str):
+        with self._lock:
+            self._breaker(key).record_failure()
+
+    def is_retryable(self, status_code: int = None) -> bool:
+        # status_code is None when no response was received
+        return status_code is None or status_code in self.RETRYABLE_STATUS
+
+    def should_retry(self, key: str, method: str, attempt: int, status_code=None):
+        """attempt: the number of requests sent so far"""
+        if attempt >= self.max_attempts or not self.is_retryable(status_code):
+            return False
+        with self._lock:
+            if self._breaker(key).state != CircuitBreaker.CLOSED:
+                return False
+            return self._budget(method).withdraw()
+
+    def backoff(self, attempt: int) -> float:
+        """Waiting time before sending the request again, from 0 to the exponential cap"""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return cap * self.random()
+
+
+# shared by every client in a process, so that the state of servers is shared
+shared_retry_policy = RetryPolicy()
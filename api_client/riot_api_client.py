@@ -2,11 +2,18 @@ from __future__ import annotations
 
 import logging
 from abc import abstractmethod
+from typing import Iterable
 
 import requests
 
 from api_client.api_client import APIClient
-from api_client.value_object import MatchInfo, SummonerInfo
+from api_client.match_cache import MatchCache
+from api_client.rate_limiter import RateLimiter
+from api_client.retry_policy import RetryPolicy
+from api_client.single_flight import SingleFlight
+from api_client.summoner_cache import SummonerCache
+from api_client.utils import json_loads
+from api_client.value_object import MatchInfo, SummonerInfo, select_match_fields
 
 logger = logging.getLogger(__name__)
 
@@ -30,10 +37,27 @@ class RiotAPIClient(APIClient):
         "OC1": "SEA",
     }
     SOLO_RANK_QUEUE = "RANKED_SOLO_5x5"
-
-    def __init__(self, platform: str):
+    # kinds of data in the match cache
+    MATCH = "match"
+    TIMELINE = "timeline"
+    # kinds of requests coalesced by single flight, with MATCH
+    SUMMONER = "summoner"
+    LEAGUE = "league"
+
+    def __init__(
+        self,
+        platform: str,
+        pool_maxsize: int = None,
+        rate_limiter: RateLimiter = None,
+        retry_policy: RetryPolicy = None,
+    ):
+        super().__init__(pool_maxsize, rate_limiter, retry_policy)
         self._platform = self._validate_platform(platform)
         self.region = self.PLATFORM_REGION_MAP[self._platform]
+        self.match_cache: MatchCache = None  # set to fetch each match only once
+        self.summoner_cache: SummonerCache = None  # set to share summoner lookups
+        # concurrent requests for the same data share one HTTP call
+        self.single_flight = SingleFlight()
 
     @property
     def platform(self) -> str:
@@ -82,6 +106,17 @@ class RiotAPIClient(APIClient):
     ):
         pass
 
+    def _recent_game_list_request(
+        self,
+        puuid: str,
+        count: int = None,
+        skip: int = None,
+        start_timestamp: int = None,
+        end_timestamp: int = None,
+    ) -> tuple[str, dict]:
+        # URI and query params for 'get_recent_game_list'
+        raise NotImplementedError
+
     def get_summoner_info_by_puuid(
         cls, puuid: str, update_criteria: float = -1
     ) -> SummonerInfo:
@@ -90,6 +125,18 @@ class RiotAPIClient(APIClient):
         update and get it"""
         raise NotImplementedError
 
+    def _api_get_summoner_data_by_puuid(self, puuid: str) -> str:
+        # URI for 'get_summoner_info_by_puuid', GET to read and POST to update
+        raise NotImplementedError
+
+    @classmethod
+    def _is_summoner_data_outdated(cls, data: dict, update_criteria: float) -> bool:
+        raise NotImplementedError
+
+    @classmethod
+    def _convert_json_to_summoner_info(cls, json_data: dict) -> SummonerInfo:
+        raise NotImplementedError
+
     def get_puuid_by_summoner_id(self, summoner_id: str) -> str:
         uri = self._api_get_a_summoner_by_summoner_id(summoner_id)
         try:
@@ -98,15 +145,72 @@ class RiotAPIClient(APIClient):
             logger.warning(e, exc_info=True)
             return None
 
+    ### Bulk methods
+    # There is no batch route for summoners in Riot API or the GGQ gateway,
+    # so each summoner is requested concurrently through the connection pool.
+    def get_puuids_by_summoner_ids(self, summoner_ids: Iterable[str]) -> dict:
+        """Get puuids by summoner ID, leaving out the summoners failed to get"""
+        return self._request_concurrently(self.get_puuid_by_summoner_id, summoner_ids)
+
+    def get_summoners_by_puuids(
+        self, puuids: Iterable[str], update_criteria: float = -1
+    ) -> dict[str, SummonerInfo]:
+        """Get summoner information by puuid, leaving out the summoners failed to get"""
+        return self._request_concurrently(
+            lambda puuid: self.get_summoner_info_by_puuid(puuid, update_criteria),
+            puuids,
+        )
+
+    def get_matches_data(self, match_ids: Iterable[str]) -> dict[str, MatchInfo]:
+        """Get match data by match ID, leaving out the matches failed to get"""
+        return self._request_concurrently(self.get_match_data, match_ids)
+
     def get_match_data(self, match_id: str) -> MatchInfo:
         match_id = self._validate_match_id(match_id)
+        match_json = self.single_flight.do(
+            (self.MATCH, match_id), lambda: self._fetch_match_json(match_id)
+        )
+        return self._convert_json_to_match_info(match_json)
+
+    def _fetch_match_json(self, match_id: str) -> dict:
+        match_json = self._get_cached_match(self.MATCH, match_id)
+        if match_json is not None:
+            # matches cached before fields were selected have every field
+            return select_match_fields(match_json)
         uri = self._api_get_a_match_by_match_id(match_id)
         try:
-            match_json = self.get_request(uri).json()["info"]
+            match_json = select_match_fields(
+                json_loads(self.get_request(uri).content)["info"]
+            )
         except Exception as e:
             logger.info(f"Error on getting '{uri}'")
             logger.info(e, exc_info=True)
             raise requests.HTTPError()
+        self._cache_match(self.MATCH, match_id, match_json)
+        return match_json
+
+    def _get_cached_match(self, kind: str, match_id: str):
+        if self.match_cache is None:
+            return None
+        return self.match_cache.get(kind, match_id)
+
+    def _cache_match(self, kind: str, match_id: str, data):
+        if self.match_cache is not None:
+            self.match_cache.put(kind, match_id, data)
+
+    def _get_cached_summoner(self, puuid: str, update_criteria: float) -> SummonerInfo:
+        if self.summoner_cache is None:
+            return None
+        return self.summoner_cache.get(puuid, update_criteria)
+
+    def cache_summoner(self, summoner_info: SummonerInfo):
+        """Share a summoner fetched some other way, like from league entries,
+        with later lookups of it"""
+        if self.summoner_cache is not None and summoner_info.puuid:
+            self.summoner_cache.put(summoner_info)
+
+    @classmethod
+    def _convert_json_to_match_info(cls, match_json: dict) -> MatchInfo:
         return MatchInfo(
             match_json.get("gameId", 0),
             match_json.get("gameVersion", ""),
@@ -118,25 +222,41 @@ class RiotAPIClient(APIClient):
 
     def get_match_timeline(self, match_id: str) -> dict:
         match_id = self._validate_match_id(match_id)
-        uri = self._api_get_a_match_timeline_by_match_id(match_id)
-        return requests.get(uri).json()["info"]["frames"]
+        frames = self._get_cached_match(self.TIMELINE, match_id)
+        if frames is None:
+            uri = self._api_get_a_match_timeline_by_match_id(match_id)
+            frames = self.get_request(uri).json()["info"]["frames"]
+            self._cache_match(self.TIMELINE, match_id, frames)
+        return frames
 
     def get_summoners_in_tier(self, tier, division, page: int = 1) -> list:
         """Get summoner list for a given tier including master, grandmaster, challenger"""
+        uri = self._api_get_league_page(tier, division, page)
+        entries = self.single_flight.do(
+            (self.LEAGUE, uri),
+            lambda: self._convert_json_to_league_entries(
+                tier, self.get_request(uri).json()
+            ),
+        )
+        return list(entries)
+
+    def _api_get_league_page(self, tier: str, division: str, page: int = 1) -> str:
         if tier == "MASTER":
-            uri = self._api_get_master_league_for_given_queue(self.SOLO_RANK_QUEUE)
+            return self._api_get_master_league_for_given_queue(self.SOLO_RANK_QUEUE)
         elif tier == "GRANDMASTER":
-            uri = self._api_get_grandmaster_league_for_given_queue(self.SOLO_RANK_QUEUE)
-        elif tier == "CHALLENGER":
-            uri = self._api_get_challenger_league_for_given_queue(self.SOLO_RANK_QUEUE)
-        else:
-            uri = self._api_get_league_entries(
-                self.SOLO_RANK_QUEUE, tier, division, page
+            return self._api_get_grandmaster_league_for_given_queue(
+                self.SOLO_RANK_QUEUE
             )
-            return self.get_request(uri).json()
+        elif tier == "CHALLENGER":
+            return self._api_get_challenger_league_for_given_queue(self.SOLO_RANK_QUEUE)
+        return self._api_get_league_entries(self.SOLO_RANK_QUEUE, tier, division, page)
 
+    @classmethod
+    def _convert_json_to_league_entries(cls, tier: str, json_data) -> list:
+        if tier not in ("MASTER", "GRANDMASTER", "CHALLENGER"):
+            return json_data
         # 'tier' key is not included in each entries in Master, Grandmaster, Challenger tier
-        entries = self.get_request(uri).json()["entries"]
+        entries = json_data["entries"]
         for entry in entries:
             entry["tier"] = tier
         return entries
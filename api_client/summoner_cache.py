@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from api_client.value_object import SummonerInfo
+
+
+class SummonerCache:
+    """LRU cache of summoner information shared by every sampler in a process.
+
+    An entry follows 'update_criteria' of get_summoner_info_by_puuid: it is used
+    when its solo rank was written at or after 'update_criteria', or when
+    'update_criteria' is negative and it was cached within 'ttl' seconds.
+    Summoners without solo rank information count as written when cached.
+
+    When 'path' is given, entries are also kept in a SQLite file and reused
+    across runs; entries cached more than 'ttl' seconds ago are deleted from it
+    when it is opened. Entries are written in groups of 'MAX_PENDING', at most
+    'FLUSH_INTERVAL' seconds late, and on 'flush' or 'close'.
+    """
+
+    MAX_PENDING = 256  # entries buffered before written
+    FLUSH_INTERVAL = 5.0  # seconds
+
+    def __init__(self, max_entries: int, ttl: float, path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # puuid -> (summoner info, time cached)
+        self._entries: collections.OrderedDict[str, tuple[SummonerInfo, float]] = (
+            collections.OrderedDict()
+        )
+        self._pending: dict[str, tuple[SummonerInfo, float]] = {}
+        self._flushed_at = time.monotonic()
+        self._conn: sqlite3.Connection = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # opened on first use, must be called with the lock
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # entries of earlier versions kept the written time only
+            self._conn.execute("DROP TABLE IF EXISTS summoner_cache")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS summoners (
+                    puuid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    cached_at REAL NOT NULL
+                )""")
+            self._conn.execute(
+                "DELETE FROM summoners WHERE cached_at < ?",
+                (time.time() - self.ttl,),
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _is_fresh(
+        self, entry: tuple[SummonerInfo, float], update_criteria: float
+    ) -> bool:
+        summoner_info, cached_at = entry
+        if update_criteria < 0:
+            return time.time() - cached_at <= self.ttl
+        return (summoner_info.written_timestamp or cached_at) >= update_criteria
+
+    def _load(self, puuid: str):
+        if self.path is None:
+            return None
+        entry = self._pending.get(puuid)
+        if entry is not None:
+            return entry
+        row = self.conn.execute(
+            "SELECT data, cached_at FROM summoners WHERE puuid = ?", (puuid,)
+        ).fetchone()
+        if row is None:
+            return None
+        return SummonerInfo.from_dict(json.loads(row[0])), row[1]
+
+    def get(self, puuid: str, update_criteria: float = -1) -> SummonerInfo:
+        with self._lock:
+            entry = self._entries.get(puuid)
+            if entry is None:
+                entry = self._load(puuid)
+                if entry is not None:
+                    self._remember(puuid, entry)
+            else:
+                self._entries.move_to_end(puuid)
+            if entry is None or not self._is_fresh(entry, update_criteria):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, summoner_info: SummonerInfo):
+        entry = (summoner_info, time.time())
+        with self._lock:
+            self._remember(summoner_info.puuid, entry)
+            if self.path is None:
+                return
+            self._pending[summoner_info.puuid] = entry
+            if (
+                len(self._pending) >= self.MAX_PENDING
+                or time.monotonic() - self._flushed_at >= self.FLUSH_INTERVAL
+            ):
+                self._flush()
+
+    def _remember(self, puuid: str, entry: tuple[SummonerInfo, float]):
+        self._entries[puuid] = entry
+        self._entries.move_to_end(puuid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO summoners VALUES (?, ?, ?)",
+            [
+                (
+                    puuid,
+                    json.dumps(summoner_info.to_dict(), separators=(",", ":")),
+                    cached_at,
+                )
+                for puuid, (summoner_info, cached_at) in self._pending.items()
+            ],
+        )
+        self.conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            if self.path is not None:
+                self._flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import MutableMapping
+from typing import Iterable, Iterator
+
+from api_client.value_object import SummonerInfo, rank_to_number
+
+
+class _Codes:
+    """Small integer codes of the few distinct strings in a column"""
+
+    def __init__(self):
+        self.values: list = []
+        self._codes: dict = {}
+
+    def encode(self, value) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class SummonerTable(MutableMapping):
+    """Summoners by puuid, stored by column for bulk loads.
+
+    Numbers are kept in arrays and tiers and divisions as one byte codes, so a
+    summoner costs a few strings and array items instead of an object.
+    SummonerInfo is built on access; changing it does not change the table.
+    Missing numbers are stored as 0.
+    """
+
+    def __init__(self, summoners: Iterable[SummonerInfo] = ()):
+        self._index: dict[str, int] = {}  # puuid -> row
+        self._puuids: list[str] = []
+        self._summoner_ids: list[str] = []
+        self._names: list[str] = []
+        self._tiers = _Codes()
+        self._divisions = _Codes()
+        self._tier = array("B")
+        self._division = array("B")
+        self._rank_number = array("b")
+        self._lp = array("i")
+        self._win = array("i")
+        self._lose = array("i")
+        self._written = array("d")
+        for summoner_info in summoners:
+            self[summoner_info.puuid] = summoner_info
+
+    @classmethod
+    def from_dicts(cls, dict_data: Iterable[dict]) -> SummonerTable:
+        """Load summoners saved by SummonerInfo.to_dict without building them"""
+        table = cls()
+        columns = table._columns()
+        for d in dict_data:
+            if d.get("puuid") in table._index:
+                table[d["puuid"]] = SummonerInfo.from_dict(d)
+                continue
+            table._index[d.get("puuid")] = len(table._puuids)
+            tier, division = d.get("tier"), d.get("division")
+            row = (
+                d.get("puuid"),
+                d.get("summoner_id"),
+                d.get("name"),
+                table._tiers.encode(tier),
+                table._divisions.encode(division),
+                rank_to_number(tier, division),
+                d.get("lp") or 0,
+                d.get("win") or 0,
+                d.get("lose") or 0,
+                d.get("written_time") or 0,
+            )
+            for column, value in zip(columns, row):
+                column.append(value)
+        return table
+
+    def _columns(self) -> tuple:
+        return (
+            self._puuids,
+            self._summoner_ids,
+            self._names,
+            self._tier,
+            self._division,
+            self._rank_number,
+            self._lp,
+            self._win,
+            self._lose,
+            self._written,
+        )
+
+    def _row(self, puuid: str, summoner_info: SummonerInfo) -> tuple:
+        return (
+            puuid,
+            summoner_info.summoner_id,
+            summoner_info.name,
+            self._tiers.encode(summoner_info.tier),
+            self._divisions.encode(summoner_info.division),
+            summoner_info.rank_number,
+            summoner_info.lp or 0,
+            summoner_info.win or 0,
+            summoner_info.lose or 0,
+            summoner_info.written_timestamp or 0,
+        )
+
+    def __getitem__(self, puuid: str) -> SummonerInfo:
+        row = self._index[puuid]
+        return SummonerInfo(
+            puuid=self._puuids[row],
+            summoner_id=self._summoner_ids[row],
+            name=self._names[row],
+            tier=self._tiers.values[self._tier[row]],
+            division=self._divisions.values[self._division[row]],
+            lp=self._lp[row],
+            win=self._win[row],
+            lose=self._lose[row],
+            written_timestamp=self._written[row],
+        )
+
+    def __setitem__(self, puuid: str, summoner_info: SummonerInfo):
+        values = self._row(puuid, summoner_info)
+        row = self._index.get(puuid)
+        if row is None:
+            self._index[puuid] = len(self._puuids)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns(), values):
+                column[row] = value
+
+    def __delitem__(self, puuid: str):
+        # move the last row into the deleted one
+        row = self._index.pop(puuid)
+        last = len(self._puuids) - 1
+        for column in self._columns():
+            if row != last:
+                column[row] = column[last]
+            column.pop()
+        if row != last:
+            self._index[self._puuids[row]] = row
+
+    def __contains__(self, puuid) -> bool:
+        return puuid in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._puuids)
+
+    def __len__(self) -> int:
+        return len(self._puuids)
+
+    def rank_number(self, puuid: str) -> int:
+        """Rank number of a summoner without building SummonerInfo"""
+        return self._rank_number[self._index[puuid]]
@@ -1,4 +1,12 @@
 import datetime
+import json
+
+try:  # decodes large payloads several times faster when installed
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 
 def utc_time_to_timestamp(time_string: str, format: str = None) -> float:
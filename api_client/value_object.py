@@ -1,9 +1,15 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass, field
-from enum import Enum, auto
 
+from api_client.rank_table import TierGroup, rank_to_number
 
-@dataclass
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
 class SummonerInfo:
     puuid: str
     summoner_id: str
@@ -11,14 +17,22 @@ class SummonerInfo:
     # solo rank information
     tier: str = ""
     division: str = ""
-    tier_group: TierGroup = field(init=False)
     lp: int = 0
     win: int = 0
     lose: int = 0
     written_timestamp: float = 0  # unix timestamp
+    # computed once from tier and division, which are not changed afterwards
+    rank_number: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self.tier_group = TierGroup.get_from_rank(self.tier, self.division)
+        # a few strings shared by every summoner instead of a copy for each
+        self.tier = _intern(self.tier)
+        self.division = _intern(self.division)
+        self.rank_number = rank_to_number(self.tier, self.division)
+
+    @property
+    def tier_group(self) -> TierGroup:
+        return TierGroup.get_from_rank_number(self.rank_number)
 
     @classmethod
     # get from a save file
@@ -58,42 +72,41 @@ class SummonerInfo:
             "updated": self.written_timestamp,
         }
 
-    @property
-    def rank_number(self) -> int:
-        return rank_to_number(self.tier, self.division)
-
-
-def rank_to_number(tier: str, division: str) -> int:
-    index = 0
-    if division == "II":
-        index = -1
-    elif division == "III":
-        index = -2
-    elif division == "IV":
-        index = -3
-
-    if tier == "IRON":
-        index += 4 * 1
-    elif tier == "BRONZE":
-        index += 4 * 2
-    elif tier == "SILVER":
-        index += 4 * 3
-    elif tier == "GOLD":
-        index += 4 * 4
-    elif tier == "PLATINUM":
-        index += 4 * 5
-    elif tier == "DIAMOND":
-        index += 4 * 6
-    elif tier == "MASTER":
-        index += 4 * 6 + 1
-    elif tier == "GRANDMASTER":
-        index += 4 * 6 + 2
-    elif tier == "CHALLENGER":
-        index += 4 * 6 + 3
-    return index
-
-
-@dataclass
+
+# fields of a match used by samplers and validators, the rest are dropped when
+# a match is received; matches are cached with these, so clear the match cache
+# after adding a field
+MATCH_FIELDS = (
+    "gameId",
+    "gameVersion",
+    "gameCreation",
+    "gameDuration",
+    "gameEndTimestamp",
+)
+PARTICIPANT_FIELDS = (
+    "puuid",
+    "win",
+    "championName",
+    "teamPosition",
+    "summoner1Id",
+    "summoner2Id",
+    "goldSpent",
+    "totalMinionsKilled",
+    "neutralMinionsKilled",
+    "deaths",
+)
+
+
+def select_match_fields(match_json: dict) -> dict:
+    selected = {k: match_json[k] for k in MATCH_FIELDS if k in match_json}
+    selected["participants"] = [
+        {k: p[k] for k in PARTICIPANT_FIELDS if k in p}
+        for p in match_json.get("participants", [])
+    ]
+    return selected
+
+
+@dataclass(slots=True)
 class MatchInfo:
     game_id: int
     version: str
@@ -105,95 +118,3 @@ class MatchInfo:
     @property
     def participants_puuid(self) -> list:
         return [p["puuid"] for p in self.participants]
-
-
-class TierGroup(Enum):
-    I34 = auto()  # Iron 4 ~ 3
-    I12 = auto()  # Iron 2 ~ 1
-    B34 = auto()  # Bronze 4 ~ 3
-    B12 = auto()  # Broneze 2 ~ 1
-    S34 = auto()  # Silver 4 ~ 3
-    S12 = auto()  # Silver 2 ~ 1
-    G34 = auto()  # Gold 4 ~ 3
-    G12 = auto()  # Gold 2 ~ 1
-    P34 = auto()  # Platinum 4 ~ 3
-    P12 = auto()  # Platinum 2 ~ 1
-    D34 = auto()  # Diamond 4 ~ 3
-    D12 = auto()  # Diamond 2 ~ 1
-    M1 = auto()  # Master
-    GM1 = auto()  # Grandmaster
-    C1 = auto()  # Challenger
-    A = auto()  # Apex = Challenger + Grandmaster
-    U = auto()  # Unranked
-
-    @classmethod
-    def get_from_rank(cls, tier: str, division: str) -> TierGroup:
-        return cls.get_from_rank_number(rank_to_number(tier, division))
-
-    @classmethod
-    def get_from_rank_number(cls, rank_number: int) -> TierGroup:
-        if rank_number <= 0:
-            return cls.U
-        elif rank_number <= 2:
-            return cls.I34
-        elif rank_number <= 4:
-            return cls.I12
-        elif rank_number <= 6:
-            return cls.B34
-        elif rank_number <= 8:
-            return cls.B12
-        elif rank_number <= 10:
-            return cls.S34
-        elif rank_number <= 12:
-            return cls.S12
-        elif rank_number <= 14:
-            return cls.G34
-        elif rank_number <= 16:
-            return cls.G12
-        elif rank_number <= 18:
-            return cls.P34
-        elif rank_number <= 20:
-            return cls.P12
-        elif rank_number <= 22:
-            return cls.D34
-        elif rank_number <= 24:
-            return cls.D12
-        elif rank_number == 25:
-            return cls.M1
-        elif rank_number == 26:
-            return cls.GM1
-        elif rank_number == 27:
-            return cls.C1
-        return cls.U
-
-    def is_adjacent_rank(self, rank_number: int) -> bool:
-        if self == TierGroup.I34:
-            return rank_number in range(1, 4)
-        elif self == TierGroup.I12:
-            return rank_number in range(2, 6)
-        elif self == TierGroup.B34:
-            return rank_number in range(4, 8)
-        elif self == TierGroup.B12:
-            return rank_number in range(6, 10)
-        elif self == TierGroup.S34:
-            return rank_number in range(8, 12)
-        elif self == TierGroup.S12:
-            return rank_number in range(10, 14)
-        elif self == TierGroup.G34:
-            return rank_number in range(12, 16)
-        elif self == TierGroup.G12:
-            return rank_number in range(14, 18)
-        elif self == TierGroup.P34:
-            return rank_number in range(16, 20)
-        elif self == TierGroup.P12:
-            return rank_number in range(18, 22)
-        elif self == TierGroup.D34:
-            return rank_number in range(20, 24)
-        elif self == TierGroup.D12:
-            return rank_number in range(22, 26)
-        elif self == TierGroup.M1:
-            return rank_number in range(24, 28)
-        elif self == TierGroup.GM1:
-            return rank_number in range(25, 28)
-        elif self == TierGroup.C1:
-            return rank_number in range(25, 28)
@@ -1,5 +1,27 @@
 from __future__ import annotations
+import atexit
 from api_client.internal_riot_api_client import InternalRiotAPIClient
+from api_client.async_riot_api_client import AsyncRiotAPIClient
+from api_client.match_cache import MatchCache
+from api_client.summoner_cache import SummonerCache
 from app.core.config import settings
+from utils.worker_pool import shared_worker_pool
 
 APIAccess = InternalRiotAPIClient(settings.PLATFORM)
+if settings.MATCH_CACHE_FILE:
+    APIAccess.match_cache = MatchCache(
+        settings.MATCH_CACHE_FILE, settings.MATCH_CACHE_MAX_BYTES
+    )
+    atexit.register(APIAccess.match_cache.close)  # writes the access times buffered
+APIAccess.summoner_cache = SummonerCache(
+    settings.SUMMONER_CACHE_MAX_ENTRIES,
+    settings.SUMMONER_CACHE_TTL,
+    settings.SUMMONER_CACHE_FILE or None,
+)
+atexit.register(APIAccess.summoner_cache.close)  # writes the entries buffered
+AsyncAPIAccess = AsyncRiotAPIClient(APIAccess, settings.MAX_CONCURRENT_REQUESTS)
+atexit.register(AsyncAPIAccess.close)
+# requests sent concurrently and prefetched by every sampler
+shared_worker_pool.max_workers = settings.WORKER_POOL_SIZE
+APIAccess.worker_pool = shared_worker_pool
+atexit.register(shared_worker_pool.shutdown)
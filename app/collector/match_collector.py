@@ -3,13 +3,14 @@ import collections
 import os
 import heapq
 import utils
-import json
 import utils.time_converter
 from utils.patch import Patch
 from api_client.value_object import SummonerInfo
 from app.collector.tier_group import TierGroup
 from app.sampler.user_sampler import UserSampler
+from app.sampler.user_store import UserStore
 from app.sampler.match_sampler import MatchSampler
+from app.sampler.user_scheduler import UserYield
 from app.validator.match_validator import MatchValidator
 
 
@@ -21,6 +22,7 @@ class MatchCollector:
         tier_group: TierGroup,
         timezone_offset: float = 9,
         format: str = "%Y-%m-%d",
+        pipeline_workers: int = None,
     ) -> None:
         # default timezone is KST (UTC+9)
         self.version = Patch.get_current_version()
@@ -28,18 +30,18 @@ class MatchCollector:
         self.user_dict: dict[str, SummonerInfo] = {}  # key: puuid
         self.user_validity: dict[str, bool] = {}  # key: puuid
         self.user_record: dict[str, int] = {}  # key: puuid
+        self.user_cursor: dict[str, float] = {}  # key: puuid
+        self.user_yield: dict[str, UserYield] = {}  # key: puuid
         self.timezone_offset = timezone_offset
         self.format = format
+        self.pipeline_workers = pipeline_workers
         self.set_save_file_directory(version=self.version)
-        self.user_record_file = os.path.join(
-            self.save_file_directory, f"{self.tier_group.name}_user_record.txt"
-        )
+        self.user_store = UserStore(self.save_file_directory, self.tier_group.name)
 
     def _initialize_user_record(self):
-        if not os.path.exists(self.user_record_file):
-            return
-        with open(self.user_record_file, "r") as f:
-            self.user_record: dict = json.load(f)
+        self.user_record = self.user_store.load_records()
+        self.user_cursor = self.user_store.load_cursors()
+        self.user_yield = self.user_store.load_yields()
 
     def set_save_file_directory(self, version: str):
         self.save_file_directory = os.path.join(
@@ -55,7 +57,10 @@ class MatchCollector:
         renew_sampling: bool = True,
         start_date: str = "",
         end_date: str = "",
+        route_groups: list[TierGroup] = (),
     ):
+        """Collect 'count_to_collect' matches a day of the tier group, and as many
+        of each of 'route_groups' qualified in the same crawl"""
         if is_daily_collect:
             start_date, end_date = utils.time_converter.get_daily_start_end_date(
                 self.format
@@ -66,6 +71,8 @@ class MatchCollector:
             count_to_collect=count_to_collect,
             user_count=user_count,
             renew_sampling=renew_sampling,
+            route_groups=route_groups,
+            incremental=is_daily_collect,
         )
 
     def collect_all_match(
@@ -74,7 +81,9 @@ class MatchCollector:
         renew_sampling: bool = True,
         start_date: str = "",
         end_date: str = "",
+        workers: int = None,
     ):
+        """Collect every match of the users, searched by 'workers' threads"""
         if is_daily_collect:
             start_date, end_date = utils.time_converter.get_daily_start_end_date(
                 self.format
@@ -83,8 +92,11 @@ class MatchCollector:
         start_timestamp, end_timestamp = MatchValidator.get_valid_start_end_timestamp(
             start_date, end_date, self.format, self.timezone_offset
         )
+        self.user_cursor = self.user_store.load_cursors()
         user_sampler = UserSampler(
-            tier_group=self.tier_group, save_file_directory=self.save_file_directory
+            tier_group=self.tier_group,
+            save_file_directory=self.save_file_directory,
+            user_store=self.user_store,
         )
         users_to_search: collections.deque = user_sampler.user_collecting(
             renew_sampling=renew_sampling
@@ -95,12 +107,16 @@ class MatchCollector:
             save_file_directory=self.save_file_directory,
             user_dict=user_sampler.user_dict,
             user_validity=user_sampler.user_validity,
+            # cursors of daily runs only, other windows are listed in full
+            user_cursor=self.user_cursor if is_daily_collect else None,
         )
         match_sampler._collect_all_matches(
             start_timestamp=start_timestamp,
             end_timestamp=end_timestamp,
             users_to_search=users_to_search,
+            workers=workers,
         )
+        self.user_store.save_cursors(self.user_cursor)
 
     def run_collector(
         self,
@@ -109,7 +125,11 @@ class MatchCollector:
         count_to_collect: int,
         user_count: int,
         renew_sampling: bool = True,
+        route_groups: list[TierGroup] = (),
+        incremental: bool = False,
     ):
+        """incremental: list the matches of each user after its cursor only, as
+        on daily runs"""
         self._initialize_user_record()
         days = utils.time_converter.get_date_difference(
             start_date=start_date, end_date=end_date, format=self.format
@@ -118,7 +138,9 @@ class MatchCollector:
             start_date, end_date, self.format, self.timezone_offset
         )
         user_sampler = UserSampler(
-            tier_group=self.tier_group, save_file_directory=self.save_file_directory
+            tier_group=self.tier_group,
+            save_file_directory=self.save_file_directory,
+            user_store=self.user_store,
         )
         users_to_search: collections.deque = user_sampler.user_sampling(
             user_count, renew_sampling
@@ -126,9 +148,6 @@ class MatchCollector:
         for puuid in users_to_search:
             if puuid not in self.user_record.keys():
                 self.user_record[puuid] = 0
-        search_list = []
-        for puuid, priority in self.user_record.items():
-            heapq.heappush(search_list, (priority, puuid))
 
         match_sampler = MatchSampler(
             tier_group=self.tier_group,
@@ -136,7 +155,17 @@ class MatchCollector:
             save_file_directory=self.save_file_directory,
             user_dict=user_sampler.user_dict,
             user_validity=user_sampler.user_validity,
+            pipeline_workers=self.pipeline_workers,
+            user_cursor=self.user_cursor if incremental else None,
+            route_groups=route_groups,
+            user_yield=self.user_yield,
         )
+        # users likely to yield matches of the tier groups first
+        search_list = [
+            (match_sampler.scheduler.priority(puuid), puuid)
+            for puuid in self.user_record
+        ]
+        heapq.heapify(search_list)
         user_record = match_sampler.match_sampling(
             count_to_collect=count_to_collect,
             start_timestamp=start_timestamp,
@@ -147,7 +176,8 @@ class MatchCollector:
             format=self.format,
         )
         self.update_user_record(user_record)
+        self.user_store.save_cursors(self.user_cursor)
+        self.user_store.save_yields(self.user_yield)
 
     def update_user_record(self, user_record: dict):
-        with open(self.user_record_file, "w") as f:
-            json.dump(user_record, f, separators=(",", ":"))
+        self.user_store.save_records(user_record)
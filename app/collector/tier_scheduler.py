@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.collector.match_collector import MatchCollector
+from app.collector.tier_group import TierGroup
+from app.core.log_config import log_config
+from app.sampler.match_sampler import MatchSampler
+
+log_config()
+logger = logging.getLogger(__name__)
+
+
+class TierJob:
+    def __init__(
+        self,
+        tier_group: TierGroup,
+        collect: Callable[[MatchCollector], None],
+        priority: int,
+        weight: float,
+    ):
+        self.tier_group = tier_group
+        self.collect = collect
+        self.priority = priority
+        self.weight = weight
+
+    @property
+    def pipeline_workers(self) -> int:
+        return max(1, round(MatchSampler.PIPELINE_WORKERS * self.weight))
+
+
+class TierScheduler:
+    """Collect matches of tier groups concurrently.
+
+    Every collection sends requests through APIAccess, so all of them share its
+    rate limiter as one global budget. Each tier searches users with the same
+    number of workers scaled by its weight, which sets its share of the budget.
+    When more tiers are added than 'max_parallel', higher priority tiers start
+    first. A failed tier is logged and does not stop the others. A tier group
+    is added only once, since the results are kept by tier group.
+    """
+
+    def __init__(self, max_parallel: int):
+        self.max_parallel = max_parallel
+        self.jobs: list[TierJob] = []
+
+    def add(
+        self,
+        tier_group: TierGroup,
+        collect: Callable[[MatchCollector], None],
+        priority: int = 0,
+        weight: float = 1.0,
+    ):
+        """collect: called with the MatchCollector of the tier group"""
+        if any(job.tier_group == tier_group for job in self.jobs):
+            raise ValueError(f"Tier: {tier_group} is already added")
+        self.jobs.append(TierJob(tier_group, collect, priority, weight))
+
+    def run(self) -> dict[TierGroup, Exception]:
+        """Run every job added, and return the error of each tier or None"""
+        jobs = sorted(self.jobs, key=lambda job: -job.priority)
+        self.jobs = []
+        with ThreadPoolExecutor(
+            min(self.max_parallel, len(jobs)) or 1, thread_name_prefix="tier"
+        ) as executor:
+            futures = {job.tier_group: executor.submit(self._run, job) for job in jobs}
+        return {tier_group: future.result() for tier_group, future in futures.items()}
+
+    def _run(self, job: TierJob) -> Exception:
+        try:
+            collector = MatchCollector(
+                tier_group=job.tier_group, pipeline_workers=job.pipeline_workers
+            )
+            job.collect(collector)
+        except Exception as e:
+            logger.exception(f"Tier: {job.tier_group} failed collecting")
+            return e
+        logger.info(f"Tier: {job.tier_group} complete collecting")
+        return None
@@ -5,6 +5,18 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str = "/gathering/v1"
     SERVER_NAME: str = "Match Gathering Server"
     PLATFORM: str = "KR"
+    MAX_CONCURRENT_REQUESTS: int = 256
+    MAX_PARALLEL_TIERS: int = 12  # tier groups collected at the same time
+    # requests:seconds to the API server shared by every tier collected, like
+    # '500:10,30000:600' of a Riot production key; empty to learn from responses
+    API_RATE_LIMITS: str = ""
+    WORKER_POOL_SIZE: int = 64  # threads sending requests of APIAccess concurrently
+    MATCH_CACHE_FILE: str = "save_files/match_cache.sqlite3"  # empty to disable
+    MATCH_CACHE_MAX_BYTES: int = 10 * 1024**3
+    MATCH_LIST_FSYNC: str = "close"  # when match lists are synced: never, flush, close
+    SUMMONER_CACHE_FILE: str = "save_files/summoner_cache.sqlite3"  # empty for memory
+    SUMMONER_CACHE_MAX_ENTRIES: int = 500_000
+    SUMMONER_CACHE_TTL: float = 24 * 60 * 60  # seconds
 
 
 settings = Settings()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from collections.abc import MutableSet
+from typing import Iterator, Sequence
+
+
+class MatchIndex(MutableSet):
+    """Match IDs of a match list file, kept as numbers in a sorted array.
+
+    IDs of one platform, such as "KR_6234567890", are stored by their number
+    in '{path}.idx' next to the list, which is memory-mapped instead of read
+    on load. Other IDs are kept as they are. The list is the source of the
+    IDs: the index covers the lines written to it when saved, and lines
+    appended after are read again. IDs added but not written to the list are
+    kept in memory only. The index is used only if the part of the list it
+    covers is unchanged, checked by its modification time or else its CRC-32.
+    Use 'open' to share the index of a list in the process. The mapping is
+    released while the index is saved, so that the file can be replaced on
+    Windows too.
+    """
+
+    MAGIC = b"MATCHID2"
+    # magic, size of the list covered, count of numbers, platform, and the
+    # modification time and CRC-32 of the list covered
+    HEADER = struct.Struct("<8sqq16sqI")
+    CHUNK_SIZE = 1 << 20  # bytes of the list read at once to check it
+
+    _opened: dict[str, MatchIndex] = {}
+    _opened_lock = threading.Lock()
+
+    def __init__(self, path: str, platform: str = "KR"):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.platform = platform
+        self._lock = threading.Lock()
+        self._numbers: Sequence[int] = array("q")  # sorted, may be memory-mapped
+        self._mapped: mmap.mmap = None
+        self._view: memoryview = None  # of the whole mapping
+        self._added: set[int] = set()
+        self._removed: set[int] = set()
+        self._others: set[str] = set()
+        self._listed_others: set[str] = set()  # other IDs in the part covered
+        self._covered = 0  # size of the list covered by the index
+        self._crc = 0  # of the list covered
+        self._load()
+
+    @classmethod
+    def open(cls, path: str) -> MatchIndex:
+        """The index of the list shared in the process"""
+        path = os.path.abspath(path)
+        with cls._opened_lock:
+            index = cls._opened.get(path)
+            if index is None:
+                index = cls._opened[path] = cls(path)
+            return index
+
+    def _load(self):
+        self._map_index()
+        if not os.path.exists(self.path):
+            return
+        lines, _, _ = self._read_lines()
+        for line in lines:
+            if line:
+                self.add(line)
+
+    def _map_index(self) -> bool:
+        """Map the saved numbers if they cover the list as it is"""
+        self._covered, self._crc = 0, 0
+        if not os.path.exists(self.index_path) or not os.path.exists(self.path):
+            return False
+        with open(self.index_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) < self.HEADER.size:
+            mapped.close()
+            return False
+        magic, covered, count, platform, mtime, crc = self.HEADER.unpack_from(mapped)
+        platform = platform.rstrip(b"\0").decode()
+        if (
+            magic != self.MAGIC
+            or platform != self.platform
+            or not self._is_covered(covered, mtime, crc)
+        ):
+            mapped.close()
+            return False  # written for another list, read the list again
+        end = self.HEADER.size + count * 8
+        self._mapped = mapped
+        self._view = memoryview(mapped)
+        self._numbers = self._view[self.HEADER.size : end].cast("q")
+        others = [o for o in mapped[end:].decode("utf-8").split("\n") if o]
+        self._listed_others.update(others)
+        self._others.update(others)
+        self._covered, self._crc = covered, crc
+        return True
+
+    def _is_covered(self, covered: int, mtime: int, crc: int) -> bool:
+        """Whether the first 'covered' bytes of the list are as when indexed"""
+        stat = os.stat(self.path)
+        if stat.st_size < covered:
+            return False
+        if stat.st_size == covered and stat.st_mtime_ns == mtime:
+            return True  # not written since
+        checked = 0
+        with open(self.path, "rb") as f:
+            while covered > 0:
+                chunk = f.read(min(self.CHUNK_SIZE, covered))
+                if not chunk:
+                    return False
+                checked = zlib.crc32(chunk, checked)
+                covered -= len(chunk)
+        return checked == crc
+
+    def _read_lines(self) -> tuple[list[str], int, int]:
+        """Lines written in full to the list after the part covered, and the
+        size and CRC-32 of the list covered with them"""
+        with open(self.path, "rb") as f:
+            f.seek(self._covered)
+            written = f.read()
+        written = written[: written.rfind(b"\n") + 1]  # a line may be written
+        lines = written.decode("utf-8").splitlines()
+        return lines, self._covered + len(written), zlib.crc32(written, self._crc)
+
+    def _unmap(self):
+        if self._mapped is None:
+            return
+        self._numbers.release()
+        self._view.release()
+        self._mapped.close()
+        self._numbers, self._view, self._mapped = array("q"), None, None
+
+    def _number(self, match_id: str) -> int:
+        """Number of the ID, or None if it is not of the platform"""
+        platform, _, number = match_id.partition("_")
+        if platform != self.platform or not number.isdigit():
+            return None
+        return int(number)
+
+    def _saved(self, number: int) -> bool:
+        i = bisect.bisect_left(self._numbers, number)
+        return i < len(self._numbers) and self._numbers[i] == number
+
+    def __contains__(self, match_id) -> bool:
+        number = self._number(match_id)
+        if number is None:
+            return match_id in self._others
+        if number in self._added:
+            return True
+        with self._lock:  # not to read a mapping released by 'save'
+            return self._saved(number) and number not in self._removed
+
+    def add(self, match_id: str):
+        number = self._number(match_id)
+        with self._lock:
+            if number is None:
+                self._others.add(match_id)
+            elif not self._saved(number):
+                self._added.add(number)
+            else:
+                self._removed.discard(number)
+
+    def discard(self, match_id: str):
+        number = self._number(match_id)
+        with self._lock:
+            if number is None:
+                self._others.discard(match_id)
+            elif number in self._added:
+                self._added.discard(number)
+            elif self._saved(number):
+                self._removed.add(number)
+
+    def __len__(self) -> int:
+        with self._lock:
+            saved = len(self._numbers) - len(self._removed)
+            return saved + len(self._added) + len(self._others)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            numbers = array("q", self._numbers)
+            removed = set(self._removed)
+            added = list(self._added)
+            others = list(self._others)
+        for number in numbers:
+            if number not in removed:
+                yield f"{self.platform}_{number}"
+        for number in added:
+            yield f"{self.platform}_{number}"
+        yield from others
+
+    def save(self):
+        """Write the index of the IDs written to the list so far"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            lines, covered, crc = self._read_lines()
+            listed = set()
+            for line in lines:
+                number = self._number(line) if line else None
+                if number is not None:
+                    listed.add(number)
+                elif line:
+                    self._listed_others.add(line)
+            listed &= self._added  # and not discarded
+            numbers = array(
+                "q",
+                sorted(
+                    [n for n in self._numbers if n not in self._removed] + list(listed)
+                ),
+            )
+            others = self._listed_others & self._others
+            mtime = os.stat(self.path).st_mtime_ns
+            header = self.HEADER.pack(
+                self.MAGIC, covered, len(numbers), self.platform.encode(), mtime, crc
+            )
+            temp_path = self.index_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(header)
+                f.write(numbers.tobytes())
+                f.write("\n".join(others).encode("utf-8"))
+            # a mapped file can not be replaced on Windows
+            self._unmap()
+            os.replace(temp_path, self.index_path)
+            self._added -= listed  # the others are kept in memory only
+            self._removed.clear()
+            self._listed_others = others
+            if not self._map_index():
+                self._numbers = numbers
+                self._covered, self._crc = covered, crc
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import NamedTuple, Optional
+
+from app.collector.tier_group import TierGroup
+
+
+class MatchEvaluation(NamedTuple):
+    abnormal: bool
+    # tier group of the median two participants, "" if they are of different
+    # groups and None if the participants were not resolved
+    median_group: Optional[str] = None
+    participants_valid: Optional[bool] = None
+
+    def may_qualify(self, tier_group: TierGroup) -> bool:
+        if self.abnormal or self.participants_valid is False:
+            return False
+        return self.median_group is None or self.median_group == tier_group.name
+
+
+class MatchRegistry:
+    """Matches of a patch evaluated by any tier, kept in a SQLite file.
+
+    Every sampler of the patch records the matches it fetched, so the others
+    can skip a match that is abnormal or whose median rank is of another tier
+    group without fetching it again. Records are buffered and written in
+    groups, and on 'flush'. Use 'open' to share the registry of a directory
+    in the process.
+    """
+
+    FILE_NAME = "match_registry.sqlite3"
+    MAX_PENDING = 256  # records buffered before written
+
+    _opened: dict[str, MatchRegistry] = {}
+    _opened_lock = threading.Lock()
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection = None
+        self._pending: dict[str, MatchEvaluation] = {}
+
+    @classmethod
+    def open(cls, directory: str) -> MatchRegistry:
+        """The registry of the directory shared in the process"""
+        directory = os.path.abspath(directory)
+        with cls._opened_lock:
+            registry = cls._opened.get(directory)
+            if registry is None:
+                registry = cls._opened[directory] = cls(directory)
+            return registry
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # opened on first use, must be called with the lock
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS matches (match_id TEXT PRIMARY KEY, "
+                "abnormal INTEGER NOT NULL, median_group TEXT, "
+                "participants_valid INTEGER)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, match_id: str) -> Optional[MatchEvaluation]:
+        with self._lock:
+            evaluation = self._pending.get(match_id)
+            if evaluation is not None:
+                return evaluation
+            row = self.conn.execute(
+                "SELECT abnormal, median_group, participants_valid FROM matches "
+                "WHERE match_id = ?",
+                (match_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        abnormal, median_group, participants_valid = row
+        return MatchEvaluation(
+            bool(abnormal),
+            median_group,
+            None if participants_valid is None else bool(participants_valid),
+        )
+
+    def record(self, match_id: str, evaluation: MatchEvaluation):
+        with self._lock:
+            self._pending[match_id] = evaluation
+            if len(self._pending) >= self.MAX_PENDING:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?)",
+            [
+                (match_id, int(e.abnormal), e.median_group, e.participants_valid)
+                for match_id, e in self._pending.items()
+            ],
+        )
+        self.conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
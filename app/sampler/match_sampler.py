@@ -4,23 +4,111 @@ import collections
 import heapq
 import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 
+import requests
 from tqdm import tqdm
 
 import utils
 import utils.time_converter
 from api_client.riot_api_client import SummonerInfo
+from api_client.retry_policy import outage_wait
 from app import APIAccess
+from app.core.config import settings
 from app.collector.tier_group import TierGroup
 from app.core.log_config import log_config
+from app.sampler.match_index import MatchIndex
+from app.sampler.match_registry import MatchEvaluation, MatchRegistry
+from app.sampler.participant_index import ParticipantIndex
+from app.sampler.user_scheduler import UserScheduler, UserYield
 from app.validator.match_validator import MatchValidator
+from utils.line_writer import BufferedLineWriter
 
 log_config()
 logger = logging.getLogger(__name__)
 
 
+class _UserSearch:
+    """A user searched by a pipeline worker within the window of a day"""
+
+    def __init__(
+        self,
+        puuid: str,
+        priority: float,
+        day: int,
+        start_timestamp: int,
+        end_timestamp: int,
+    ):
+        self.puuid = puuid
+        self.priority = priority
+        self.day = day
+        self.start_timestamp = start_timestamp
+        self.end_timestamp = end_timestamp
+        self.collected = 0  # updated by the writer only
+        self.calls = 0  # API calls spent, updated by the worker only
+        self.active = False  # whether any game was listed in the window
+        # seconds to wait for the server, if the search stopped for its outage
+        self.outage: float = None
+        self.cancelled = threading.Event()
+        self.listed_until: float = None  # set when the window is searched through
+
+
+class _Candidate:
+    """A valid match waiting for the writer to qualify it"""
+
+    def __init__(
+        self,
+        match_id: str,
+        participants_puuid: list[str],
+        summoners: dict[str, SummonerInfo],
+    ):
+        self.match_id = match_id
+        self.participants_puuid = participants_puuid
+        self.summoners = summoners  # participants resolved by the worker
+        self.decided = threading.Event()
+        # for the tier group of the sampler, or None if not every participant
+        # is known; set by the writer
+        self.qualified: bool = None
+
+
+class _MatchClaims:
+    """Matches taken by workers, so that each match is fetched only once"""
+
+    def __init__(self, *known: set[str]):
+        self.known = known  # matches already decided, updated by the writer
+        self._claimed: set[str] = set()
+        self._lock = threading.Lock()
+
+    def claim(self, match_id: str) -> bool:
+        with self._lock:
+            if match_id in self._claimed or any(match_id in k for k in self.known):
+                return False
+            self._claimed.add(match_id)
+            return True
+
+    def release(self, match_id: str):
+        with self._lock:
+            self._claimed.discard(match_id)
+
+
 class MatchSampler:
     MAX_GAME_PER_USER = 3
+    PIPELINE_WORKERS = 16  # users searched at the same time by default
+    PIPELINE_QUEUE_SIZE = 64  # results waiting for the writer
+    ALL_MATCH_WORKERS = 8  # users searched at the same time for all matches
+    CURSOR_LAG = 60 * 60  # games still running when listed are listed later
+    OUTAGE_PAUSE = 1  # seconds to wait at least when the server is unavailable
+    MAX_OUTAGE = 10 * 60  # seconds of outage after which sampling is given up
+    # kinds of pipeline results
+    CANDIDATE = "candidate"
+    ABNORMAL = "abnormal"
+    COLLECTED = "collected"
+    LISTED = "listed"
+    DONE = "done"
 
     def __init__(
         self,
@@ -30,35 +118,77 @@ class MatchSampler:
         user_dict: dict[str, SummonerInfo],
         user_validity: dict[str, bool],
         timezone_offset: float = 9,
+        pipeline_workers: int = None,
+        user_cursor: dict[str, float] = None,
+        match_registry: MatchRegistry = None,
+        route_groups: Iterable[TierGroup] = (),
+        user_yield: dict[str, UserYield] = None,
     ):
         self.version = version
         self.user_dict = user_dict
         self.user_validity = user_validity
+        # puuid -> time until which the matches of the user have been listed, or
+        # None to list every window in full, as on runs of explicit dates
+        self.user_cursor = user_cursor
+        self.participant_index = ParticipantIndex(user_dict, user_validity)
         self.tier_group = tier_group
+        # other tier groups to collect the matches qualified for them into
+        self.route_groups = [g for g in route_groups if g != tier_group]
+        # puuid -> matches collected per API call and when the user last played
+        self.user_yield = user_yield if user_yield is not None else {}
+        self.scheduler = UserScheduler(
+            [tier_group, *self.route_groups], user_dict, self.user_yield
+        )
         self.match_output = os.path.join(
             save_file_directory, f"{tier_group.name}_match_list.txt"
         )
         self.invalid_match_output = os.path.join(
             save_file_directory, f"{tier_group.name}_invalid_match_list.txt"
         )
+        self.match_writer = BufferedLineWriter(
+            self.match_output, fsync=settings.MATCH_LIST_FSYNC
+        )
+        self.invalid_match_writer = BufferedLineWriter(
+            self.invalid_match_output, fsync=settings.MATCH_LIST_FSYNC
+        )
         self.timezone_offset = timezone_offset
+        self.pipeline_workers = pipeline_workers or self.PIPELINE_WORKERS
         self.save_file_directory = save_file_directory
+        # matches of the patch evaluated by the samplers of every tier
+        self.match_registry = match_registry or MatchRegistry.open(save_file_directory)
         # to not download duplicate match
         self._initialize_match_list()
 
     def _initialize_match_list(self):
-        self.matches_collected = set()
-        self.invalid_matches = set()
-        if os.path.exists(self.match_output):
-            with open(self.match_output, "r") as f:
-                match_list = f.read().splitlines()
-                for match in match_list:
-                    self.matches_collected.add(match)
-        if os.path.exists(self.invalid_match_output):
-            with open(self.invalid_match_output, "r") as f:
-                match_list = f.read().splitlines()
-                for match in match_list:
-                    self.invalid_matches.add(match)
+        self.matches_collected = MatchIndex.open(self.match_output)
+        self.invalid_matches = MatchIndex.open(self.invalid_match_output)
+        # tier group -> matches collected and the writer of its match list
+        self.match_lists = {
+            self.tier_group: (self.matches_collected, self.match_writer)
+        }
+        for tier_group in self.route_groups:
+            match_output = os.path.join(
+                self.save_file_directory, f"{tier_group.name}_match_list.txt"
+            )
+            self.match_lists[tier_group] = (
+                MatchIndex.open(match_output),
+                BufferedLineWriter(match_output, fsync=settings.MATCH_LIST_FSYNC),
+            )
+
+    def close(self):
+        """Write the match lists buffered, and their indexes"""
+        for matches_collected, match_writer in self.match_lists.values():
+            match_writer.close()
+            matches_collected.save()
+        self.invalid_match_writer.close()
+        self.invalid_matches.save()
+        self.match_registry.flush()
+
+    def _is_settled(self, match_id: str) -> bool:
+        return match_id in self.invalid_matches or any(
+            match_id in matches_collected
+            for matches_collected, _ in self.match_lists.values()
+        )
 
     def match_sampling(
         self,
@@ -70,137 +200,405 @@ class MatchSampler:
         days: int,
         format: str,
     ) -> None:
-        total_count = count_to_collect * days + len(self.matches_collected)
+        """Search users in a pipeline of 'pipeline_workers' workers.
+
+        Workers list recent games of a user, fetch and validate the matches and
+        resolve their participants. This thread is the single writer: it records
+        the participants, qualifies the matches and keeps the quotas per day and
+        per user. Candidates queued together are qualified in one batch. A worker
+        waits for the decision on its match before the next one, and the results
+        queue is bounded, so workers can not run ahead.
+
+        Days advance by the quota of the tier group of the sampler. Route groups
+        take the matches qualified for them on the way, each up to its own
+        quota of the day, and never hold the sampler on a day.
+        """
+        total_count = {
+            tier_group: count_to_collect * days + len(matches_collected)
+            for tier_group, (matches_collected, _) in self.match_lists.items()
+        }
+        # matches collected on the current day, by tier group
+        collect_per_day = dict.fromkeys(self.match_lists, 0)
+
+        def is_full(tier_group: TierGroup) -> bool:
+            matches_collected, _ = self.match_lists[tier_group]
+            return (
+                collect_per_day[tier_group] >= count_to_collect
+                or len(matches_collected) >= total_count[tier_group]
+            )
+
+        results = queue.Queue(self.PIPELINE_QUEUE_SIZE)
+        pending = collections.deque()  # results taken from the queue at once
+        searching: set[_UserSearch] = set()
+        day = 0
+        abnormal_match_count = 0
+        resume_at = 0.0  # searches are paused until then during an outage
+        outage_since: float = None
         with tqdm(
             total=count_to_collect * days,
             desc=f"{self.tier_group.name} : match to collect",
-        ) as match_progress_bar:
-            abnormal_match_count = 0
-            collect_per_day = 0
-            while users_to_search and len(self.matches_collected) < total_count:
-                user_to_search = heapq.heappop(users_to_search)[1]
-                GAME_COUNT = 50
-                if collect_per_day >= count_to_collect:
-                    start_date = utils.time_converter.add_day_from_timestamp(
-                        start_timestamp, 1, format, self.timezone_offset
-                    )
-                    end_date = utils.time_converter.add_day_from_timestamp(
-                        end_timestamp, 2, format, self.timezone_offset
+        ) as match_progress_bar, ThreadPoolExecutor(
+            self.pipeline_workers, thread_name_prefix="match-sampler"
+        ) as workers:
+            try:
+                while len(self.matches_collected) < total_count[self.tier_group]:
+                    while users_to_search and len(searching) < self.pipeline_workers:
+                        pause = resume_at - time.monotonic()
+                        if pause > 0:
+                            if searching:  # wait for their results first
+                                break
+                            time.sleep(pause)
+                        if is_full(self.tier_group):
+                            start_timestamp, end_timestamp = self._next_day_window(
+                                start_timestamp, end_timestamp, format
+                            )
+                            day += 1
+                            collect_per_day = dict.fromkeys(self.match_lists, 0)
+                        priority, puuid = heapq.heappop(users_to_search)
+                        search = _UserSearch(
+                            puuid, priority, day, start_timestamp, end_timestamp
+                        )
+                        searching.add(search)
+                        workers.submit(self._search_user, search, results)
+                    if not searching:
+                        break
+
+                    if not pending:
+                        pending.extend(self._take_results(results))
+                        self._qualify_candidates(pending, users_to_search, user_record)
+                    kind, search, item = pending.popleft()
+                    if kind == self.DONE:
+                        searching.discard(search)
+                        if search.listed_until is not None:
+                            self._advance_cursor(search.puuid, search.listed_until)
+                        self._record_search(search)
+                        stopped = search.cancelled.is_set() or search.outage is not None
+                        if stopped and search.collected == 0:
+                            # stopped by the end of the day or an outage, search
+                            # it again
+                            heapq.heappush(
+                                users_to_search,
+                                (self.scheduler.priority(search.puuid), search.puuid),
+                            )
+                        if search.outage is None:
+                            outage_since = None
+                        else:
+                            now = time.monotonic()
+                            resume_at = max(resume_at, now + search.outage)
+                            outage_since = outage_since or now
+                            if now - outage_since > self.MAX_OUTAGE:
+                                logger.error(
+                                    f"Server unavailable for {self.MAX_OUTAGE}s, "
+                                    "sampling stopped"
+                                )
+                                break
+                    elif kind == self.ABNORMAL:
+                        self.invalid_matches.add(item)
+                        self.match_registry.record(item, MatchEvaluation(True))
+                        abnormal_match_count += 1
+                    else:
+                        try:
+                            tier_group = self._judge_candidate(item)
+                            if (
+                                tier_group
+                                and search.day == day
+                                and not search.cancelled.is_set()
+                                and not is_full(tier_group)
+                                and search.collected < self.MAX_GAME_PER_USER
+                            ):
+                                matches_collected, match_writer = self.match_lists[
+                                    tier_group
+                                ]
+                                matches_collected.add(item.match_id)
+                                search.collected += 1
+                                collect_per_day[tier_group] += 1
+                                user_record[search.puuid] += 1
+                                match_writer.write(item.match_id)
+                                if tier_group != self.tier_group:
+                                    match_progress_bar.set_postfix(
+                                        {g.name: n for g, n in collect_per_day.items()}
+                                    )
+                                else:
+                                    match_progress_bar.update(1)
+                                    if is_full(self.tier_group):
+                                        for other in searching:
+                                            other.cancelled.set()
+                        finally:
+                            item.decided.set()
+            finally:
+                # release the workers waiting for a decision or a queue slot
+                for search in searching:
+                    search.cancelled.set()
+                while searching:
+                    kind, search, item = pending.popleft() if pending else results.get()
+                    if kind == self.DONE:
+                        searching.discard(search)
+                        self._record_search(search)
+                    elif kind == self.CANDIDATE:
+                        item.decided.set()
+                self.close()
+        return user_record
+
+    def _next_day_window(
+        self, start_timestamp: int, end_timestamp: int, format: str
+    ) -> tuple[float, float]:
+        start_date = utils.time_converter.add_day_from_timestamp(
+            start_timestamp, 1, format, self.timezone_offset
+        )
+        end_date = utils.time_converter.add_day_from_timestamp(
+            end_timestamp, 2, format, self.timezone_offset
+        )
+        return (
+            utils.time_converter.utc_time_to_timestamp(
+                start_date, format, self.timezone_offset
+            ),
+            utils.time_converter.utc_time_to_timestamp(
+                end_date, format, self.timezone_offset
+            ),
+        )
+
+    def _search_user(self, search: _UserSearch, results: queue.Queue):
+        """Pipeline worker: send the matches of a user to the writer one by one,
+        while the next match is fetched in the background"""
+        GAME_COUNT = 50
+        next_match = None
+        try:
+            window = self._listing_window(
+                search.puuid, search.start_timestamp, search.end_timestamp
+            )
+            if window is None:  # listed through on an earlier search
+                return
+            listed_at = time.time()
+            search.calls += 1
+            recent_games = self.get_recent_games(search.puuid, GAME_COUNT, 0, *window)
+            if recent_games is None:
+                return
+            search.active = bool(recent_games)
+            # searched through when every match is settled, or the user is done
+            searched_through = len(recent_games) < GAME_COUNT
+            match_ids = [
+                m
+                for m in recent_games
+                if not self._is_settled(m) and self._may_qualify(m)
+            ]
+            for index, match_id in enumerate(match_ids):
+                if search.collected >= self.MAX_GAME_PER_USER:
+                    searched_through = False  # the rest is not searched
+                    break
+                if search.cancelled.is_set():
+                    searched_through = False
+                    break
+                match, next_match = next_match, None
+                if self._is_settled(match_id):
+                    if match is not None:
+                        match.cancel()
+                    continue
+                if match is None:  # not prefetched
+                    match = APIAccess.executor.submit(
+                        APIAccess.get_match_data, match_id
                     )
-                    start_timestamp = utils.time_converter.utc_time_to_timestamp(
-                        start_date, format, self.timezone_offset
+                search.calls += 1
+                try:
+                    match_data = match.result()
+                except Exception as e:
+                    if self._outage_wait(e) is not None:
+                        raise
+                    searched_through = False
+                    continue
+                if not match_data.version.startswith(self.version):
+                    searched_through = True
+                    break
+                # fetch the next match while this one is judged, unless the user
+                # may be done with this one
+                if (
+                    index + 1 < len(match_ids)
+                    and search.collected + 1 < self.MAX_GAME_PER_USER
+                ):
+                    next_match = APIAccess.executor.submit(
+                        APIAccess.get_match_data, match_ids[index + 1]
                     )
-                    end_timestamp = utils.time_converter.utc_time_to_timestamp(
-                        end_date, format, self.timezone_offset
+                if MatchValidator.is_abnormal_match_info(match_data):
+                    results.put((self.ABNORMAL, search, match_id))
+                    continue
+
+                participants_puuid = match_data.participants_puuid
+                if "BOT" in participants_puuid:
+                    logger.warning(
+                        f"wrong puuid: {participants_puuid} in match '{match_id}'"
                     )
-                    collect_per_day = 0
-                recent_games = self.get_recent_games(
-                    user_to_search, GAME_COUNT, 0, start_timestamp, end_timestamp
-                )
-                game_per_user = 0
-                for match_id in recent_games:
-                    if collect_per_day >= count_to_collect:
-                        break
-                    if game_per_user >= self.MAX_GAME_PER_USER:
-                        break
-                    if (
-                        match_id in self.matches_collected
-                        or match_id in self.invalid_matches
-                    ):
-                        continue
-                    try:
-                        match_data = APIAccess.get_match_data(match_id)
-                    except:
-                        continue
-                    if not match_data.version.startswith(self.version):
-                        break
-                    if MatchValidator.is_abnormal_match_info(match_data):
-                        self.invalid_matches.add(match_id)
-                        abnormal_match_count += 1
-                        continue
+                    continue
+                if len(participants_puuid) < 10:
+                    logger.info(f"Not valid number of members: {match_id}")
+                    continue
 
-                    participants_puuid = match_data.participants_puuid
-                    if "BOT" in participants_puuid:
-                        logger.warning(
-                            f"wrong puuid: {participants_puuid} in match '{match_id}'"
-                        )
-                        continue
-                    if len(participants_puuid) < 10:
-                        logger.info(f"Not valid number of members: {match_id}")
-                        continue
+                unresolved = [p for p in participants_puuid if p not in self.user_dict]
+                search.calls += len(unresolved)
+                summoners = APIAccess.get_summoners_by_puuids(unresolved)
+                candidate = _Candidate(match_id, participants_puuid, summoners)
+                results.put((self.CANDIDATE, search, candidate))
+                candidate.decided.wait()
+                if not self._is_settled(match_id):
+                    searched_through = False  # not judged, may be found again
+            if searched_through:
+                search.listed_until = self._listed_until(window[1], listed_at)
+        except Exception as e:
+            search.outage = self._outage_wait(e)
+            if search.outage is None:
+                logger.exception(f"Failed to search matches of '{search.puuid}'")
+            else:
+                logger.warning(f"Server unavailable to search '{search.puuid}': {e}")
+        finally:
+            if next_match is not None:
+                next_match.cancel()
+            results.put((self.DONE, search, None))
 
-                    not_recorded_puuids = [
-                        p for p in participants_puuid if p not in self.user_dict
-                    ]
+    @classmethod
+    def _outage_wait(cls, error: Exception) -> float:
+        """Seconds to wait for the server if the error is of its outage, or None
+        if it is of the request"""
+        return outage_wait(error, cls.OUTAGE_PAUSE)
 
-                    def update_result(result):
-                        puuid, valid = result
-                        if valid:
-                            heapq.heappush(users_to_search, (0, puuid))
-                            user_record[puuid] = 0
+    def _record_search(self, search: _UserSearch):
+        active_at = None
+        if search.active:  # played in the window, by its end at the latest
+            active_at = min(search.end_timestamp or time.time(), time.time())
+        # calls failed by an outage are not counted against the user
+        calls = search.calls if search.outage is None else 0
+        self.scheduler.record_search(search.puuid, calls, search.collected, active_at)
 
-                    # for puuid in not_recorded_puuids:
-                    #     update_result(self.check_participant(puuid))
-                    utils.run_multithread(
-                        self.check_participant, not_recorded_puuids, update_result
-                    )
+    def _may_qualify(self, match_id: str) -> bool:
+        """False if another tier found the match abnormal or of a group not
+        collected"""
+        evaluation = self.match_registry.get(match_id)
+        return evaluation is None or any(map(evaluation.may_qualify, self.match_lists))
 
-                    if self.is_match_qualified(participants_puuid):
-                        match_progress_bar.update(1)
-                        self.matches_collected.add(match_id)
-                        game_per_user += 1
-                        collect_per_day += 1
-                        user_record[user_to_search] += 1
-                        utils.write_text(self.match_output, match_id + "\n", "a")
-                        if len(self.matches_collected) >= total_count:
-                            break
-                    else:
-                        self.invalid_matches.add(match_id)
-                        utils.write_text(
-                            self.invalid_match_output, match_id + "\n", "a"
-                        )
-        return user_record
+    def _listing_window(
+        self, puuid: str, start_timestamp: float, end_timestamp: float
+    ) -> tuple[float, float]:
+        """The window to list matches of the user in, after its cursor, or None
+        if the user was listed through the window"""
+        cursor = None if self.user_cursor is None else self.user_cursor.get(puuid)
+        if cursor is None or cursor <= start_timestamp:
+            return start_timestamp, end_timestamp
+        if end_timestamp is not None and cursor >= end_timestamp:
+            return None
+        return cursor, end_timestamp
 
-    def is_match_qualified(
-        self,
-        participants_puuid,
+    def _listed_until(self, end_timestamp: float, listed_at: float) -> float:
+        until = listed_at - self.CURSOR_LAG
+        return until if end_timestamp is None else min(end_timestamp, until)
+
+    def _advance_cursor(self, puuid: str, listed_until: float):
+        # high-water mark, windows before it are not listed again
+        if self.user_cursor is None:
+            return
+        if listed_until > self.user_cursor.get(puuid, 0):
+            self.user_cursor[puuid] = listed_until
+
+    def _take_results(self, results: queue.Queue) -> list[tuple]:
+        """Wait for a result and take the others queued with it"""
+        taken = [results.get()]
+        try:
+            while len(taken) < self.PIPELINE_QUEUE_SIZE:
+                taken.append(results.get_nowait())
+        except queue.Empty:
+            pass
+        return taken
+
+    def _qualify_candidates(
+        self, taken: Iterable[tuple], users_to_search: list, user_record: dict
     ):
-        win_rates = [
-            self.user_validity[p] for p in participants_puuid if p in self.user_validity
-        ]
-        win_result = [
-            (self.user_dict[p].win, self.user_dict[p].lose) for p in participants_puuid
+        """Record participants of the candidates taken, and qualify them for
+        the tier group of the sampler in one batch"""
+        candidates = [
+            item
+            for kind, _, item in taken
+            if kind == self.CANDIDATE
+            and self._record_candidate(item, users_to_search, user_record)
         ]
-        is_win_rate_valid = all(win_rates)
-        if not is_win_rate_valid:
-            logger.debug(f"win rate not valid: {win_rates}, {win_result}")
+        qualified = self.qualified_matches([c.participants_puuid for c in candidates])
+        for candidate, is_qualified in zip(candidates, qualified):
+            candidate.qualified = is_qualified
 
-        rank_numbers = sorted(
-            [self.user_dict[p].rank_number for p in participants_puuid]
-        )
-        is_all_in_group = all(
-            filter(
-                lambda x: self.tier_group.is_adjacent_rank(x),
-                rank_numbers,
-            )
-        )
-        is_median_in_group = (
-            TierGroup.get_from_rank_number(rank_numbers[4]) == self.tier_group
-            and TierGroup.get_from_rank_number(rank_numbers[5]) == self.tier_group
+    def _record_candidate(
+        self, candidate: _Candidate, users_to_search: list, user_record: dict
+    ) -> bool:
+        """Record participants of the match, and return whether every one of
+        them is known"""
+        for puuid, summoner_info in candidate.summoners.items():
+            if puuid in self.user_dict:  # recorded by another match meanwhile
+                continue
+            _, valid = self.record_participant(puuid, summoner_info)
+            if valid:
+                heapq.heappush(users_to_search, (self.scheduler.priority(puuid), puuid))
+                user_record[puuid] = 0
+        # failed to get some participants otherwise, may be searched again
+        return all(p in self.user_dict for p in candidate.participants_puuid)
+
+    def _judge_candidate(self, candidate: _Candidate):
+        """Return the tier group the match is qualified for, False if none, or
+        None if it can not be judged now"""
+        if candidate.qualified is None or self._is_settled(candidate.match_id):
+            return None
+        participants_puuid = candidate.participants_puuid
+        median_group = self.participant_index.median_group(participants_puuid)
+        self.match_registry.record(
+            candidate.match_id,
+            MatchEvaluation(
+                False,
+                median_group,
+                self.participant_index.all_valid(participants_puuid),
+            ),
         )
-        return is_win_rate_valid and is_all_in_group and is_median_in_group
+        if candidate.qualified:
+            return self.tier_group
+        self.invalid_matches.add(candidate.match_id)
+        self.invalid_match_writer.write(candidate.match_id)
+        return self._route_group(median_group, participants_puuid)
 
-    def check_participant(
-        self,
-        puuid: str,
-    ):
-        summoner_info = APIAccess.get_summoner_info_by_puuid(puuid)
+    def _route_group(self, median_group: str, participants_puuid: list[str]):
+        """The other tier group collected the match is qualified for, or False"""
+        for tier_group in self.route_groups:
+            if tier_group.name == median_group and self.participant_index.is_qualified(
+                tier_group, participants_puuid
+            ):
+                return tier_group
+        return False
+
+    def is_match_qualified(self, participants_puuid: list[str]) -> bool:
+        return self.qualified_matches([participants_puuid])[0]
+
+    def qualified_matches(self, matches: list[list[str]]) -> list[bool]:
+        """is_match_qualified of many matches at once"""
+        qualified = self.participant_index.qualified(self.tier_group, matches)
+        if logger.isEnabledFor(logging.DEBUG):
+            for participants_puuid, is_qualified in zip(matches, qualified):
+                if not is_qualified:
+                    logger.debug(
+                        f"match not qualified: "
+                        f"{self.participant_index.win_lose(participants_puuid)}"
+                    )
+        return qualified
+
+    def check_participants(self, puuids: list[str]) -> list[tuple[str, bool]]:
+        """Record participants and return whether each of them is to be searched.
+        Participants failed to get are not recorded."""
+        summoners = APIAccess.get_summoners_by_puuids(puuids)
+        return [
+            self.record_participant(puuid, summoner_info)
+            for puuid, summoner_info in summoners.items()
+        ]
+
+    def record_participant(
+        self, puuid: str, summoner_info: SummonerInfo
+    ) -> tuple[str, bool]:
         self.user_dict[puuid] = summoner_info  # puuid is not checked
         win_validity = MatchValidator.has_proper_win_lose(
             summoner_info.win, summoner_info.lose
         )
         self.user_validity[puuid] = win_validity
-        do_search = win_validity and summoner_info.tier_group == self.tier_group
+        self.participant_index.update(puuid)
+        do_search = win_validity and summoner_info.tier_group in self.match_lists
         return puuid, do_search
 
     @classmethod
@@ -212,13 +610,21 @@ class MatchSampler:
         start_time: int = None,
         end_time: int = None,
     ) -> list[str]:
-        result = APIAccess.get_recent_game_list(
-            puuid=puuid,
-            skip=skip,
-            count=count,
-            start_timestamp=start_time,
-            end_timestamp=end_time,
-        )
+        """Match IDs of the user, newest first, or None if failed to get them.
+        Errors of a server outage are raised, to search the user again later."""
+        try:
+            result = APIAccess.get_recent_game_list(
+                puuid=puuid,
+                skip=skip,
+                count=count,
+                start_timestamp=start_time,
+                end_timestamp=end_time,
+            )
+        except requests.RequestException as e:
+            if cls._outage_wait(e) is not None:
+                raise
+            logger.warning(f"Failed to get recent games of '{puuid}': {e}")
+            return None
         return result.get("matchIds", [])
         # return result
 
@@ -227,36 +633,142 @@ class MatchSampler:
         start_timestamp: int,
         end_timestamp: int,
         users_to_search: collections.deque,
+        workers: int = None,
     ):
-        MATCH_COUNT_MAX = 100
-        abnormal_match_count = 0
+        """Collect every valid match of the users with 'workers' threads.
+
+        Workers take users from a shared queue and fetch the matches of each
+        page concurrently. A match is claimed by one worker only, and this
+        thread is the single writer of the match lists. If the writer fails,
+        the workers are stopped and their results drained until each is done.
+        """
+        workers = workers or self.ALL_MATCH_WORKERS
+        users = queue.Queue()
         for puuid in users_to_search:
-            do = True
-            start_index = 0
-            while do:
-                match_list = self.get_recent_games(
-                    puuid=puuid,
-                    skip=start_index,
-                    count=MATCH_COUNT_MAX,
-                    start_time=start_timestamp,
-                    end_time=end_timestamp,
+            users.put(puuid)
+        results = queue.Queue(self.PIPELINE_QUEUE_SIZE)
+        claims = _MatchClaims(self.matches_collected, self.invalid_matches)
+        stop = threading.Event()  # set when the writer stops
+        abnormal_match_count = 0
+        with ThreadPoolExecutor(workers, thread_name_prefix="all-match") as executor:
+            for _ in range(workers):
+                executor.submit(
+                    self._collect_user_matches,
+                    users,
+                    results,
+                    claims,
+                    stop,
+                    start_timestamp,
+                    end_timestamp,
                 )
-                do = len(match_list) == MATCH_COUNT_MAX
-                start_index += MATCH_COUNT_MAX
-
-                for match_id in match_list:
-                    if (
-                        match_id in self.invalid_matches
-                        or match_id in self.matches_collected
-                    ):
-                        continue
-                    match_data = APIAccess.get_match_data(match_id)
-                    if MatchValidator.is_abnormal_match_info(match_data):
-                        self.invalid_matches.add(match_id)
-                        utils.write_text(
-                            self.invalid_match_output, match_id + "\n", "a"
-                        )
+            running = workers
+            try:
+                while running:
+                    kind, item = results.get()
+                    if kind == self.DONE:
+                        running -= 1
+                    elif kind == self.LISTED:
+                        self._advance_cursor(*item)
+                    elif kind == self.ABNORMAL:
+                        self.invalid_matches.add(item)
+                        self.invalid_match_writer.write(item)
+                        self.match_registry.record(item, MatchEvaluation(True))
                         abnormal_match_count += 1
+                    else:
+                        self.matches_collected.add(item)
+                        self.match_writer.write(item)
+            finally:
+                # release the workers waiting for a queue slot
+                stop.set()
+                while running:
+                    kind, _ = results.get()
+                    if kind == self.DONE:
+                        running -= 1
+                self.close()
+
+    def _collect_user_matches(
+        self,
+        users: queue.Queue,
+        results: queue.Queue,
+        claims: _MatchClaims,
+        stop: threading.Event,
+        start_timestamp: int,
+        end_timestamp: int,
+    ):
+        MATCH_COUNT_MAX = 100
+        outage_since: float = None
+        try:
+            while not stop.is_set():
+                try:
+                    puuid = users.get_nowait()
+                except queue.Empty:
+                    return
+                window = self._listing_window(puuid, start_timestamp, end_timestamp)
+                if window is None:  # listed through on an earlier run
+                    continue
+                try:
+                    listed_at = time.time()
+                    searched_through = True
+                    do = True
+                    start_index = 0
+                    while do:
+                        if stop.is_set():
+                            searched_through = False
+                            break
+                        match_list = self.get_recent_games(
+                            puuid=puuid,
+                            skip=start_index,
+                            count=MATCH_COUNT_MAX,
+                            start_time=window[0],
+                            end_time=window[1],
+                        )
+                        if match_list is None:
+                            searched_through = False
+                            break
+                        do = len(match_list) == MATCH_COUNT_MAX
+                        start_index += MATCH_COUNT_MAX
+
+                        match_ids = []
+                        for match_id in match_list:
+                            if not claims.claim(match_id):
+                                continue
+                            evaluation = self.match_registry.get(match_id)
+                            if evaluation is not None and evaluation.abnormal:
+                                # found abnormal by another tier
+                                results.put((self.ABNORMAL, match_id))
+                            else:
+                                match_ids.append(match_id)
+                        try:
+                            matches = APIAccess.get_matches_data(match_ids)
+                        except Exception:
+                            for match_id in match_ids:
+                                claims.release(match_id)
+                            raise
+                        for match_id in match_ids:
+                            match_data = matches.get(match_id)
+                            if match_data is None:
+                                # failed to get, may be found with another user
+                                claims.release(match_id)
+                                searched_through = False
+                            elif MatchValidator.is_abnormal_match_info(match_data):
+                                results.put((self.ABNORMAL, match_id))
+                            else:
+                                results.put((self.COLLECTED, match_id))
+                    if searched_through:
+                        listed_until = self._listed_until(window[1], listed_at)
+                        results.put((self.LISTED, (puuid, listed_until)))
+                    outage_since = None
+                except Exception as e:
+                    wait = self._outage_wait(e)
+                    if wait is None:
+                        logger.exception(f"Failed to collect matches of '{puuid}'")
                         continue
-                    self.matches_collected.add(match_id)
-                    utils.write_text(self.match_output, match_id + "\n", "a")
+                    now = time.monotonic()
+                    outage_since = outage_since or now
+                    if now - outage_since > self.MAX_OUTAGE:
+                        logger.error(f"Server unavailable for {self.MAX_OUTAGE}s")
+                        return
+                    users.put(puuid)  # collected again after the outage
+                    stop.wait(wait)
+        finally:
+            results.put((self.DONE, None))
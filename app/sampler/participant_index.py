@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from array import array
+
+from api_client.rank_table import MAX_RANK_NUMBER, TIER_GROUPS_BY_RANK_NUMBER, TierGroup
+from api_client.value_object import SummonerInfo
+
+try:  # qualifies many matches as array operations when installed
+    import numpy as np
+
+    # rank number -> value of its tier group
+    TIER_GROUP_VALUES = np.array([g.value for g in TIER_GROUPS_BY_RANK_NUMBER])
+except ImportError:
+    np = None
+
+
+class ParticipantIndex:
+    """Rank number, wins, losses and validity of users in arrays by user ID.
+
+    A user gets an integer ID on first use, when its values are read from
+    'user_dict' and 'user_validity'; 'update' reads them again after they
+    changed. Used by the single writer thread of a sampler.
+    """
+
+    UNKNOWN = -1  # validity of a user not checked
+    MIN_ARRAY_BATCH = 8  # smaller batches are qualified one by one
+
+    def __init__(
+        self, user_dict: dict[str, SummonerInfo], user_validity: dict[str, bool]
+    ):
+        self.user_dict = user_dict
+        self.user_validity = user_validity
+        self.ids: dict[str, int] = {}  # puuid -> user ID
+        self.rank_number = array("b")
+        self.win = array("l")
+        self.lose = array("l")
+        self.validity = array("b")
+
+    def id_of(self, puuid: str) -> int:
+        user_id = self.ids.get(puuid)
+        if user_id is None:
+            values = self._values(puuid)
+            user_id = self.ids[puuid] = len(self.rank_number)
+            for column, value in zip(self._columns(), values):
+                column.append(value)
+        return user_id
+
+    def _ids_of(self, puuids: list[str]) -> list[int]:
+        get = self.ids.get
+        ids = [get(p) for p in puuids]
+        if None in ids:
+            ids = [self.id_of(p) for p in puuids]
+        return ids
+
+    def update(self, puuid: str):
+        user_id = self.ids.get(puuid)
+        if user_id is None:
+            self.id_of(puuid)
+            return
+        for column, value in zip(self._columns(), self._values(puuid)):
+            column[user_id] = value
+
+    def _columns(self) -> tuple:
+        return self.rank_number, self.win, self.lose, self.validity
+
+    def _values(self, puuid: str) -> tuple:
+        summoner_info = self.user_dict[puuid]
+        valid = self.user_validity.get(puuid)
+        return (
+            summoner_info.rank_number,
+            summoner_info.win or 0,
+            summoner_info.lose or 0,
+            self.UNKNOWN if valid is None else int(valid),
+        )
+
+    def median_group(self, puuids: list[str]) -> str:
+        """Name of the tier group of the median two participants, or "" if they
+        are of different groups"""
+        rank_numbers = sorted([self.rank_number[i] for i in self._ids_of(puuids)])
+        groups = {
+            TierGroup.get_from_rank_number(r)
+            for r in rank_numbers[(len(rank_numbers) - 1) // 2 :][:2]
+        }
+        return groups.pop().name if len(groups) == 1 else ""
+
+    def all_valid(self, puuids: list[str]) -> bool:
+        return 0 not in [self.validity[i] for i in self._ids_of(puuids)]
+
+    def win_lose(self, puuids: list[str]) -> list[tuple[int, int]]:
+        return [(self.win[i], self.lose[i]) for i in map(self.id_of, puuids)]
+
+    def is_qualified(self, tier_group: TierGroup, puuids: list[str]) -> bool:
+        """Whether no participant has an invalid win rate, and the median two
+        of them are in the tier group"""
+        ids = self._ids_of(puuids)
+        validity = self.validity
+        if 0 in [validity[i] for i in ids]:
+            return False
+        rank_number = self.rank_number
+        rank_numbers = sorted([rank_number[i] for i in ids])
+        return (
+            TierGroup.get_from_rank_number(rank_numbers[4]) == tier_group
+            and TierGroup.get_from_rank_number(rank_numbers[5]) == tier_group
+        )
+
+    def qualified(self, tier_group: TierGroup, matches: list[list[str]]) -> list[bool]:
+        """is_qualified of many matches at once.
+
+        With numpy the rows of the participants of all the matches are read
+        into one array, which is sorted and checked by match at once.
+        """
+        size = len(matches[0]) if matches else 0
+        if (
+            np is None
+            or len(matches) < self.MIN_ARRAY_BATCH
+            or any(len(puuids) != size for puuids in matches)
+        ):
+            return [self.is_qualified(tier_group, puuids) for puuids in matches]
+        ids = np.array([self._ids_of(puuids) for puuids in matches], dtype=np.intp)
+        # views of the arrays are released before a user is added again
+        validity = np.frombuffer(self.validity, dtype=np.int8)[ids]
+        rank_numbers = np.frombuffer(self.rank_number, dtype=np.int8)[ids]
+        medians = np.sort(rank_numbers, axis=1)[:, 4:6]
+        groups = np.where(
+            (medians >= 0) & (medians <= MAX_RANK_NUMBER),
+            TIER_GROUP_VALUES[np.clip(medians, 0, MAX_RANK_NUMBER)],
+            TierGroup.U.value,
+        )
+        return (
+            (validity != 0).all(axis=1) & (groups == tier_group.value).all(axis=1)
+        ).tolist()
@@ -1,14 +1,17 @@
 import collections
+import itertools
 import logging
+from typing import Iterator
 import utils
-import json
-from app import APIAccess
+from tqdm import tqdm
+from app import APIAccess, AsyncAPIAccess
 from api_client.value_object import SummonerInfo
+from api_client.retry_policy import outage_wait
 from app.collector.tier_group import TierGroup
 from app.validator.match_validator import MatchValidator
+from app.sampler.user_store import UserStore
 from utils.patch import Patch
 from app.core.log_config import log_config
-import os
 import time
 
 log_config()
@@ -16,7 +19,16 @@ logger = logging.getLogger(__name__)
 
 
 class UserSampler:
-    def __init__(self, tier_group: TierGroup, save_file_directory: str) -> None:
+    LEAGUE_PAGE_SIZE = 205  # entries in a page of league-v4 entries
+    OUTAGE_PAUSE = 1  # seconds to wait at least when the server is unavailable
+    MAX_OUTAGE = 10 * 60  # seconds of outage after which sampling is given up
+
+    def __init__(
+        self,
+        tier_group: TierGroup,
+        save_file_directory: str,
+        user_store: UserStore = None,
+    ) -> None:
         self.version = Patch.get_current_version()
         self.user_dict: dict[str, SummonerInfo] = {}  # key: puuid
         self.user_validity: dict[str, bool] = {}  # key: puuid
@@ -24,49 +36,32 @@ class UserSampler:
         self.is_user_list_initialized = False
         self.is_user_validity_initialized = False
 
-        self.user_list_file = os.path.join(
-            save_file_directory, f"{tier_group.name}_user_list.txt"
-        )
-        self.user_validity_file = os.path.join(
-            save_file_directory, f"{tier_group.name}_user_validity.txt"
-        )
+        self.user_store = user_store or UserStore(save_file_directory, tier_group.name)
         self._initialize_user_dict()
 
     def _initialize_user_dict(self):
-        if not os.path.exists(self.user_list_file):
-            return
-        with open(self.user_list_file, "r") as f:
-            json_data = json.load(f)
-            self.user_dict = {
-                k: SummonerInfo.from_dict(v) for k, v in json_data.items()
-            }
-        self.is_user_list_initialized = True
-        if not os.path.exists(self.user_validity_file):
-            return
-        with open(self.user_validity_file, "r") as f:
-            self.user_validity = json.load(f)
-        self.is_user_validity_initialized = True
+        self.user_dict = self.user_store.load_summoners()
+        self.is_user_list_initialized = len(self.user_dict) > 0
+        self.user_validity = self.user_store.load_validity()
+        self.is_user_validity_initialized = len(self.user_validity) > 0
 
     def collect_all_user(self) -> collections.deque:
         logger.info(f"ALL '{self.tier_group.name}' USER COLLECTING")
         users_to_search = collections.deque()
         user_list = self.get_tier_group_user_list(self.tier_group)
 
-        utils.run_multithread(self.record_user, user_list)
+        self.record_users(user_list)
         users_to_search.extend(self.user_dict.keys())
 
-        with open(self.user_list_file, "w") as f:
-            json.dump({k: v.to_dict() for k, v in self.user_dict.items()}, f)
+        self.user_store.save_summoners(self.user_dict)
         return users_to_search
 
     def user_collecting(self, renew_sampling: bool = True) -> collections.deque:
         if not renew_sampling:
             if self.is_user_list_initialized:
-                logger.info(f"User input is initialized from {self.user_list_file}")
+                logger.info(f"User input is initialized from {self.user_store.path}")
                 users_to_search = collections.deque()
-                users_to_search.extend(
-                    [puuid for puuid, value in self.user_dict.items() if value]
-                )
+                users_to_search.extend(self.user_dict.keys())
         else:
             users_to_search = self.collect_all_user()
         return users_to_search
@@ -76,7 +71,7 @@ class UserSampler:
     ) -> collections.deque:
         if not renew_sampling:
             if self.is_user_validity_initialized:
-                logger.info(f"User input is initialized from {self.user_list_file}")
+                logger.info(f"User input is initialized from {self.user_store.path}")
                 users_to_search = collections.deque()
                 users_to_search.extend(
                     [puuid for puuid, valid in self.user_validity.items() if valid]
@@ -86,7 +81,7 @@ class UserSampler:
 
         logger.info(f"'{self.tier_group.name}' USER SAMPLING")
         users_to_search = collections.deque()
-        user_list = self.get_tier_group_user_list(self.tier_group, user_count)
+        user_list = self.iter_tier_group_users(self.tier_group, user_count)
 
         def update_result(puuid):
             user = self.user_dict[puuid]
@@ -95,27 +90,52 @@ class UserSampler:
             if valid:
                 users_to_search.append(puuid)
 
-        utils.run_multithread(
-            self.record_user,
-            user_list,
-            update_result,
-            use_tqdm=True,
-            tqdm_decs=f"{self.tier_group.name} user to research",
-        )
-        with open(self.user_list_file, "w") as f:
-            json.dump(
-                {k: v.to_dict() for k, v in self.user_dict.items()},
-                f,
-                separators=(",", ":"),
-            )
-        with open(self.user_validity_file, "w") as f:
-            json.dump(self.user_validity, f, separators=(",", ":"))
+        with tqdm(
+            total=user_count, desc=f"{self.tier_group.name} user to research"
+        ) as progress_bar:
+            # resolve each page of users while the next page is fetched
+            for users in utils.iter_chunks(user_list, self.LEAGUE_PAGE_SIZE):
+                for puuid in self.record_users(users):
+                    update_result(puuid)
+                progress_bar.update(len(users))
+        self.user_store.save_summoners(self.user_dict)
+        self.user_store.save_validity(self.user_validity)
         return users_to_search
 
     # 'user' is a dictionary with summoner ID and name, tier, wins, loses
     def record_user(self, user: dict) -> str:
         puuid = APIAccess.get_puuid_by_summoner_id(user["summonerId"])
-        self.user_dict[puuid] = SummonerInfo(
+        return self._add_user(puuid, user)
+
+    def record_users(self, users: list[dict]) -> list[str]:
+        """Resolve puuids of users at once and record them,
+        leaving out the users failed to resolve.
+        During an outage of the server, they are resolved again after a pause."""
+        outage_since: float = None
+        while True:
+            try:
+                puuids = AsyncAPIAccess.run(
+                    AsyncAPIAccess.get_puuids_by_summoner_ids(
+                        u["summonerId"] for u in users
+                    )
+                )
+                break
+            except Exception as e:
+                wait = outage_wait(e, self.OUTAGE_PAUSE)
+                now = time.monotonic()
+                outage_since = outage_since or now
+                if wait is None or now - outage_since > self.MAX_OUTAGE:
+                    raise
+                logger.warning(f"Server unavailable to resolve users: {e}")
+                time.sleep(wait)
+        return [
+            self._add_user(puuids[user["summonerId"]], user)
+            for user in users
+            if user["summonerId"] in puuids
+        ]
+
+    def _add_user(self, puuid: str, user: dict) -> str:
+        summoner_info = SummonerInfo(
             puuid=puuid,
             summoner_id=user["summonerId"],
             name=user["summonerName"],
@@ -126,69 +146,103 @@ class UserSampler:
             lose=user["losses"],
             written_timestamp=time.time(),
         )
+        self.user_dict[puuid] = summoner_info
+        # league entries are as fresh as a summoner lookup
+        APIAccess.cache_summoner(summoner_info)
         return puuid
 
     @classmethod
-    def get_both_user_list(
+    def iter_both_user_list(
         cls, tier: str, division_1: str, division_2: str, user_count: int
-    ):
+    ) -> Iterator[dict]:
         half = user_count // 2
-        return cls.get_user_list(tier, division_1, half) + cls.get_user_list(
-            tier, division_2, user_count - half
+        return itertools.chain(
+            cls.iter_user_list(tier, division_1, half),
+            cls.iter_user_list(tier, division_2, user_count - half),
         )
 
     @classmethod
     def get_user_list(cls, tier: str, division: str, user_count: int):
-        user_ids = []
-        user_list = []
+        return list(cls.iter_user_list(tier, division, user_count))
+
+    @classmethod
+    def iter_user_list(
+        cls, tier: str, division: str, user_count: int
+    ) -> Iterator[dict]:
+        """Yield up to 'user_count' distinct league entries page by page,
+        fetching the next page while the current one is consumed.
+        Stops at an empty page or once 'user_count' entries are yielded."""
+        if user_count < 1:
+            return
+        user_ids = set()
         page = 1
-        while len(user_list) < user_count:
-            user_info = APIAccess.get_summoners_in_tier(tier, division, page)
-            for summoner in user_info:
-                if summoner["summonerId"] not in user_ids:
-                    user_list.append(summoner)
-                    user_ids.append(summoner["summonerId"])
-            page += 1
-        return user_list[:user_count]
+        next_page = APIAccess.executor.submit(
+            APIAccess.get_summoners_in_tier, tier, division, page
+        )
+        try:
+            while True:
+                user_info = next_page.result()
+                if not user_info:
+                    return
+                page += 1
+                next_page = APIAccess.executor.submit(
+                    APIAccess.get_summoners_in_tier, tier, division, page
+                )
+                for summoner in user_info:
+                    if summoner["summonerId"] in user_ids:
+                        continue
+                    user_ids.add(summoner["summonerId"])
+                    yield summoner
+                    if len(user_ids) >= user_count:
+                        return
+        finally:
+            next_page.cancel()
 
     @classmethod
     def get_tier_group_user_list(
         cls, tier_group: TierGroup, user_count: int = 408
     ) -> list:
+        return list(cls.iter_tier_group_users(tier_group, user_count))
+
+    @classmethod
+    def iter_tier_group_users(
+        cls, tier_group: TierGroup, user_count: int = 408
+    ) -> Iterator[dict]:
         if user_count < 1:
-            return []
+            return iter([])
         if tier_group == TierGroup.C1:
-            return APIAccess.get_summoners_in_tier("CHALLENGER", "I")
+            return iter(APIAccess.get_summoners_in_tier("CHALLENGER", "I"))
         elif tier_group == TierGroup.GM1:
-            return APIAccess.get_summoners_in_tier("GRANDMASTER", "I")
+            return iter(APIAccess.get_summoners_in_tier("GRANDMASTER", "I"))
         elif tier_group == TierGroup.A:
-            return APIAccess.get_summoners_in_tier(
-                "CHALLENGER", "I"
-            ) + APIAccess.get_summoners_in_tier("GRANDMASTER", "I")
+            return iter(
+                APIAccess.get_summoners_in_tier("CHALLENGER", "I")
+                + APIAccess.get_summoners_in_tier("GRANDMASTER", "I")
+            )
         elif tier_group == TierGroup.M1:
-            return APIAccess.get_summoners_in_tier("MASTER", "I")
+            return iter(APIAccess.get_summoners_in_tier("MASTER", "I"))
         elif tier_group == TierGroup.D12:
-            return cls.get_both_user_list("DIAMOND", "I", "II", user_count)
+            return cls.iter_both_user_list("DIAMOND", "I", "II", user_count)
         elif tier_group == TierGroup.D34:
-            return cls.get_both_user_list("DIAMOND", "III", "IV", user_count)
+            return cls.iter_both_user_list("DIAMOND", "III", "IV", user_count)
         elif tier_group == TierGroup.P12:
-            return cls.get_both_user_list("PLATINUM", "I", "II", user_count)
+            return cls.iter_both_user_list("PLATINUM", "I", "II", user_count)
         elif tier_group == TierGroup.P34:
-            return cls.get_both_user_list("PLATINUM", "III", "IV", user_count)
+            return cls.iter_both_user_list("PLATINUM", "III", "IV", user_count)
         elif tier_group == TierGroup.G12:
-            return cls.get_both_user_list("GOLD", "I", "II", user_count)
+            return cls.iter_both_user_list("GOLD", "I", "II", user_count)
         elif tier_group == TierGroup.G34:
-            return cls.get_both_user_list("GOLD", "III", "IV", user_count)
+            return cls.iter_both_user_list("GOLD", "III", "IV", user_count)
         elif tier_group == TierGroup.S12:
-            return cls.get_both_user_list("SILVER", "I", "II", user_count)
+            return cls.iter_both_user_list("SILVER", "I", "II", user_count)
         elif tier_group == TierGroup.S34:
-            return cls.get_both_user_list("SILVER", "III", "IV", user_count)
+            return cls.iter_both_user_list("SILVER", "III", "IV", user_count)
         elif tier_group == TierGroup.B12:
-            return cls.get_both_user_list("BRONZE", "I", "II", user_count)
+            return cls.iter_both_user_list("BRONZE", "I", "II", user_count)
         elif tier_group == TierGroup.B34:
-            return cls.get_both_user_list("BRONZE", "III", "IV", user_count)
+            return cls.iter_both_user_list("BRONZE", "III", "IV", user_count)
         elif tier_group == TierGroup.I12:
-            return cls.get_both_user_list("IRON", "I", "II", user_count)
+            return cls.iter_both_user_list("IRON", "I", "II", user_count)
         elif tier_group == TierGroup.I34:
-            return cls.get_both_user_list("IRON", "III", "IV", user_count)
-        return []
+            return cls.iter_both_user_list("IRON", "III", "IV", user_count)
+        return iter([])
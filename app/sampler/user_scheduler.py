@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable, NamedTuple
+
+from api_client.rank_table import (
+    ADJACENT_RANK_MASKS,
+    MAX_RANK_NUMBER,
+    TIER_GROUPS_BY_RANK_NUMBER,
+    TierGroup,
+)
+from api_client.value_object import SummonerInfo
+
+
+class UserYield(NamedTuple):
+    calls: int = 0  # API calls spent searching the user
+    collected: int = 0  # matches collected from the user
+    active_at: float = 0  # end of the latest window the user played in
+
+
+class UserScheduler:
+    """Priority of users to search, lower first as in 'heapq'.
+
+    A user scores its yield, matches collected per API call, decayed by the
+    time since the user last played and weighed by how close its rank is to
+    the tier groups collected. Yields are kept in 'user_yield' by the writer
+    thread, to be saved with the other records of the users.
+    """
+
+    # a user not searched yet counts as collected PRIOR_COLLECTED in PRIOR_CALLS
+    PRIOR_COLLECTED = 1
+    PRIOR_CALLS = 4
+    IDLE_HALF_LIFE = 7 * 24 * 60 * 60  # seconds
+    # weight of a user in, adjacent to and far from a tier group collected
+    IN_GROUP = 1.0
+    ADJACENT = 0.5
+    FAR = 0.1
+
+    def __init__(
+        self,
+        tier_groups: Iterable[TierGroup],
+        user_dict: dict[str, SummonerInfo],
+        user_yield: dict[str, UserYield],
+    ):
+        self.tier_groups = list(tier_groups)
+        self.user_dict = user_dict
+        self.user_yield = user_yield
+
+    def priority(self, puuid: str, now: float = None) -> float:
+        return -self.score(puuid, now)
+
+    def score(self, puuid: str, now: float = None) -> float:
+        calls, collected, active_at = self.user_yield.get(puuid, UserYield())
+        rate = (collected + self.PRIOR_COLLECTED) / (calls + self.PRIOR_CALLS)
+        if active_at:
+            idle = max(0.0, (now or time.time()) - active_at)
+            rate *= 0.5 ** (idle / self.IDLE_HALF_LIFE)
+        return rate * self.proximity(puuid)
+
+    def proximity(self, puuid: str) -> float:
+        summoner_info = self.user_dict.get(puuid)
+        if (
+            summoner_info is None
+            or not 0 < summoner_info.rank_number <= MAX_RANK_NUMBER
+        ):
+            return self.FAR
+        rank_number = summoner_info.rank_number
+        if TIER_GROUPS_BY_RANK_NUMBER[rank_number] in self.tier_groups:
+            return self.IN_GROUP
+        if any(
+            ADJACENT_RANK_MASKS[g.value] >> rank_number & 1 for g in self.tier_groups
+        ):
+            return self.ADJACENT
+        return self.FAR
+
+    def record_search(
+        self, puuid: str, calls: int, collected: int, active_at: float = None
+    ):
+        """Add a search of the user, 'active_at' if it listed any game"""
+        before = self.user_yield.get(puuid, UserYield())
+        self.user_yield[puuid] = UserYield(
+            before.calls + calls,
+            before.collected + collected,
+            max(before.active_at, active_at or 0),
+        )
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, MutableMapping
+
+from api_client.value_object import SummonerInfo
+from app.sampler.user_scheduler import UserYield
+
+
+class ChangeTrackingDict(dict):
+    """dict remembering the keys set since the last save"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed: set = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.changed.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+
+class LazySummonerDict(MutableMapping):
+    """Summoners by puuid, each read from the store when first used.
+
+    Every puuid in the store is known at once, so membership and length need
+    no reads. Like ChangeTrackingDict, it remembers the keys set since the
+    last save.
+    """
+
+    def __init__(self, store: UserStore, puuids: Iterable[str]):
+        self.store = store
+        # None until the summoner is read from the store
+        self._entries: dict[str, SummonerInfo] = dict.fromkeys(puuids)
+        self.changed: set = set()
+
+    def __getitem__(self, puuid: str) -> SummonerInfo:
+        summoner_info = self._entries[puuid]
+        if summoner_info is None:
+            summoner_info = self.store.get_summoner(puuid)
+            if summoner_info is None:
+                raise KeyError(puuid)
+            self._entries[puuid] = summoner_info
+        return summoner_info
+
+    def __setitem__(self, puuid: str, summoner_info: SummonerInfo):
+        self._entries[puuid] = summoner_info
+        self.changed.add(puuid)
+
+    def __delitem__(self, puuid: str):
+        del self._entries[puuid]
+        self.changed.discard(puuid)
+
+    def __contains__(self, puuid) -> bool:
+        return puuid in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class UserStore:
+    """Users of a tier group kept in a SQLite file, saved by changes only.
+
+    The validity of summoners, how many matches were collected from each of
+    them, until when their matches were listed and their yields are loaded into
+    ChangeTrackingDicts. Summoners are loaded into a LazySummonerDict, reading
+    each of them only when used. Saving one writes only the entries changed
+    since it was loaded or saved. JSON files written by earlier versions are imported
+    when the store is empty.
+    """
+
+    SUMMONERS = "summoners"
+    VALIDITY = "validity"
+    RECORDS = "records"
+    CURSORS = "cursors"
+    YIELDS = "yields"
+
+    def __init__(self, directory: str, name: str):
+        self.path = os.path.join(directory, f"{name}_users.sqlite3")
+        self.legacy_files = {
+            self.SUMMONERS: os.path.join(directory, f"{name}_user_list.txt"),
+            self.VALIDITY: os.path.join(directory, f"{name}_user_validity.txt"),
+            self.RECORDS: os.path.join(directory, f"{name}_user_record.txt"),
+        }
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # opened on first use, must be called with the lock
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for table in (
+                self.SUMMONERS,
+                self.VALIDITY,
+                self.RECORDS,
+                self.CURSORS,
+                self.YIELDS,
+            ):
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(puuid TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+            self._conn.commit()
+            self._import_legacy_files()
+        return self._conn
+
+    def _import_legacy_files(self):
+        for table, path in self.legacy_files.items():
+            if not os.path.exists(path):
+                continue
+            if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                continue
+            with open(path, "r") as f:
+                entries = json.load(f)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} VALUES (?, ?)",
+                [(k, json.dumps(v, separators=(",", ":"))) for k, v in entries.items()],
+            )
+            self._conn.commit()
+
+    def _load(self, table: str, convert=lambda value: value) -> ChangeTrackingDict:
+        with self._lock:
+            rows = self.conn.execute(f"SELECT puuid, value FROM {table}").fetchall()
+        return ChangeTrackingDict(
+            (puuid, convert(json.loads(value))) for puuid, value in rows
+        )
+
+    def _save(self, table: str, entries: dict, convert=lambda value: value):
+        changed = getattr(entries, "changed", None)
+        if changed is not None:
+            keys = [k for k in changed if k in entries]
+        else:
+            keys = list(entries)
+        rows = [
+            (k, json.dumps(convert(entries[k]), separators=(",", ":"))) for k in keys
+        ]
+        with self._lock:
+            self.conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?)", rows)
+            self.conn.commit()
+        if changed is not None:
+            changed.clear()
+
+    def load_summoners(self) -> LazySummonerDict:
+        with self._lock:
+            rows = self.conn.execute(f"SELECT puuid FROM {self.SUMMONERS}").fetchall()
+        return LazySummonerDict(self, (puuid for (puuid,) in rows))
+
+    def save_summoners(self, user_dict: dict[str, SummonerInfo]):
+        self._save(self.SUMMONERS, user_dict, SummonerInfo.to_dict)
+
+    def load_validity(self) -> ChangeTrackingDict:
+        return self._load(self.VALIDITY)
+
+    def save_validity(self, user_validity: dict[str, bool]):
+        self._save(self.VALIDITY, user_validity)
+
+    def load_records(self) -> ChangeTrackingDict:
+        return self._load(self.RECORDS)
+
+    def save_records(self, user_record: dict[str, int]):
+        self._save(self.RECORDS, user_record)
+
+    def load_cursors(self) -> ChangeTrackingDict:
+        return self._load(self.CURSORS)
+
+    def save_cursors(self, user_cursor: dict[str, float]):
+        self._save(self.CURSORS, user_cursor)
+
+    def load_yields(self) -> ChangeTrackingDict:
+        return self._load(self.YIELDS, lambda value: UserYield(*value))
+
+    def save_yields(self, user_yield: dict[str, UserYield]):
+        self._save(self.YIELDS, user_yield, list)
+
+    def get_summoner(self, puuid: str) -> SummonerInfo:
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT value FROM {self.SUMMONERS} WHERE puuid = ?", (puuid,)
+            ).fetchone()
+        return SummonerInfo.from_dict(json.loads(row[0])) if row else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
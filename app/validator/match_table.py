@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import operator
+from typing import Sequence
+
+import numpy as np
+
+from api_client.value_object import MatchInfo
+
+
+class MatchTable:
+    """Participants of many matches in one row per participant, by column.
+
+    'match_row' is the index of the match of each participant, so a per match
+    column such as 'duration' is spread to the participants by
+    'duration[match_row]'.
+    """
+
+    # column -> (participant field, dtype)
+    PARTICIPANT_COLUMNS = {
+        "win": ("win", bool),
+        "gold_spent": ("goldSpent", np.int64),
+        "champion_name": ("championName", object),
+        "team_position": ("teamPosition", object),
+        "summoner1_id": ("summoner1Id", np.int64),
+        "summoner2_id": ("summoner2Id", np.int64),
+        "total_minions": ("totalMinionsKilled", np.int64),
+        "neutral_minions": ("neutralMinionsKilled", np.int64),
+        "deaths": ("deaths", np.int64),
+    }
+
+    def __init__(self, match_infos: Sequence[MatchInfo]):
+        self.match_count = len(match_infos)
+        self.duration = np.array([m.duration for m in match_infos], dtype=np.float64)
+        self.match_row = np.repeat(
+            np.arange(self.match_count), [len(m.participants) for m in match_infos]
+        )
+        participants = [p for m in match_infos for p in m.participants]
+        for name, (field, dtype) in self.PARTICIPANT_COLUMNS.items():
+            column = np.fromiter(
+                map(operator.itemgetter(field), participants),
+                dtype=dtype,
+                count=len(participants),
+            )
+            setattr(self, name, column)
+
+    def any_by_match(self, mask: np.ndarray) -> np.ndarray:
+        """Whether the mask is set for any participant of each match"""
+        matched = np.zeros(self.match_count, dtype=bool)
+        matched[self.match_row[mask]] = True
+        return matched
@@ -1,9 +1,39 @@
+from typing import Iterator, Optional, Sequence
+
 import utils.time_converter
 from api_client.value_object import MatchInfo
 from utils.patch import Patch
 
+try:  # checks the rules of many matches as array operations when installed
+    import numpy as np
+
+    from app.validator.match_table import MatchTable
+except ImportError:
+    MatchTable = None
+
 
 class MatchValidator:
+    MIN_LENGTH = 20 * 60  # shorter matches are surrendered early
+    MAX_TROLL_GOLD_SPENT = 2500  # by a loser
+    SMITE_ID = 11
+    MAX_DEATH_PER_MINUTE = 0.5
+
+    # abnormal match rules, in the order they are reported
+    EARLY_SURRENDER = "early_surrender"
+    LOW_GOLD_SPENT = "low_gold_spent"
+    YUUMI_NOT_SUPPORT = "yuumi_not_support"
+    SMITE_POSITION = "smite_position"  # smite out of jungle or jungle without it
+    JUNGLE_MINIONS = "jungle_minions"  # more lane minions than jungle or reverse
+    DEATHS = "deaths"
+    ABNORMAL_RULES = (
+        EARLY_SURRENDER,
+        LOW_GOLD_SPENT,
+        YUUMI_NOT_SUPPORT,
+        SMITE_POSITION,
+        JUNGLE_MINIONS,
+        DEATHS,
+    )
+
     def get_valid_start_end_timestamp(
         start_date: str, end_date: str, format: str, timezone_offset: float
     ) -> tuple:
@@ -36,40 +66,96 @@ class MatchValidator:
 
     def is_abnormal_match_info(match_info: MatchInfo) -> bool:
         # 조기종료
-        MIN_LENGTH = 20 * 60
-        if match_info.duration <= MIN_LENGTH:
+        if match_info.duration <= MatchValidator.MIN_LENGTH:
             return True
         # Troll
+        return any(
+            next(MatchValidator._broken_rules(p, match_info.duration), None)
+            for p in match_info.participants
+        )
+
+    def find_abnormal_rule(match_info: MatchInfo) -> Optional[str]:
+        """The first of ABNORMAL_RULES the match breaks, None when it is normal"""
+        if match_info.duration <= MatchValidator.MIN_LENGTH:
+            return MatchValidator.EARLY_SURRENDER
+        broken = set()
         for participant_info in match_info.participants:
-            if participant_info["goldSpent"] <= 2500 and not participant_info["win"]:
-                return True
-            if participant_info["championName"] == "Yuumi":
-                if participant_info["teamPosition"] != "UTILITY":
-                    return True
-            SMITE_ID = 11
-            if participant_info["teamPosition"] == "JUNGLE":
-                if (
-                    participant_info["summoner1Id"] != SMITE_ID
-                    and participant_info["summoner2Id"] != SMITE_ID
-                ):
-                    return True
-                if (
-                    participant_info["totalMinionsKilled"]
-                    > participant_info["neutralMinionsKilled"]
-                ):
-                    return True
-            else:
-                if (
-                    participant_info["summoner1Id"] == SMITE_ID
-                    or participant_info["summoner2Id"] == SMITE_ID
-                ):
-                    return True
-                if (
-                    participant_info["totalMinionsKilled"]
-                    < participant_info["neutralMinionsKilled"]
-                ):
-                    return True
-            death_per_minute = participant_info["deaths"] / (match_info.duration / 60)
-            if death_per_minute >= 0.5:
-                return True
-        return False
+            broken.update(
+                MatchValidator._broken_rules(participant_info, match_info.duration)
+            )
+        return next((r for r in MatchValidator.ABNORMAL_RULES if r in broken), None)
+
+    def find_abnormal_rules(match_infos: Sequence[MatchInfo]) -> list[Optional[str]]:
+        """find_abnormal_rule of many matches at once.
+
+        With numpy the participants of all the matches are put in one
+        MatchTable and every rule is checked for them as an array operation.
+        """
+        if MatchTable is None or not match_infos:
+            return [MatchValidator.find_abnormal_rule(m) for m in match_infos]
+        table = MatchTable(match_infos)
+        duration = table.duration[table.match_row]
+        is_jungle = table.team_position == "JUNGLE"
+        has_smite = (table.summoner1_id == MatchValidator.SMITE_ID) | (
+            table.summoner2_id == MatchValidator.SMITE_ID
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            death_per_minute = table.deaths / (duration / 60)
+        masks = {
+            MatchValidator.LOW_GOLD_SPENT: (
+                (table.gold_spent <= MatchValidator.MAX_TROLL_GOLD_SPENT) & ~table.win
+            ),
+            MatchValidator.YUUMI_NOT_SUPPORT: (
+                (table.champion_name == "Yuumi") & (table.team_position != "UTILITY")
+            ),
+            MatchValidator.SMITE_POSITION: is_jungle != has_smite,
+            MatchValidator.JUNGLE_MINIONS: np.where(
+                is_jungle,
+                table.total_minions > table.neutral_minions,
+                table.total_minions < table.neutral_minions,
+            ),
+            MatchValidator.DEATHS: (
+                death_per_minute >= MatchValidator.MAX_DEATH_PER_MINUTE
+            ),
+        }
+        rules = np.full(table.match_count, None, dtype=object)
+        # later rules are overwritten by the earlier ones
+        for rule in reversed(MatchValidator.ABNORMAL_RULES[1:]):
+            rules[table.any_by_match(masks[rule])] = rule
+        rules[table.duration <= MatchValidator.MIN_LENGTH] = (
+            MatchValidator.EARLY_SURRENDER
+        )
+        return rules.tolist()
+
+    def _broken_rules(participant_info: dict, duration: int) -> Iterator[str]:
+        if (
+            participant_info["goldSpent"] <= MatchValidator.MAX_TROLL_GOLD_SPENT
+            and not participant_info["win"]
+        ):
+            yield MatchValidator.LOW_GOLD_SPENT
+        if participant_info["championName"] == "Yuumi":
+            if participant_info["teamPosition"] != "UTILITY":
+                yield MatchValidator.YUUMI_NOT_SUPPORT
+        has_smite = MatchValidator.SMITE_ID in (
+            participant_info["summoner1Id"],
+            participant_info["summoner2Id"],
+        )
+        if participant_info["teamPosition"] == "JUNGLE":
+            if not has_smite:
+                yield MatchValidator.SMITE_POSITION
+            if (
+                participant_info["totalMinionsKilled"]
+                > participant_info["neutralMinionsKilled"]
+            ):
+                yield MatchValidator.JUNGLE_MINIONS
+        else:
+            if has_smite:
+                yield MatchValidator.SMITE_POSITION
+            if (
+                participant_info["totalMinionsKilled"]
+                < participant_info["neutralMinionsKilled"]
+            ):
+                yield MatchValidator.JUNGLE_MINIONS
+        death_per_minute = participant_info["deaths"] / (duration / 60)
+        if death_per_minute >= MatchValidator.MAX_DEATH_PER_MINUTE:
+            yield MatchValidator.DEATHS
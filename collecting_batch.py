@@ -6,8 +6,11 @@ sys.path.append(os.getcwd())
 import requests
 import datetime
 from utils.patch import Patch
+from app import APIAccess
 from app.core.log_config import log_config
-from app.collector.match_collector import MatchCollector, TierGroup
+from app.core.config import settings
+from app.collector.match_collector import TierGroup
+from app.collector.tier_scheduler import TierScheduler
 
 DOWNLOAD_SERVER = "http://121.78.136.227:8002/ai/download/v1/match/list"
 SAVE_FILE_FOLDER = "save_files"
@@ -31,26 +34,41 @@ tier_list = [
     # TierGroup.D34,
     # TierGroup.M1,
 ]
-# collect tier match
+if settings.API_RATE_LIMITS:
+    # one budget of requests for every tier collected concurrently
+    APIAccess.set_rate_limits(APIAccess.GATEWAY_SERVER, settings.API_RATE_LIMITS)
+# collect tier match and Apex match concurrently
+scheduler = TierScheduler(max_parallel=settings.MAX_PARALLEL_TIERS)
 for tier_group in tier_list:
-    collector = MatchCollector(tier_group=tier_group)
-    collector.collect_tier_match(
-        count_to_collect=MATCH_PER_DAY,
-        user_count=USER_COUNT,
-        start_date="2022-12-7",
-        end_date="2022-12-29",
+    scheduler.add(
+        tier_group,
+        lambda collector: collector.collect_tier_match(
+            count_to_collect=MATCH_PER_DAY,
+            user_count=USER_COUNT,
+            start_date="2022-12-7",
+            end_date="2022-12-29",
+        ),
     )
-    logger.info(f"Tier: {tier_group} complete collecting")
-# collect Apex match
-collector = MatchCollector(TierGroup.A)
-collector.collect_all_match(start_date="2022-12-28", end_date="2022-12-29")
-logger.info(f"Tier: {TierGroup.A} complete collecting")
+# Apex collection searches every user, so it starts first
+scheduler.add(
+    TierGroup.A,
+    lambda collector: collector.collect_all_match(
+        start_date="2022-12-28", end_date="2022-12-29"
+    ),
+    priority=1,
+)
+errors = scheduler.run()
+failed_tiers = [tier_group for tier_group, e in errors.items() if e is not None]
+if failed_tiers:
+    logger.error(f"Tiers: {failed_tiers} failed collecting, not to be uploaded")
 
 current_version = Patch.get_current_version()
 # request to download server
 tier_list.append(TierGroup.A)
 
 for tier_group in tier_list:
+    if tier_group in failed_tiers:
+        continue
     logger.info(f"Tier: {tier_group} - Starting to post request to download server")
     file_dir = os.path.join(
         os.getcwd(),
@@ -100,3 +118,6 @@ if (
                 logger.warning(
                     f"Tier {tier_group} is lacking {MIN_PATCH_PER_MATCH - count} files"
                 )
+
+if failed_tiers:
+    sys.exit(1)
@@ -8,7 +8,9 @@ import requests
 sys.path.append(os.getcwd())
 
 from app import APIAccess
-from app.collector.match_collector import MatchCollector, TierGroup
+from app.collector.match_collector import TierGroup
+from app.collector.tier_scheduler import TierScheduler
+from app.core.config import settings
 from app.core.log_config import log_config
 from utils.patch import Patch
 
@@ -34,26 +36,41 @@ tier_list = [
     TierGroup.D34,
     TierGroup.M1,
 ]
-# collect tier match
+if settings.API_RATE_LIMITS:
+    # one budget of requests for every tier collected concurrently
+    APIAccess.set_rate_limits(APIAccess.GATEWAY_SERVER, settings.API_RATE_LIMITS)
+# collect tier match and Apex match concurrently
+scheduler = TierScheduler(max_parallel=settings.MAX_PARALLEL_TIERS)
 for tier_group in tier_list:
-    collector = MatchCollector(tier_group=tier_group)
-    collector.collect_tier_match(
-        count_to_collect=MATCH_PER_DAY,
-        user_count=USER_COUNT,
-        is_daily_collect=True,
-        renew_sampling=False,
+    scheduler.add(
+        tier_group,
+        lambda collector: collector.collect_tier_match(
+            count_to_collect=MATCH_PER_DAY,
+            user_count=USER_COUNT,
+            is_daily_collect=True,
+            renew_sampling=False,
+        ),
     )
-    logger.info(f"Tier: {tier_group} complete collecting")
-# collect Apex match
-collector = MatchCollector(TierGroup.A)
-collector.collect_all_match(is_daily_collect=True, renew_sampling=False)
-logger.info(f"Tier: {TierGroup.A} complete collecting")
+# Apex collection searches every user, so it starts first
+scheduler.add(
+    TierGroup.A,
+    lambda collector: collector.collect_all_match(
+        is_daily_collect=True, renew_sampling=False
+    ),
+    priority=1,
+)
+errors = scheduler.run()
+failed_tiers = [tier_group for tier_group, e in errors.items() if e is not None]
+if failed_tiers:
+    logger.error(f"Tiers: {failed_tiers} failed collecting, not to be uploaded")
 
 current_version = Patch.get_current_version()
 tier_list = []
 # request to download server
 tier_list.append(TierGroup.A)
 for tier_group in tier_list:
+    if tier_group in failed_tiers:
+        continue
     logger.info(f"Tier: {tier_group} - Starting to post request to download server")
     file_dir = os.path.join(
         os.getcwd(),
@@ -107,3 +124,6 @@ if (
                 )
             else:
                 logger.info(f"Tier: {tier_group} currently has {count} matches")
+
+if failed_tiers:
+    sys.exit(1)
@@ -0,0 +1,151 @@
+"""Time rank and tier group lookups of the rank table against if/elif chains
+
+$ python scripts/rank_table_benchmark.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.append(os.getcwd())
+
+from api_client.rank_table import TierGroup, rank_to_number
+
+RANKS = [
+    (tier, division)
+    for tier in ("IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "DIAMOND")
+    for division in ("I", "II", "III", "IV")
+] + [("MASTER", "I"), ("GRANDMASTER", "I"), ("CHALLENGER", "I"), ("", "")]
+NUMBERS = list(range(-1, 29))
+
+
+def chain_rank_to_number(tier: str, division: str) -> int:
+    index = 0
+    if division == "II":
+        index = -1
+    elif division == "III":
+        index = -2
+    elif division == "IV":
+        index = -3
+    if tier == "IRON":
+        index += 4 * 1
+    elif tier == "BRONZE":
+        index += 4 * 2
+    elif tier == "SILVER":
+        index += 4 * 3
+    elif tier == "GOLD":
+        index += 4 * 4
+    elif tier == "PLATINUM":
+        index += 4 * 5
+    elif tier == "DIAMOND":
+        index += 4 * 6
+    elif tier == "MASTER":
+        index += 4 * 6 + 1
+    elif tier == "GRANDMASTER":
+        index += 4 * 6 + 2
+    elif tier == "CHALLENGER":
+        index += 4 * 6 + 3
+    return index
+
+
+def chain_get_from_rank_number(rank_number: int) -> TierGroup:
+    if rank_number <= 0:
+        return TierGroup.U
+    elif rank_number <= 2:
+        return TierGroup.I34
+    elif rank_number <= 4:
+        return TierGroup.I12
+    elif rank_number <= 6:
+        return TierGroup.B34
+    elif rank_number <= 8:
+        return TierGroup.B12
+    elif rank_number <= 10:
+        return TierGroup.S34
+    elif rank_number <= 12:
+        return TierGroup.S12
+    elif rank_number <= 14:
+        return TierGroup.G34
+    elif rank_number <= 16:
+        return TierGroup.G12
+    elif rank_number <= 18:
+        return TierGroup.P34
+    elif rank_number <= 20:
+        return TierGroup.P12
+    elif rank_number <= 22:
+        return TierGroup.D34
+    elif rank_number <= 24:
+        return TierGroup.D12
+    elif rank_number == 25:
+        return TierGroup.M1
+    elif rank_number == 26:
+        return TierGroup.GM1
+    elif rank_number == 27:
+        return TierGroup.C1
+    return TierGroup.U
+
+
+def chain_is_adjacent_rank(group: TierGroup, rank_number: int) -> bool:
+    if group == TierGroup.I34:
+        return rank_number in range(1, 4)
+    elif group == TierGroup.I12:
+        return rank_number in range(2, 6)
+    elif group == TierGroup.B34:
+        return rank_number in range(4, 8)
+    elif group == TierGroup.B12:
+        return rank_number in range(6, 10)
+    elif group == TierGroup.S34:
+        return rank_number in range(8, 12)
+    elif group == TierGroup.S12:
+        return rank_number in range(10, 14)
+    elif group == TierGroup.G34:
+        return rank_number in range(12, 16)
+    elif group == TierGroup.G12:
+        return rank_number in range(14, 18)
+    elif group == TierGroup.P34:
+        return rank_number in range(16, 20)
+    elif group == TierGroup.P12:
+        return rank_number in range(18, 22)
+    elif group == TierGroup.D34:
+        return rank_number in range(20, 24)
+    elif group == TierGroup.D12:
+        return rank_number in range(22, 26)
+    elif group == TierGroup.M1:
+        return rank_number in range(24, 28)
+    elif group == TierGroup.GM1:
+        return rank_number in range(25, 28)
+    elif group == TierGroup.C1:
+        return rank_number in range(25, 28)
+    return False
+
+
+def run(name: str, chain, table, repeat: int):
+    chain_time = min(timeit.repeat(chain, number=repeat, repeat=5))
+    table_time = min(timeit.repeat(table, number=repeat, repeat=5))
+    print(
+        f"{name:<24} chain {chain_time * 1e3:8.1f} ms  table {table_time * 1e3:8.1f} ms"
+        f"  x{chain_time / table_time:4.1f}"
+    )
+
+
+if __name__ == "__main__":
+    REPEAT = 10_000
+    groups = list(TierGroup)
+    get_from_rank_number = TierGroup.get_from_rank_number
+    run(
+        "rank_to_number",
+        lambda: [chain_rank_to_number(t, d) for t, d in RANKS],
+        lambda: [rank_to_number(t, d) for t, d in RANKS],
+        REPEAT,
+    )
+    run(
+        "get_from_rank_number",
+        lambda: [chain_get_from_rank_number(r) for r in NUMBERS],
+        lambda: [get_from_rank_number(r) for r in NUMBERS],
+        REPEAT,
+    )
+    run(
+        "is_adjacent_rank",
+        lambda: [chain_is_adjacent_rank(g, r) for g in groups for r in NUMBERS],
+        lambda: [g.is_adjacent_rank(r) for g in groups for r in NUMBERS],
+        REPEAT // 10,
+    )
@@ -0,0 +1,36 @@
+"""Check the matches of a match list file again with the current abnormal rules
+
+Matches still valid are written next to the list, with ".revalidated" added.
+
+$ python scripts/revalidate_match_list.py save_files/D12_match_list.txt
+"""
+
+import collections
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from app import APIAccess
+from app.validator.match_validator import MatchValidator
+
+CHUNK_SIZE = 1000  # matches checked at once
+
+if __name__ == "__main__":
+    path = sys.argv[1]
+    with open(path, "r") as f:
+        match_ids = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    broken_rules = collections.Counter()
+    valid_ids = []
+    for i in range(0, len(match_ids), CHUNK_SIZE):
+        matches = APIAccess.get_matches_data(match_ids[i : i + CHUNK_SIZE])
+        rules = MatchValidator.find_abnormal_rules(list(matches.values()))
+        for match_id, rule in zip(matches, rules):
+            broken_rules[rule] += 1
+            if rule is None:
+                valid_ids.append(match_id)
+    with open(path + ".revalidated", "w") as f:
+        f.writelines(f"{match_id}\n" for match_id in valid_ids)
+    print(f"{len(match_ids) - sum(broken_rules.values())} matches not found")
+    for rule, count in broken_rules.most_common():
+        print(f"{rule or 'valid'}: {count}")
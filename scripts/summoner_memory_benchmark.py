@@ -0,0 +1,103 @@
+"""Memory and load time of summoners loaded from a user list
+
+$ python scripts/summoner_memory_benchmark.py [summoner count]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+sys.path.append(os.getcwd())
+
+from api_client.summoner_table import SummonerTable
+from api_client.value_object import SummonerInfo, TierGroup
+
+TIERS = ["IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "DIAMOND"]
+DIVISIONS = ["I", "II", "III", "IV"]
+
+
+@dataclass
+class DictSummonerInfo:
+    """The former layout of SummonerInfo: an object with __dict__ and the tier
+    group computed at creation"""
+
+    puuid: str
+    summoner_id: str
+    name: str
+    tier: str = ""
+    division: str = ""
+    tier_group: TierGroup = field(init=False)
+    lp: int = 0
+    win: int = 0
+    lose: int = 0
+    written_timestamp: float = 0
+
+    def __post_init__(self):
+        self.tier_group = TierGroup.get_from_rank(self.tier, self.division)
+
+    @classmethod
+    def from_dict(cls, dict_data: dict):
+        return cls(
+            puuid=dict_data.get("puuid"),
+            summoner_id=dict_data.get("summoner_id"),
+            name=dict_data.get("name"),
+            tier=dict_data.get("tier"),
+            division=dict_data.get("division"),
+            lp=dict_data.get("lp"),
+            win=dict_data.get("win"),
+            lose=dict_data.get("lose"),
+            written_timestamp=dict_data.get("written_time"),
+        )
+
+
+def make_user_list(count: int) -> list[dict]:
+    # a string object for each summoner as parsed from a file, not counted as loaded
+    return [
+        {
+            "puuid": f"puuid-{i:070d}",
+            "summoner_id": f"summoner-{i:050d}",
+            "name": f"name{i}",
+            "tier": "".join(TIERS[i % len(TIERS)]),
+            "division": "".join(DIVISIONS[i % len(DIVISIONS)]),
+            "lp": i % 100,
+            "win": i % 300,
+            "lose": i % 280,
+            "written_time": 1672000000.0 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(name: str, load, user_list: list[dict]):
+    started = time.perf_counter()
+    load(user_list)
+    elapsed = time.perf_counter() - started
+    # measured apart from the time, which tracemalloc slows down
+    tracemalloc.start()
+    loaded = load(user_list)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<28} {size / 2**20:8.1f} MiB {size / len(user_list):8.0f} B/summoner"
+        f" {elapsed:8.2f} s"
+    )
+    return loaded
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    user_list = make_user_list(count)
+    print(f"{count} summoners")
+    measure(
+        "dict of SummonerInfo (old)",
+        lambda users: {u["puuid"]: DictSummonerInfo.from_dict(u) for u in users},
+        user_list,
+    )
+    measure(
+        "dict of SummonerInfo",
+        lambda users: {u["puuid"]: SummonerInfo.from_dict(u) for u in users},
+        user_list,
+    )
+    measure("SummonerTable", SummonerTable.from_dicts, user_list)
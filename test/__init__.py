@@ -0,0 +1,4 @@
+from app.core import log_config
+
+# tests log to stdout only, not to match_gathering.log of the collection
+log_config.LOGGING_CONFIG["handlers"]["file"] = {"class": "logging.NullHandler"}
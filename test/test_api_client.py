@@ -0,0 +1,298 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+import aiohttp
+import requests
+
+import app  # api_client modules are imported through "app" first
+from api_client.api_client import APIClient
+from api_client.async_riot_api_client import AsyncRiotAPIClient
+from api_client.internal_riot_api_client import InternalRiotAPIClient
+from api_client.match_cache import MatchCache
+from api_client.rate_limiter import RateLimiter
+from api_client.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+from api_client.value_object import MATCH_FIELDS, PARTICIPANT_FIELDS
+from app.validator.match_validator import MatchValidator
+from utils.worker_pool import WorkerPool
+
+MATCH_DETAIL_FILE = os.path.join("test", "data", "match_detail_KR_5889814856.json")
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        if self.path.endswith("/match/v5/matches/KR_5889814856"):
+            with open(MATCH_DETAIL_FILE, "rb") as f:
+                body = f.read()
+        elif "/league/v4/challengerleagues/" in self.path:
+            body = json.dumps({"entries": [{"summonerId": "a"}]}).encode()
+        elif "/summoner/v4/summoners/" in self.path:
+            summoner_id = self.path.rsplit("/", 1)[-1]
+            body = json.dumps({"puuid": f"puuid-{summoner_id}"}).encode()
+        else:
+            body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServerTestCase(unittest.TestCase):
+    handler = JsonHandler
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PooledSessionTest(LocalServerTestCase):
+    def test_when_requests_sent_serially_then_connection_is_reused(self):
+        client = APIClient()
+        for i in range(5):
+            response = client.get_request(f"{self.base_url}/{i}")
+            self.assertEqual(response.json()["path"], f"/{i}")
+        self.assertEqual(
+            client.connection_stats.to_dict(),
+            {"opened": 1, "reused": 4, "requests": 5},
+        )
+        client.close()
+
+    def test_when_pool_maxsize_given_then_connections_are_bounded(self):
+        client = APIClient(pool_maxsize=2)
+        threads = [
+            threading.Thread(target=client.get_request, args=(self.base_url,))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(client.connection_stats.opened, 2)
+        self.assertEqual(client.connection_stats.requests, 8)
+        client.close()
+
+
+class MatchCacheClientTest(LocalServerTestCase):
+    def test_when_match_is_cached_then_it_is_fetched_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = InternalRiotAPIClient("KR")
+            client.GATEWAY_SERVER = f"{self.base_url}/gateway/v2/lol"
+            client.match_cache = MatchCache(
+                os.path.join(directory, "match.sqlite3"), 1024**2
+            )
+            first = client.get_match_data("KR_5889814856")
+            second = client.get_match_data("KR-5889814856")
+            self.assertEqual(first, second)
+            self.assertEqual(client.connection_stats.requests, 1)
+            client.match_cache.close()
+            client.close()
+
+    def test_when_match_received_then_keep_selected_fields_only(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = InternalRiotAPIClient("KR")
+            client.GATEWAY_SERVER = f"{self.base_url}/gateway/v2/lol"
+            client.match_cache = MatchCache(
+                os.path.join(directory, "match.sqlite3"), 1024**2
+            )
+            match_info = client.get_match_data("KR_5889814856")
+            self.assertEqual(match_info.game_id, 5889814856)
+            for participant in match_info.participants:
+                self.assertEqual(set(participant), set(PARTICIPANT_FIELDS))
+            cached = client.match_cache.get(client.MATCH, "KR_5889814856")
+            self.assertEqual(set(cached), set(MATCH_FIELDS) | {"participants"})
+            self.assertTrue(MatchValidator.is_abnormal_match_info(match_info))
+            client.match_cache.close()
+            client.close()
+
+
+class BulkRequestTest(LocalServerTestCase):
+    def test_when_summoner_ids_given_then_return_puuids_by_summoner_id(self):
+        client = InternalRiotAPIClient("KR")
+        client.GATEWAY_SERVER_WITH_PLATFORM = f"{self.base_url}/gateway/v2/KR/lol"
+        summoner_ids = ["1", "2", "3", "2"]
+        self.assertEqual(
+            client.get_puuids_by_summoner_ids(summoner_ids),
+            {"1": "puuid-1", "2": "puuid-2", "3": "puuid-3"},
+        )
+        self.assertEqual(client.connection_stats.requests, 3)
+        client.close()
+
+
+class SharedWorkerPoolTest(unittest.TestCase):
+    def test_when_worker_pool_set_then_send_requests_in_it(self):
+        client = APIClient()
+        client.worker_pool = WorkerPool(2, thread_name_prefix="test-pool")
+        self.addCleanup(client.worker_pool.shutdown)
+        threads = client._request_concurrently(
+            lambda key: threading.current_thread().name, range(6)
+        )
+        self.assertTrue(all(t.startswith("test-pool") for t in threads.values()))
+        self.assertEqual(client.worker_pool.to_dict()["completed"], 6)
+        self.assertIsNone(client._executor)
+
+    def test_when_app_imported_then_api_access_shares_worker_pool(self):
+        from utils.worker_pool import shared_worker_pool
+
+        self.assertIs(app.APIAccess.executor, shared_worker_pool)
+
+
+class BulkRequestErrorTest(unittest.TestCase):
+    def request(self, key):
+        if key == "missing":
+            raise requests.HTTPError(response=SimpleNamespace(status_code=404))
+        if key == "unavailable":
+            raise requests.HTTPError(response=SimpleNamespace(status_code=503))
+        return f"result-{key}"
+
+    async def async_request(self, key):
+        return self.request(key)
+
+    def test_when_request_failed_then_leave_key_out(self):
+        client = APIClient()
+        self.addCleanup(client.close)
+        self.assertEqual(
+            client._request_concurrently(self.request, ["a", "missing"]),
+            {"a": "result-a"},
+        )
+
+    def test_when_server_unavailable_then_raise_for_caller_to_back_off(self):
+        client = APIClient()
+        self.addCleanup(client.close)
+        with self.assertRaises(requests.HTTPError):
+            client._request_concurrently(self.request, ["a", "unavailable"])
+        async_client = AsyncRiotAPIClient(InternalRiotAPIClient("KR"))
+        self.addCleanup(async_client.close)
+        with self.assertRaises(requests.HTTPError):
+            async_client.run(
+                async_client._request_concurrently(
+                    self.async_request, ["a", "unavailable"]
+                )
+            )
+
+
+class RateLimitsTest(unittest.TestCase):
+    def test_when_rate_limits_set_then_share_them_across_methods_of_host(self):
+        client = APIClient(rate_limiter=RateLimiter(clock=lambda: 0))
+        client.set_rate_limits("http://host/gateway/v2/lol", "2:1")
+        waits = [client.rate_limiter.reserve("host", f"/method/{i}") for i in range(3)]
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertGreater(waits[2], 0)
+        self.assertEqual(client.rate_limiter.reserve("other", "/method/0"), 0)
+
+
+class AsyncRiotAPIClientTest(LocalServerTestCase):
+    def setUp(self):
+        super().setUp()
+        client = InternalRiotAPIClient("KR")
+        client.GATEWAY_SERVER = f"{self.base_url}/gateway/v2/lol"
+        client.GATEWAY_SERVER_WITH_PLATFORM = f"{self.base_url}/gateway/v2/KR/lol"
+        self.async_client = AsyncRiotAPIClient(client, max_concurrency=4)
+
+    def tearDown(self):
+        self.async_client.close()
+        super().tearDown()
+
+    def test_when_match_id_given_then_return_match_info(self):
+        match_info = self.async_client.run(
+            self.async_client.get_match_data("KR_5889814856")
+        )
+        self.assertEqual(match_info.game_id, 5889814856)
+        self.assertEqual(len(match_info.participants_puuid), 10)
+
+    def test_when_apex_tier_given_then_tier_is_added_to_entries(self):
+        entries = self.async_client.run(
+            self.async_client.get_summoners_in_tier("CHALLENGER", "I")
+        )
+        self.assertEqual(entries, [{"summonerId": "a", "tier": "CHALLENGER"}])
+
+    def test_when_summoner_ids_given_then_resolve_them_at_once(self):
+        self.assertEqual(
+            self.async_client.run(
+                self.async_client.get_puuids_by_summoner_ids(["1", "2", "1"])
+            ),
+            {"1": "puuid-1", "2": "puuid-2"},
+        )
+
+    def test_when_match_requested_then_access_cache_off_event_loop(self):
+        threads = []
+
+        def record_thread(*args):
+            threads.append(threading.current_thread().name)
+
+        client = self.async_client.client
+        with mock.patch.object(
+            client, "_get_cached_match", side_effect=lambda *args: record_thread()
+        ), mock.patch.object(client, "_cache_match", side_effect=record_thread):
+            self.async_client.run(self.async_client.get_match_data("KR_5889814856"))
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn("riot-api-loop", threads)
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+    URI = "http://host/lol/match/v5/matches/KR_1"
+
+    def setUp(self):
+        self.now = 0.0
+        self.policy = RetryPolicy(
+            failure_threshold=1, recovery_time=10, clock=lambda: self.now
+        )
+        self.client = InternalRiotAPIClient("KR")
+        self.client.rate_limiter = RateLimiter()
+        self.client.retry_policy = self.policy
+        self.addCleanup(self.client.close)
+        # open the circuit, and let a probe through
+        self.policy.record_failure("host")
+        self.now = 10
+
+    def assert_circuit_recovers(self):
+        self.assertEqual(self.policy.circuit_state("host"), CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenError, self.policy.before_request, "host", "/m")
+        self.now = 20
+        ok = SimpleNamespace(status_code=200, headers={}, url=self.URI)
+        self.assertIs(self.client._http_request(self.URI, lambda uri, **_: ok), ok)
+        self.assertEqual(self.policy.circuit_state("host"), CircuitBreaker.CLOSED)
+
+    def test_when_probe_raises_not_connection_error_then_circuit_opens_again(self):
+        def request(uri, **kwargs):
+            raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+        self.assertRaises(
+            requests.exceptions.ChunkedEncodingError,
+            self.client._http_request,
+            self.URI,
+            request,
+        )
+        self.assert_circuit_recovers()
+
+    def test_when_async_probe_raises_payload_error_then_circuit_opens_again(self):
+        async_client = AsyncRiotAPIClient(self.client)
+        self.addCleanup(async_client.close)
+        error = aiohttp.ClientPayloadError("response payload is not completed")
+        with mock.patch.object(async_client, "_send", side_effect=error):
+            self.assertRaises(
+                requests.RequestException,
+                async_client.run,
+                async_client.get_request(self.URI),
+            )
+        self.assert_circuit_recovers()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import time
+import unittest
+
+from utils.line_writer import BufferedLineWriter
+
+
+class BufferedLineWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "match_list.txt")
+
+    def read_lines(self) -> list[str]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_when_max_lines_gathered_then_write_them_at_once(self):
+        writer = BufferedLineWriter(self.path, max_lines=3, max_delay=60)
+        self.addCleanup(writer.close)
+        writer.write("KR_1")
+        writer.write("KR_2")
+        self.assertEqual(self.read_lines(), [])
+        writer.write("KR_3")
+        writer.write("KR_4")
+        self.assertEqual(self.read_lines(), ["KR_1", "KR_2", "KR_3"])
+        self.assertEqual(writer.flushes, 1)
+
+    def test_when_max_delay_passed_then_write_buffered_lines(self):
+        writer = BufferedLineWriter(self.path, max_lines=100, max_delay=0.05)
+        self.addCleanup(writer.close)
+        writer.write("KR_1")
+        deadline = time.monotonic() + 5
+        while not self.read_lines() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.read_lines(), ["KR_1"])
+
+    def test_when_closed_then_write_rest_and_append_on_next_write(self):
+        with open(self.path, "w") as f:
+            f.write("KR_0\n")
+        with BufferedLineWriter(self.path, max_delay=60) as writer:
+            writer.write("KR_1")
+        self.assertEqual(self.read_lines(), ["KR_0", "KR_1"])
+        writer.write("KR_2")
+        writer.close()
+        self.assertEqual(self.read_lines(), ["KR_0", "KR_1", "KR_2"])
+
+    def test_when_fsync_policy_not_valid_then_raise_error(self):
+        self.assertRaises(ValueError, BufferedLineWriter, self.path, fsync="always")
+
+
+if __name__ == "__main__":
+    unittest.main()
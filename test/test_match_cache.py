@@ -0,0 +1,69 @@
+import os
+import tempfile
+import sqlite3
+import unittest
+from unittest import mock
+
+from api_client.match_cache import MatchCache
+
+
+class MatchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache", "match.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_when_match_put_then_get_same_data_after_reopen(self):
+        cache = MatchCache(self.path, max_bytes=1024**2)
+        self.assertIsNone(cache.get("match", "KR_1"))
+        cache.put("match", "KR_1", {"gameId": 1, "participants": [{"puuid": "a"}]})
+        cache.close()
+
+        cache = MatchCache(self.path, max_bytes=1024**2)
+        self.assertEqual(
+            cache.get("match", "KR_1"), {"gameId": 1, "participants": [{"puuid": "a"}]}
+        )
+        self.assertIsNone(cache.get("timeline", "KR_1"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+    def test_when_size_exceeded_then_least_recently_used_are_evicted(self):
+        cache = MatchCache(self.path, max_bytes=1024**2)
+        data = {"payload": os.urandom(4096).hex()}
+        cache.put("match", "KR_1", data)
+        entry_size = cache.size
+        cache.close()
+
+        cache = MatchCache(self.path, max_bytes=entry_size * 3)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, entry_size)
+        cache.put("match", "KR_2", data)
+        cache.put("match", "KR_3", data)
+        cache.get("match", "KR_1")  # KR_2 becomes the least recently used
+        cache.put("match", "KR_4", data)
+        self.assertLessEqual(cache.size, entry_size * 3)
+        self.assertIsNone(cache.get("match", "KR_2"))
+        self.assertIsNotNone(cache.get("match", "KR_1"))
+        self.assertIsNotNone(cache.get("match", "KR_4"))
+        cache.close()
+
+    def test_when_hit_then_write_access_time_in_batches(self):
+        def accessed() -> float:
+            with sqlite3.connect(self.path) as conn:
+                return conn.execute("SELECT accessed FROM match_cache").fetchone()[0]
+
+        cache = MatchCache(self.path, max_bytes=1024**2)
+        with mock.patch("api_client.match_cache.time.time", return_value=100.0):
+            cache.put("match", "KR_1", {"gameId": 1})
+        with mock.patch("api_client.match_cache.time.time", return_value=200.0):
+            for _ in range(MatchCache.MAX_PENDING):
+                cache.get("match", "KR_1")
+        self.assertEqual(accessed(), 100.0)  # one match is buffered once
+        cache.close()
+        self.assertEqual(accessed(), 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.sampler.match_index import MatchIndex
+
+
+class MatchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "A_match_list.txt")
+
+    def write_lines(self, *lines: str, mode: str = "a"):
+        with open(self.path, mode) as f:
+            f.writelines(f"{line}\n" for line in lines)
+
+    def test_when_list_given_then_contain_its_ids(self):
+        self.write_lines("KR_3", "KR_1", "EUW1_2")
+        index = MatchIndex(self.path)
+        self.assertIn("KR_1", index)
+        self.assertIn("EUW1_2", index)
+        self.assertNotIn("KR_2", index)
+        self.assertEqual(index, {"KR_1", "KR_3", "EUW1_2"})
+
+    def test_when_saved_then_map_index_and_read_lines_appended_after(self):
+        self.write_lines("KR_3", "KR_1", "EUW1_2")
+        MatchIndex(self.path).save()
+        self.write_lines("KR_2")
+
+        index = MatchIndex(self.path)
+        self.assertIsInstance(index._numbers, memoryview)
+        self.assertEqual(index, {"KR_1", "KR_2", "KR_3", "EUW1_2"})
+        index.discard("KR_3")
+        index.add("KR_4")
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index, {"KR_1", "KR_2", "KR_4", "EUW1_2"})
+
+    def test_when_saved_again_then_replace_index_not_mapped(self):
+        self.write_lines("KR_3", "KR_1")
+        index = MatchIndex(self.path)
+        index.save()
+        self.assertIsInstance(index._numbers, memoryview)
+        replace = os.replace
+
+        def replace_unmapped(src, dst):
+            # Windows can not replace a file mapped
+            self.assertIsNone(index._mapped)
+            replace(src, dst)
+
+        self.write_lines("KR_2")
+        index.add("KR_2")
+        with mock.patch("os.replace", replace_unmapped):
+            index.save()
+        self.assertIsInstance(index._numbers, memoryview)
+        self.assertEqual(list(index._numbers), [1, 2, 3])
+        self.assertEqual(MatchIndex(self.path), {"KR_1", "KR_2", "KR_3"})
+
+    def test_when_list_rewritten_then_not_use_saved_index(self):
+        self.write_lines("KR_1", "KR_2")
+        MatchIndex(self.path).save()
+        self.write_lines("KR_5", mode="w")
+        self.assertEqual(MatchIndex(self.path), {"KR_5"})
+
+    def test_when_list_rewritten_to_same_size_then_not_use_saved_index(self):
+        self.write_lines("KR_1", "KR_2")
+        MatchIndex(self.path).save()
+        saved = os.stat(self.path).st_mtime_ns
+        self.write_lines("KR_7", "KR_8", mode="w")
+        os.utime(self.path, ns=(saved + 10**9, saved + 10**9))
+        self.assertEqual(MatchIndex(self.path), {"KR_7", "KR_8"})
+
+        MatchIndex(self.path).save()
+        self.write_lines("KR_1", "KR_2", "KR_3", mode="w")
+        self.assertEqual(MatchIndex(self.path), {"KR_1", "KR_2", "KR_3"})
+
+    def test_when_id_not_written_to_list_then_keep_it_in_memory_only(self):
+        self.write_lines("KR_1", "EUW1_1")
+        index = MatchIndex(self.path)
+        index.add("KR_2")
+        index.add("EUW1_2")
+        index.save()
+        self.assertEqual(index, {"KR_1", "KR_2", "EUW1_1", "EUW1_2"})
+        self.assertEqual(list(index._numbers), [1])
+        self.assertEqual(MatchIndex(self.path), {"KR_1", "EUW1_1"})
+
+    def test_when_opened_again_then_share_index(self):
+        index = MatchIndex.open(self.path)
+        index.add("KR_1")
+        self.assertIs(MatchIndex.open(self.path), index)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+
+from app.collector.tier_group import TierGroup
+from app.sampler.match_registry import MatchEvaluation, MatchRegistry
+
+
+class MatchRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def open_registry(self) -> MatchRegistry:
+        registry = MatchRegistry(self.directory.name)
+        self.addCleanup(registry.close)
+        return registry
+
+    def test_when_flushed_then_get_in_another_registry(self):
+        registry = self.open_registry()
+        registry.record("KR_1", MatchEvaluation(True))
+        registry.record("KR_2", MatchEvaluation(False, "G12", True))
+        self.assertEqual(registry.get("KR_1"), MatchEvaluation(True))
+        registry.flush()
+
+        registry = self.open_registry()
+        self.assertEqual(registry.get("KR_1"), MatchEvaluation(True))
+        self.assertEqual(registry.get("KR_2"), MatchEvaluation(False, "G12", True))
+        self.assertIsNone(registry.get("KR_3"))
+
+    def test_when_evaluated_then_qualify_only_for_median_group(self):
+        evaluation = MatchEvaluation(False, "G12", True)
+        self.assertTrue(evaluation.may_qualify(TierGroup.G12))
+        self.assertFalse(evaluation.may_qualify(TierGroup.G34))
+        self.assertFalse(MatchEvaluation(False, "", True).may_qualify(TierGroup.G12))
+        self.assertFalse(
+            MatchEvaluation(False, "G12", False).may_qualify(TierGroup.G12)
+        )
+        self.assertFalse(MatchEvaluation(True).may_qualify(TierGroup.G12))
+        self.assertTrue(MatchEvaluation(False).may_qualify(TierGroup.G12))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,414 @@
+import collections
+import queue
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+
+from api_client.value_object import SummonerInfo
+from app import APIAccess
+from app.collector.tier_group import TierGroup
+from api_client.retry_policy import CircuitOpenError
+from app.sampler.match_sampler import MatchSampler, _Candidate
+from app.sampler.participant_index import ParticipantIndex
+from app.validator.match_validator import MatchValidator
+
+
+class MatchSamplingPipelineTest(unittest.TestCase):
+    FORMAT = "%Y-%m-%d"
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.G12,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+            user_cursor={},
+        )
+        self.abnormal = set()
+        self.listed = []
+        self.fetched = []
+        self.outage = []  # errors raised by the next listings
+        patches = [
+            mock.patch.object(MatchSampler, "get_recent_games", self.recent_games),
+            mock.patch.object(APIAccess, "get_match_data", self.match_data),
+            mock.patch.object(APIAccess, "get_summoners_by_puuids", self.summoners),
+            mock.patch.object(
+                MatchValidator,
+                "is_abnormal_match_info",
+                lambda match: match.game_id in self.abnormal,
+            ),
+            mock.patch.object(
+                MatchSampler, "qualified_matches", lambda _, m: [True] * len(m)
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def recent_games(self, puuid, count, skip=0, start_time=None, end_time=None):
+        if self.outage:
+            raise self.outage.pop()
+        self.listed.append((puuid, start_time))
+        return [f"{puuid}_{start_time}_{i}" for i in range(5)]
+
+    def match_data(self, match_id):
+        self.fetched.append(match_id)
+        participants = [f"{match_id}_p{i}" for i in range(10)]
+        return SimpleNamespace(
+            game_id=match_id, version="12.23.1", participants_puuid=participants
+        )
+
+    def summoners(self, puuids):
+        return {p: SummonerInfo(p, p, p, "GOLD", "I", win=50, lose=50) for p in puuids}
+
+    def resolve_participants_in_silver(self):
+        # participants out of the tier group are not searched
+        silver = lambda puuids: {
+            p: SummonerInfo(p, p, p, "SILVER", "I", win=50, lose=50) for p in puuids
+        }
+        patch = mock.patch.object(APIAccess, "get_summoners_by_puuids", silver)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def sample(self, users: list[str], count_to_collect: int, days: int) -> dict:
+        user_record = {puuid: 0 for puuid in users}
+        return self.sampler.match_sampling(
+            count_to_collect=count_to_collect,
+            start_timestamp=0,
+            end_timestamp=86400,
+            users_to_search=[(0, puuid) for puuid in users],
+            user_record=user_record,
+            days=days,
+            format=self.FORMAT,
+        )
+
+    def test_when_sampling_then_keep_quota_per_user_and_day(self):
+        user_record = self.sample(["a", "b", "c"], count_to_collect=4, days=1)
+        self.assertEqual(len(self.sampler.matches_collected), 4)
+        self.assertEqual(sum(user_record.values()), 4)
+        for collected in user_record.values():
+            self.assertLessEqual(collected, MatchSampler.MAX_GAME_PER_USER)
+        with open(self.sampler.match_output) as f:
+            self.assertEqual(set(f.read().splitlines()), self.sampler.matches_collected)
+
+    def test_when_user_searched_then_record_its_yield(self):
+        self.resolve_participants_in_silver()
+        self.sample(["a"], count_to_collect=2, days=1)
+        calls, collected, active_at = self.sampler.user_yield["a"]
+        # listing, 2 matches and their 20 participants at least
+        self.assertGreaterEqual(calls, 23)
+        self.assertEqual(collected, 2)
+        self.assertEqual(active_at, 86400)
+
+    def test_when_user_done_then_fetch_no_more_matches(self):
+        self.resolve_participants_in_silver()
+        self.sample(["a"], count_to_collect=10, days=1)
+        self.assertEqual(self.fetched, ["a_0_0", "a_0_1", "a_0_2"])
+
+    def test_when_candidates_queued_then_qualify_them_in_one_batch(self):
+        results = queue.Queue()
+        candidates = []
+        for i in range(3):
+            participants = [f"m{i}_p{j}" for j in range(10)]
+            candidates.append(
+                _Candidate(f"m{i}", participants, self.summoners(participants))
+            )
+            results.put((MatchSampler.CANDIDATE, None, candidates[-1]))
+        results.put((MatchSampler.DONE, None, None))
+        batches = []
+        qualified_matches = lambda _, m: batches.append(m) or [True] * len(m)
+        with mock.patch.object(MatchSampler, "qualified_matches", qualified_matches):
+            taken = self.sampler._take_results(results)
+            self.sampler._qualify_candidates(taken, [], {})
+        self.assertEqual(len(taken), 4)
+        self.assertEqual(batches, [[c.participants_puuid for c in candidates]])
+        self.assertEqual([c.qualified for c in candidates], [True, True, True])
+
+    def test_when_day_is_full_then_search_next_day(self):
+        users = [f"user{i}" for i in range(40)]
+        self.sample(users, count_to_collect=2, days=3)
+        self.assertEqual(len(self.sampler.matches_collected), 6)
+        # match IDs end with the start of the day searched and an index
+        days = collections.Counter(
+            m.rsplit("_", 2)[1] for m in self.sampler.matches_collected
+        )
+        self.assertEqual(list(days.values()), [2, 2, 2])
+
+    def test_when_match_abnormal_then_mark_invalid(self):
+        self.abnormal = {f"a_0_{i}" for i in range(5)}
+        self.sample(["a"], count_to_collect=3, days=1)
+        self.assertEqual(self.sampler.invalid_matches, self.abnormal)
+        self.assertEqual(len(self.sampler.matches_collected), 0)
+
+    def test_when_match_evaluated_by_another_tier_then_not_fetched_again(self):
+        self.resolve_participants_in_silver()
+        self.abnormal = {"a_0_1"}
+        self.sample(["a"], count_to_collect=3, days=1)
+        gold = set(self.sampler.matches_collected)
+        self.assertEqual(len(gold), 3)
+
+        self.fetched.clear()
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.G34,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+        )
+        self.sample(["a"], count_to_collect=3, days=1)
+        # the median of the matches evaluated for G12 is S12, or one is abnormal
+        self.assertEqual(self.fetched, ["a_0_4"])
+        self.assertTrue(gold.isdisjoint(self.sampler.matches_collected))
+
+    def test_when_match_qualified_for_routed_group_then_collect_into_its_list(self):
+        self.resolve_participants_in_silver()
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.G12,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+            pipeline_workers=1,
+            route_groups=[TierGroup.S12],
+        )
+        # matches of odd index are not qualified for G12, their median is S12
+        is_g12 = lambda _, puuids: int(puuids[0].rsplit("_", 2)[1]) % 2 == 0
+        with mock.patch.object(
+            MatchSampler,
+            "qualified_matches",
+            lambda _, matches: [is_g12(_, m) for m in matches],
+        ):
+            self.sample(["a"], count_to_collect=2, days=1)
+        silver, _ = self.sampler.match_lists[TierGroup.S12]
+        # S12 takes the matches found until G12 is full
+        self.assertEqual(self.sampler.matches_collected, {"a_0_0", "a_0_2"})
+        self.assertEqual(silver, {"a_0_1"})
+        self.assertTrue(silver <= self.sampler.invalid_matches)
+        with open(f"{self.directory.name}/S12_match_list.txt") as f:
+            self.assertEqual(set(f.read().splitlines()), silver)
+
+    def test_when_routed_group_never_qualifies_then_search_next_day(self):
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.G12,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+            route_groups=[TierGroup.S12],
+        )
+        self.sample([f"user{i}" for i in range(40)], count_to_collect=2, days=3)
+        silver, _ = self.sampler.match_lists[TierGroup.S12]
+        self.assertEqual(len(silver), 0)
+        days = collections.Counter(
+            m.rsplit("_", 2)[1] for m in self.sampler.matches_collected
+        )
+        self.assertEqual(list(days.values()), [2, 2, 2])
+
+    def test_when_server_unavailable_then_search_users_again_after_outage(self):
+        self.resolve_participants_in_silver()
+        self.outage = [
+            CircuitOpenError("circuit is open", retry_after=0.05),
+            requests.HTTPError(response=SimpleNamespace(status_code=503)),
+            requests.ConnectionError(),
+        ]
+        with mock.patch.object(MatchSampler, "OUTAGE_PAUSE", 0.01):
+            self.sample(["a", "b", "c"], count_to_collect=4, days=1)
+        # every user failed to be listed once, and was searched again
+        self.assertEqual(self.outage, [])
+        self.assertEqual(len(self.sampler.matches_collected), 4)
+
+    def test_when_user_searched_through_then_list_after_cursor(self):
+        self.sampler.user_cursor["b"] = 43200
+        self.resolve_participants_in_silver()
+        with mock.patch.object(MatchSampler, "MAX_GAME_PER_USER", 10):
+            self.sample(["a", "b"], count_to_collect=20, days=1)
+            self.assertCountEqual(self.listed, [("a", 0), ("b", 43200)])
+            self.assertEqual(self.sampler.user_cursor, {"a": 86400, "b": 86400})
+
+            self.listed.clear()
+            self.sample(["a", "b"], count_to_collect=20, days=1)
+        self.assertEqual(self.listed, [])
+
+    def test_when_user_stopped_on_quota_then_cursor_kept(self):
+        self.resolve_participants_in_silver()
+        self.sample(["a"], count_to_collect=10, days=1)
+        self.assertEqual(len(self.sampler.matches_collected), 3)
+        # the rest of the window is listed again on the next run
+        self.assertEqual(self.sampler.user_cursor, {})
+
+    def test_when_cursors_not_given_then_list_whole_window(self):
+        self.sampler.user_cursor = None
+        self.resolve_participants_in_silver()
+        self.sample(["a"], count_to_collect=10, days=1)
+        self.listed.clear()
+        self.sample(["a"], count_to_collect=10, days=1)
+        self.assertEqual(self.listed, [("a", 0)])
+
+
+class MatchQualificationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.G12,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+        )
+
+    def participants(self, name: str, ranks: list[tuple[str, str]]) -> list[str]:
+        puuids = []
+        for i, (tier, division) in enumerate(ranks):
+            puuid = f"{name}_{i}"
+            summoner_info = SummonerInfo(puuid, puuid, puuid, tier, division, 0, 50, 50)
+            self.sampler.record_participant(puuid, summoner_info)
+            puuids.append(puuid)
+        return puuids
+
+    def assert_qualified(self, matches: list[list[str]], expected: list[bool]):
+        self.assertEqual(
+            [self.sampler.is_match_qualified(m) for m in matches], expected
+        )
+        # in one batch, with arrays if numpy is installed
+        batch = matches * ParticipantIndex.MIN_ARRAY_BATCH
+        self.assertEqual(
+            self.sampler.qualified_matches(batch),
+            expected * ParticipantIndex.MIN_ARRAY_BATCH,
+        )
+
+    def test_when_median_participants_in_group_then_qualified(self):
+        gold = [("GOLD", "I"), ("GOLD", "II")] * 4
+        qualified = self.participants("a", gold + [("GOLD", "III"), ("PLATINUM", "IV")])
+        low_median = self.participants("c", [("GOLD", "III")] * 6 + gold[:4])
+        self.assert_qualified([qualified, low_median], [True, False])
+
+    def test_when_participant_unranked_then_still_qualified(self):
+        gold = [("GOLD", "I"), ("GOLD", "II")] * 4
+        unranked = self.participants("a", gold + [("", ""), ("PLATINUM", "IV")])
+        self.assert_qualified([unranked], [True])
+
+    def test_when_participant_win_rate_not_valid_then_not_qualified(self):
+        puuids = self.participants("a", [("GOLD", "I")] * 10)
+        self.assert_qualified([puuids], [True])
+        summoner_info = self.sampler.user_dict[puuids[3]]
+        summoner_info.win, summoner_info.lose = 90, 10
+        self.sampler.record_participant(puuids[3], summoner_info)
+        self.assert_qualified([puuids], [False])
+
+
+class AllMatchCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.sampler = MatchSampler(
+            tier_group=TierGroup.A,
+            version="12.23",
+            save_file_directory=self.directory.name,
+            user_dict={},
+            user_validity={},
+            user_cursor={},
+        )
+        self.fetched = []
+        self.failing = set()
+        self.unavailable = set()  # matches failed once by an outage
+        self.outage = []  # errors raised by the next listings
+        patches = [
+            mock.patch.object(MatchSampler, "get_recent_games", self.recent_games),
+            mock.patch.object(APIAccess, "get_match_data", self.match_data),
+            mock.patch.object(
+                MatchValidator,
+                "is_abnormal_match_info",
+                lambda match: match.game_id.endswith("7"),
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def recent_games(self, puuid, count, skip=0, start_time=None, end_time=None):
+        if self.outage:
+            raise self.outage.pop()
+        # every user played in the same 150 matches
+        return [f"KR_{i}" for i in range(skip, min(skip + count, 150))]
+
+    def match_data(self, match_id):
+        self.fetched.append(match_id)
+        if match_id in self.failing:
+            raise requests.HTTPError(response=SimpleNamespace(status_code=404))
+        if match_id in self.unavailable:
+            self.unavailable.discard(match_id)
+            raise requests.ConnectionError()
+        return SimpleNamespace(game_id=match_id)
+
+    def test_when_users_share_matches_then_fetch_and_write_each_once(self):
+        self.sampler._collect_all_matches(0, 1, [f"user{i}" for i in range(6)], 3)
+        self.assertEqual(sorted(self.fetched), sorted(f"KR_{i}" for i in range(150)))
+        abnormal = {f"KR_{i}" for i in range(150) if i % 10 == 7}
+        self.assertEqual(self.sampler.invalid_matches, abnormal)
+        self.assertEqual(len(self.sampler.matches_collected), 150 - len(abnormal))
+        with open(self.sampler.match_output) as f:
+            written = f.read().splitlines()
+        self.assertCountEqual(written, self.sampler.matches_collected)
+
+    def test_when_match_failed_then_try_again_with_another_user(self):
+        self.failing = {"KR_3"}
+        self.sampler._collect_all_matches(0, 1, ["a", "b"], 1)
+        self.assertEqual(self.fetched.count("KR_3"), 2)
+        self.assertNotIn("KR_3", self.sampler.matches_collected)
+        # not listed through, so listed again on the next run
+        self.assertEqual(self.sampler.user_cursor, {})
+
+    def test_when_server_unavailable_then_collect_users_after_outage(self):
+        self.outage = [CircuitOpenError("circuit is open")] * 2
+        with mock.patch.object(MatchSampler, "OUTAGE_PAUSE", 0.01):
+            self.sampler._collect_all_matches(0, 1, ["a", "b"], 1)
+        self.assertEqual(len(self.fetched), 150)
+        self.assertEqual(self.sampler.user_cursor, {"a": 1, "b": 1})
+
+    def test_when_writer_fails_then_stop_workers_and_raise(self):
+        errors = []
+        done = threading.Event()
+
+        def collect():
+            try:
+                users = [f"user{i}" for i in range(6)]
+                self.sampler._collect_all_matches(0, 1, users, 3)
+            except OSError as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        with mock.patch.object(
+            self.sampler.match_writer, "write", side_effect=OSError("disk full")
+        ):
+            threading.Thread(target=collect, daemon=True).start()
+            self.assertTrue(done.wait(5), "workers blocked after the writer failed")
+        self.assertEqual(len(errors), 1)
+
+    def test_when_server_unavailable_for_matches_then_collect_user_again(self):
+        self.unavailable = {"KR_3"}
+        with mock.patch.object(MatchSampler, "OUTAGE_PAUSE", 0.01):
+            self.sampler._collect_all_matches(0, 1, ["a"], 1)
+        self.assertEqual(self.fetched.count("KR_3"), 2)
+        self.assertIn("KR_3", self.sampler.matches_collected)
+        self.assertEqual(self.sampler.user_cursor, {"a": 1})
+
+    def test_when_users_listed_through_then_not_listed_again(self):
+        self.sampler._collect_all_matches(0, 1, ["a", "b"], 2)
+        self.assertEqual(self.sampler.user_cursor, {"a": 1, "b": 1})
+        self.fetched.clear()
+        with mock.patch.object(MatchSampler, "get_recent_games") as get_recent_games:
+            self.sampler._collect_all_matches(0, 1, ["a", "b"], 2)
+        get_recent_games.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+import copy
 import json
 import os
 import unittest
+from typing import Optional
+from unittest import mock
+
+from app.validator import match_validator
 from app.validator.match_validator import MatchValidator
 from api_client.value_object import MatchInfo
 
@@ -63,3 +68,63 @@ class MatchValidatorTest(unittest.TestCase):
             # when abnormal property is removed
             match_info.participants[7]["summoner1Id"] = 12
             self.assertFalse(MatchValidator.is_abnormal_match_info(match_info))
+
+    def abnormal_matches(self) -> tuple[list[MatchInfo], list[Optional[str]]]:
+        """Matches breaking each rule, and the rule broken by each"""
+        with open(
+            os.path.join("test", "data", "match_detail_KR_5889814856.json"),
+            "r",
+            encoding="utf-8",
+        ) as f:
+            match_detail = json.load(f)["info"]
+        normal = MatchInfo(
+            match_detail["gameId"],
+            match_detail["gameVersion"],
+            match_detail["gameCreation"],
+            match_detail["gameDuration"],
+            match_detail["gameEndTimestamp"],
+            match_detail["participants"],
+        )
+        normal.participants[7]["championName"] = "Ahri"
+        normal.participants[7]["summoner1Id"] = 12
+        early = copy.deepcopy(normal)
+        early.duration = 15 * 60
+        smite = copy.deepcopy(normal)
+        smite.participants[7]["summoner1Id"] = MatchValidator.SMITE_ID
+        yuumi = copy.deepcopy(smite)
+        yuumi.participants[7]["championName"] = "Yuumi"
+        deaths = copy.deepcopy(normal)
+        deaths.participants[2]["deaths"] = deaths.duration // 60
+        matches = [normal, early, smite, yuumi, deaths]
+        expected = [
+            None,
+            MatchValidator.EARLY_SURRENDER,
+            MatchValidator.SMITE_POSITION,
+            MatchValidator.YUUMI_NOT_SUPPORT,
+            MatchValidator.DEATHS,
+        ]
+        return matches, expected
+
+    def test_when_many_matches_given_then_find_rule_broken_by_each(self):
+        matches, expected = self.abnormal_matches()
+        self.assertEqual(
+            [MatchValidator.find_abnormal_rule(m) for m in matches], expected
+        )
+        self.assertEqual(
+            [MatchValidator.is_abnormal_match_info(m) for m in matches],
+            [rule is not None for rule in expected],
+        )
+
+    @unittest.skipIf(match_validator.MatchTable is None, "numpy is not installed")
+    def test_when_numpy_installed_then_find_rules_in_match_table(self):
+        matches, expected = self.abnormal_matches()
+        with mock.patch.object(
+            match_validator, "MatchTable", wraps=match_validator.MatchTable
+        ) as table:
+            self.assertEqual(MatchValidator.find_abnormal_rules(matches), expected)
+        table.assert_called_once_with(matches)
+
+    def test_when_numpy_not_installed_then_find_rules_one_by_one(self):
+        matches, expected = self.abnormal_matches()
+        with mock.patch.object(match_validator, "MatchTable", None):
+            self.assertEqual(MatchValidator.find_abnormal_rules(matches), expected)
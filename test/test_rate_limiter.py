@@ -0,0 +1,77 @@
+import unittest
+
+from api_client.rate_limiter import RateLimiter, parse_rate_limits, rate_limit_method
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitHeaderTest(unittest.TestCase):
+    def test_when_header_given_then_return_count_and_seconds(self):
+        self.assertEqual(parse_rate_limits("20:1,100:120"), [(20, 1), (100, 120)])
+        self.assertEqual(parse_rate_limits(None), [])
+
+    def test_when_uri_given_then_variable_segments_are_replaced(self):
+        self.assertEqual(
+            rate_limit_method(
+                "https://asia.api.riotgames.com/lol/match/v5/matches/KR_5889814856"
+            ),
+            "/lol/match/v5/matches/{}",
+        )
+        self.assertEqual(
+            rate_limit_method(
+                "https://kr.api.riotgames.com/lol/league/v4/entries/RANKED_SOLO_5x5/GOLD/I?page=2"
+            ),
+            "/lol/league/v4/entries/{}/{}/{}",
+        )
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(clock=self.clock)
+
+    def test_when_no_limit_known_then_do_not_wait(self):
+        for _ in range(100):
+            self.assertEqual(self.limiter.reserve("key", "/m"), 0)
+
+    def test_when_app_limit_exceeded_then_wait_for_refill(self):
+        self.limiter.set_limits("key", app_limits="2:1")
+        self.assertEqual(self.limiter.reserve("key", "/m"), 0)
+        self.assertEqual(self.limiter.reserve("key", "/m"), 0)
+        self.assertAlmostEqual(self.limiter.reserve("key", "/m"), 0.5)
+        self.assertAlmostEqual(self.limiter.reserve("key", "/m"), 1.0)
+        # other keys are not affected
+        self.assertEqual(self.limiter.reserve("other", "/m"), 0)
+
+    def test_when_headers_given_then_method_limit_and_count_are_applied(self):
+        self.limiter.update_from_headers(
+            "key",
+            "/m",
+            {"X-Method-Rate-Limit": "10:10", "X-Method-Rate-Limit-Count": "10:10"},
+        )
+        self.assertAlmostEqual(self.limiter.reserve("key", "/m"), 1.0)
+        self.assertEqual(self.limiter.reserve("key", "/other"), 0)
+
+    def test_when_retry_after_given_then_block_until_then(self):
+        pause = self.limiter.block(
+            "key", "/m", {"Retry-After": "7", "X-Rate-Limit-Type": "method"}, 10
+        )
+        self.assertEqual(pause, 7)
+        self.assertEqual(self.limiter.reserve("key", "/m"), 7)
+        self.assertEqual(self.limiter.reserve("key", "/other"), 0)
+        self.clock.now = 7
+        self.assertEqual(self.limiter.reserve("key", "/m"), 0)
+
+    def test_when_retry_after_missing_then_block_app_with_default(self):
+        self.assertEqual(self.limiter.block("key", "/m", {}, 10), 10)
+        self.assertEqual(self.limiter.reserve("key", "/other"), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
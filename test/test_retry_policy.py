@@ -0,0 +1,83 @@
+import unittest
+
+from api_client.retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.policy = RetryPolicy(
+            max_attempts=3,
+            base_delay=1,
+            max_delay=5,
+            budget_ratio=0.5,
+            min_budget=2,
+            failure_threshold=3,
+            recovery_time=10,
+            clock=self.clock,
+            random=lambda: 1.0,
+        )
+
+    def test_when_attempt_grows_then_backoff_grows_to_max_delay(self):
+        self.assertEqual(
+            [self.policy.backoff(attempt) for attempt in range(1, 6)],
+            [1, 2, 4, 5, 5],
+        )
+
+    def test_when_status_is_not_retryable_then_do_not_retry(self):
+        self.assertFalse(self.policy.should_retry("host", "/m", 1, 400))
+        self.assertTrue(self.policy.should_retry("host", "/m", 1, 502))
+        self.assertTrue(self.policy.should_retry("host", "/m", 1, None))
+
+    def test_when_max_attempts_reached_then_do_not_retry(self):
+        self.assertFalse(self.policy.should_retry("host", "/m", 3, 502))
+
+    def test_when_budget_is_spent_then_do_not_retry(self):
+        self.assertTrue(self.policy.should_retry("host", "/m", 1, 502))
+        self.assertTrue(self.policy.should_retry("host", "/m", 1, 502))
+        self.assertFalse(self.policy.should_retry("host", "/m", 1, 502))
+        # the budget of other endpoints is separated
+        self.assertTrue(self.policy.should_retry("host", "/other", 1, 502))
+        # requests refill the budget
+        self.policy.before_request("host", "/m")
+        self.policy.before_request("host", "/m")
+        self.assertTrue(self.policy.should_retry("host", "/m", 1, 502))
+
+    def test_when_failures_exceed_threshold_then_circuit_opens_and_recovers(self):
+        for _ in range(3):
+            self.policy.record_failure("host")
+        self.assertEqual(self.policy.circuit_state("host"), CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.policy.before_request("host", "/m")
+        self.assertEqual(raised.exception.retry_after, 10)
+        self.assertFalse(self.policy.should_retry("host", "/m", 1, 502))
+        # other servers are not affected
+        self.policy.before_request("other", "/m")
+
+        self.clock.now = 10
+        self.policy.before_request("host", "/m")  # a probe is let through
+        self.assertRaises(CircuitOpenError, self.policy.before_request, "host", "/m")
+        self.policy.record_success("host")
+        self.assertEqual(self.policy.circuit_state("host"), CircuitBreaker.CLOSED)
+        self.policy.before_request("host", "/m")
+
+    def test_when_probe_fails_then_circuit_opens_again(self):
+        for _ in range(3):
+            self.policy.record_failure("host")
+        self.clock.now = 10
+        self.policy.before_request("host", "/m")
+        self.policy.record_failure("host")
+        self.assertEqual(self.policy.circuit_state("host"), CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenError, self.policy.before_request, "host", "/m")
+
+
+if __name__ == "__main__":
+    unittest.main()
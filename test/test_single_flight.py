@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import unittest
+
+from api_client.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_when_same_key_called_concurrently_then_function_runs_once(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def fetch():
+            calls.append(1)
+            release.wait()
+            return "result"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(single_flight.do("key", fetch))
+            )
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        while single_flight.coalesced < 4:
+            pass
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+        # finished keys run again
+        self.assertEqual(single_flight.do("key", lambda: "new"), "new")
+
+    def test_when_function_fails_then_exception_is_raised(self):
+        single_flight = SingleFlight()
+
+        def fail():
+            raise ValueError("failed")
+
+        self.assertRaises(ValueError, single_flight.do, "key", fail)
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+    def test_when_same_key_awaited_concurrently_then_coroutine_runs_once(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(
+                *[single_flight.do("key", fetch) for _ in range(5)],
+                single_flight.do("other", fetch),
+            )
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 6)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(single_flight.coalesced, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import app  # api_client modules are imported through "app" first
+from api_client.internal_riot_api_client import InternalRiotAPIClient
+from api_client.summoner_cache import SummonerCache
+from api_client.value_object import SummonerInfo
+
+
+def summoner(puuid: str, written_timestamp: float) -> SummonerInfo:
+    return SummonerInfo(
+        puuid, f"id-{puuid}", puuid, "GOLD", "I", 10, 50, 50, written_timestamp
+    )
+
+
+class SummonerCacheTest(unittest.TestCase):
+    def later(self, seconds: float):
+        now = time.time() + seconds
+        return mock.patch("api_client.summoner_cache.time.time", return_value=now)
+
+    def test_when_update_criteria_given_then_written_time_is_compared(self):
+        cache = SummonerCache(max_entries=10, ttl=60)
+        now = time.time()
+        cache.put(summoner("a", now - 100))
+        self.assertEqual(cache.get("a", update_criteria=now - 200).puuid, "a")
+        self.assertIsNone(cache.get("a", update_criteria=now - 50))
+        # without update criteria, entries cached longer than ttl are outdated
+        self.assertEqual(cache.get("a").puuid, "a")
+        with self.later(61):
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get("a", update_criteria=now - 200).puuid, "a")
+
+    def test_when_max_entries_exceeded_then_least_recently_used_is_evicted(self):
+        cache = SummonerCache(max_entries=2, ttl=60)
+        now = time.time()
+        cache.put(summoner("a", now))
+        cache.put(summoner("b", now))
+        cache.get("a")
+        cache.put(summoner("c", now))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_when_path_given_then_entries_are_kept_across_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "summoner.sqlite3")
+            now = time.time()
+            cache = SummonerCache(max_entries=10, ttl=60, path=path)
+            cache.put(summoner("a", now - 100))
+            with self.later(-100):
+                cache.put(summoner("old", now))
+            cache.close()
+
+            cache = SummonerCache(max_entries=10, ttl=60, path=path)
+            self.assertEqual(cache.get("a"), summoner("a", now - 100))
+            self.assertIsNone(cache.get("old", update_criteria=0))
+            cache.close()
+
+    def test_when_put_then_write_in_groups(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "summoner.sqlite3")
+            cache = SummonerCache(max_entries=2, ttl=60, path=path)
+            self.addCleanup(cache.close)
+            count = lambda: cache.conn.execute(
+                "SELECT COUNT(*) FROM summoners"
+            ).fetchone()[0]
+            with mock.patch.object(SummonerCache, "MAX_PENDING", 3):
+                for puuid in "abc":
+                    cache.put(summoner(puuid, time.time()))
+                    if puuid == "b":
+                        self.assertEqual(count(), 0)
+            self.assertEqual(count(), 3)
+            for puuid in "def":
+                cache.put(summoner(puuid, time.time()))
+            # evicted from memory, but not written yet
+            self.assertNotIn("d", cache._entries)
+            self.assertEqual(cache.get("d").puuid, "d")
+            cache.flush()
+            self.assertEqual(count(), 6)
+
+    def test_when_client_caches_summoner_then_later_lookup_hits(self):
+        client = InternalRiotAPIClient("KR")
+        client.summoner_cache = SummonerCache(max_entries=10, ttl=60)
+        client.cache_summoner(summoner("a", time.time()))
+        client.cache_summoner(summoner("", time.time()))  # puuid not resolved
+        self.assertEqual(client.summoner_cache.get("a").puuid, "a")
+        self.assertEqual(len(client.summoner_cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
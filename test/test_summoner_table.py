@@ -0,0 +1,45 @@
+import unittest
+
+from api_client.summoner_table import SummonerTable
+from api_client.value_object import SummonerInfo, TierGroup
+
+
+def summoner(puuid: str, tier: str = "GOLD", division: str = "II") -> SummonerInfo:
+    return SummonerInfo(puuid, f"id-{puuid}", puuid, tier, division, 10, 20, 30, 1.5)
+
+
+class SummonerInfoTest(unittest.TestCase):
+    def test_when_created_then_compute_rank_without_instance_dict(self):
+        info = summoner("a")
+        self.assertFalse(hasattr(info, "__dict__"))
+        self.assertEqual(info.rank_number, 15)
+        self.assertEqual(info.tier_group, TierGroup.G12)
+        self.assertIs(info.tier, summoner("b", "".join("GOLD")).tier)
+        self.assertEqual(SummonerInfo.from_dict(info.to_dict()), info)
+
+
+class SummonerTableTest(unittest.TestCase):
+    def test_when_summoners_set_then_get_equal_summoners(self):
+        table = SummonerTable([summoner("a"), summoner("b", "MASTER", "I")])
+        table["a"] = summoner("a", "SILVER", "IV")
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table["a"], summoner("a", "SILVER", "IV"))
+        self.assertEqual(table["b"], summoner("b", "MASTER", "I"))
+        self.assertEqual(table.rank_number("b"), 25)
+        self.assertNotIn("c", table)
+
+    def test_when_deleted_then_keep_other_rows(self):
+        table = SummonerTable(summoner(p) for p in "abc")
+        del table["a"]
+        self.assertEqual(list(table), ["c", "b"])
+        self.assertEqual(table["c"], summoner("c"))
+        self.assertRaises(KeyError, table.__getitem__, "a")
+
+    def test_when_loaded_from_dicts_then_equal_to_summoners(self):
+        summoners = [summoner("a"), summoner("b", "", ""), summoner("a", "IRON", "I")]
+        table = SummonerTable.from_dicts(s.to_dict() for s in summoners)
+        self.assertEqual(dict(table), {"a": summoners[2], "b": summoners[1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import unittest
+from unittest import mock
+
+from app.collector.tier_group import TierGroup
+from app.collector.tier_scheduler import TierScheduler
+from app.sampler.match_sampler import MatchSampler
+
+
+class FakeCollector:
+    def __init__(self, tier_group, pipeline_workers=None):
+        self.tier_group = tier_group
+        self.pipeline_workers = pipeline_workers
+
+
+class TierSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch("app.collector.tier_scheduler.MatchCollector", FakeCollector)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_when_tiers_added_then_collect_concurrently(self):
+        tiers = [TierGroup.G12, TierGroup.G34, TierGroup.A]
+        barrier = threading.Barrier(len(tiers), timeout=5)
+        scheduler = TierScheduler(max_parallel=len(tiers))
+        for tier_group in tiers:
+            # every tier waits for the others, so they must run at the same time
+            scheduler.add(tier_group, lambda collector: barrier.wait())
+        self.assertEqual(scheduler.run(), {tier: None for tier in tiers})
+
+    def test_when_parallel_limited_then_start_higher_priority_first(self):
+        started = []
+        scheduler = TierScheduler(max_parallel=1)
+        collect = lambda collector: started.append(collector.tier_group)
+        scheduler.add(TierGroup.G12, collect)
+        scheduler.add(TierGroup.G34, collect)
+        scheduler.add(TierGroup.A, collect, priority=1)
+        scheduler.run()
+        self.assertEqual(started, [TierGroup.A, TierGroup.G12, TierGroup.G34])
+
+    def test_when_tier_fails_then_others_complete(self):
+        error = RuntimeError("failed")
+        done = []
+
+        def fail(collector):
+            raise error
+
+        scheduler = TierScheduler(max_parallel=2)
+        scheduler.add(TierGroup.G12, fail)
+        scheduler.add(TierGroup.G34, lambda collector: done.append(collector))
+        results = scheduler.run()
+        self.assertIs(results[TierGroup.G12], error)
+        self.assertIsNone(results[TierGroup.G34])
+        self.assertEqual(len(done), 1)
+
+    def test_when_tier_added_twice_then_raise(self):
+        scheduler = TierScheduler(max_parallel=2)
+        scheduler.add(TierGroup.G12, lambda collector: None)
+        with self.assertRaises(ValueError):
+            scheduler.add(TierGroup.G12, lambda collector: None, priority=1)
+        self.assertEqual(len(scheduler.jobs), 1)
+
+    def test_when_weight_given_then_scale_pipeline_workers(self):
+        workers = {}
+        scheduler = TierScheduler(max_parallel=2)
+        record = lambda c: workers.update({c.tier_group: c.pipeline_workers})
+        scheduler.add(TierGroup.G12, record)
+        scheduler.add(TierGroup.G34, record, weight=0.5)
+        scheduler.run()
+        self.assertEqual(workers[TierGroup.G12], MatchSampler.PIPELINE_WORKERS)
+        self.assertEqual(workers[TierGroup.G34], MatchSampler.PIPELINE_WORKERS // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from app import APIAccess
+from app.sampler.user_sampler import UserSampler
+
+
+def league_pages(pages: dict):
+    requested = []
+
+    def get_summoners_in_tier(tier, division, page=1):
+        requested.append(page)
+        return [{"summonerId": s} for s in pages.get(page, [])]
+
+    return get_summoners_in_tier, requested
+
+
+class UserListPagerTest(unittest.TestCase):
+    def test_when_entries_duplicated_then_yield_each_once(self):
+        get_page, _ = league_pages({1: ["a", "b"], 2: ["b", "c"], 3: ["d"]})
+        with mock.patch.object(APIAccess, "get_summoners_in_tier", get_page):
+            users = UserSampler.get_user_list("GOLD", "I", 4)
+        self.assertEqual([u["summonerId"] for u in users], ["a", "b", "c", "d"])
+
+    def test_when_empty_page_given_then_stop_paging(self):
+        get_page, requested = league_pages({1: ["a", "b"]})
+        with mock.patch.object(APIAccess, "get_summoners_in_tier", get_page):
+            users = UserSampler.get_user_list("GOLD", "I", 10)
+        self.assertEqual([u["summonerId"] for u in users], ["a", "b"])
+        self.assertEqual(sorted(requested), [1, 2])
+
+    def test_when_user_count_met_then_stop_fetching_more_pages(self):
+        pages = {page: [f"{page}-{i}" for i in range(3)] for page in range(1, 100)}
+        get_page, requested = league_pages(pages)
+        with mock.patch.object(APIAccess, "get_summoners_in_tier", get_page):
+            users = UserSampler.get_user_list("GOLD", "I", 5)
+        self.assertEqual(len(users), 5)
+        # only the page after the last one consumed may have been prefetched
+        self.assertLessEqual(max(requested), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import heapq
+import unittest
+
+from api_client.value_object import SummonerInfo
+from app.collector.tier_group import TierGroup
+from app.sampler.user_scheduler import UserScheduler, UserYield
+
+DAY = 24 * 60 * 60
+
+
+class UserSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.user_dict = {
+            p: SummonerInfo(p, p, p, tier, division)
+            for p, tier, division in (
+                ("gold", "GOLD", "I"),
+                ("gold2", "GOLD", "II"),
+                ("plat", "PLATINUM", "IV"),
+                ("iron", "IRON", "I"),
+            )
+        }
+        self.user_yield = {}
+        self.scheduler = UserScheduler([TierGroup.G12], self.user_dict, self.user_yield)
+
+    def order(self, users: list[str], now: float = 0) -> list[str]:
+        heap = [(self.scheduler.priority(p, now), p) for p in users]
+        heapq.heapify(heap)
+        return [heapq.heappop(heap)[1] for _ in users]
+
+    def test_when_ranks_differ_then_search_users_close_to_group_first(self):
+        self.assertEqual(self.order(["iron", "plat", "gold"]), ["gold", "plat", "iron"])
+        self.assertEqual(self.scheduler.proximity("unknown"), UserScheduler.FAR)
+
+    def test_when_searched_then_search_users_of_higher_yield_first(self):
+        self.scheduler.record_search("gold", calls=20, collected=0, active_at=DAY)
+        self.scheduler.record_search("gold2", calls=10, collected=3, active_at=DAY)
+        self.scheduler.record_search("gold2", calls=10, collected=1)
+        self.assertEqual(self.user_yield["gold2"], UserYield(20, 4, DAY))
+        self.assertEqual(self.order(["gold", "gold2"], now=DAY), ["gold2", "gold"])
+
+    def test_when_user_idle_then_decay_its_score(self):
+        self.scheduler.record_search("gold", calls=6, collected=3, active_at=DAY)
+        self.scheduler.record_search("gold2", calls=6, collected=3, active_at=DAY * 15)
+        now = DAY * 15
+        self.assertAlmostEqual(
+            self.scheduler.score("gold", now) * 4, self.scheduler.score("gold2", now)
+        )
+        self.assertEqual(self.order(["gold", "gold2"], now), ["gold2", "gold"])
+
+
+if __name__ == "__main__":
+    unittest.main()
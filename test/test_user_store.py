@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from api_client.value_object import SummonerInfo
+from app.sampler.user_scheduler import UserYield
+from app.sampler.user_store import ChangeTrackingDict, UserStore
+
+
+class UserStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = self.open_store()
+
+    def open_store(self) -> UserStore:
+        store = UserStore(self.directory.name, "G12")
+        self.addCleanup(store.close)
+        return store
+
+    def summoner(self, puuid: str, win: int = 10) -> SummonerInfo:
+        return SummonerInfo(puuid, f"id-{puuid}", puuid, "GOLD", "I", 10, win, 10, 1.0)
+
+    def test_when_saved_then_load_in_another_store(self):
+        user_dict = self.store.load_summoners()
+        user_dict["a"] = self.summoner("a")
+        self.store.save_summoners(user_dict)
+        self.store.save_validity({"a": True})
+        self.store.save_records({"a": 2})
+        self.store.save_cursors({"a": 1669647600.0})
+        self.store.save_yields({"a": UserYield(12, 2, 1669647600.0)})
+
+        store = self.open_store()
+        self.assertEqual(store.load_summoners(), {"a": self.summoner("a")})
+        self.assertEqual(store.load_validity(), {"a": True})
+        self.assertEqual(store.load_records(), {"a": 2})
+        self.assertEqual(store.load_cursors(), {"a": 1669647600.0})
+        self.assertEqual(store.load_yields(), {"a": UserYield(12, 2, 1669647600.0)})
+        self.assertEqual(store.get_summoner("a"), self.summoner("a"))
+        self.assertIsNone(store.get_summoner("b"))
+
+    def test_when_summoners_loaded_then_read_each_when_used(self):
+        self.store.save_summoners({p: self.summoner(p) for p in ("a", "b", "c")})
+        store = self.open_store()
+        with mock.patch.object(
+            SummonerInfo, "from_dict", wraps=SummonerInfo.from_dict
+        ) as from_dict:
+            user_dict = store.load_summoners()
+            self.assertEqual(len(user_dict), 3)
+            self.assertIn("b", user_dict)
+            from_dict.assert_not_called()
+            self.assertEqual(user_dict["b"], self.summoner("b"))
+            self.assertEqual(user_dict.get("b"), self.summoner("b"))
+            self.assertEqual(from_dict.call_count, 1)
+        self.assertEqual(user_dict.changed, set())
+
+        user_dict["d"] = self.summoner("d")
+        store.save_summoners(user_dict)
+        self.assertEqual(user_dict.changed, set())
+        self.assertEqual(len(self.open_store().load_summoners()), 4)
+
+    def test_when_saved_then_write_only_changed_entries(self):
+        records = self.store.load_records()
+        records.update({"a": 1, "b": 1})
+        self.store.save_records(records)
+        self.assertEqual(records.changed, set())
+
+        records["b"] += 1
+        self.assertEqual(records.changed, {"b"})
+        # an entry written by someone else is kept since 'a' did not change
+        self.store.save_records({"a": 5})
+        self.store.save_records(records)
+        self.assertEqual(self.open_store().load_records(), {"a": 5, "b": 2})
+
+    def test_when_legacy_files_exist_then_import_them(self):
+        for name, entries in (
+            ("user_list", {"a": self.summoner("a").to_dict()}),
+            ("user_validity", {"a": False}),
+            ("user_record", {"a": 3}),
+        ):
+            path = os.path.join(self.directory.name, f"G12_{name}.txt")
+            with open(path, "w") as f:
+                json.dump(entries, f)
+        self.assertEqual(self.store.load_summoners(), {"a": self.summoner("a")})
+        self.assertEqual(self.store.load_validity(), {"a": False})
+        self.assertEqual(self.store.load_records(), {"a": 3})
+        self.assertIsInstance(self.store.load_records(), ChangeTrackingDict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,10 @@ class UtilsInitTest(unittest.TestCase):
         self.assertEqual(utils.rank_to_number("GOLD", "III"), 14)
         self.assertEqual(utils.rank_to_number("GOLD", "IV"), 13)
 
+    def test_when_iterable_given_then_yield_chunks_of_size(self):
+        self.assertEqual(list(utils.iter_chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(utils.iter_chunks([], 2)), [])
+
 
 class TierGroupTest(unittest.TestCase):
     def test_when_input_valid_data_given_then_return_valid_rank(self):
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+import utils
+from utils.worker_pool import WorkerPool
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(2, thread_name_prefix="test-pool")
+        self.addCleanup(self.pool.shutdown)
+
+    def test_when_run_multithread_called_repeatedly_then_reuse_threads(self):
+        threads = set()
+        for _ in range(5):
+            results = []
+            utils.run_multithread(
+                lambda x: (x * 2, threading.current_thread().name),
+                list(range(10)),
+                results.append,
+                pool=self.pool,
+            )
+            self.assertEqual(sorted(r[0] for r in results), list(range(0, 20, 2)))
+            threads.update(r[1] for r in results)
+        self.assertLessEqual(len(threads), 2)
+        self.assertEqual(self.pool.to_dict()["completed"], 50)
+
+    def test_when_workers_busy_then_count_queued_tasks(self):
+        release = threading.Event()
+        futures = [self.pool.submit(release.wait) for _ in range(5)]
+        while self.pool.to_dict()["active"] < 2:
+            time.sleep(0.01)
+        self.assertEqual(self.pool.to_dict()["queued"], 3)
+        futures[-1].cancel()
+        self.assertEqual(self.pool.to_dict()["queued"], 2)
+        release.set()
+        for future in futures[:-1]:
+            future.result()
+        self.assertEqual(
+            self.pool.to_dict(),
+            {"workers": 2, "queued": 0, "active": 0, "completed": 4},
+        )
+
+    def test_when_submitted_from_worker_then_run_in_the_worker(self):
+        def nested(x):
+            return sorted(self.pool.imap_unordered(lambda y: x + y, range(3)))
+
+        # would wait forever if nested tasks waited for a free worker
+        results = sorted(self.pool.imap_unordered(nested, range(4)))
+        self.assertEqual(results, [[x, x + 1, x + 2] for x in range(4)])
+
+    def test_when_iterable_is_long_then_submit_bounded_items_ahead(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        results = self.pool.imap_unordered(lambda x: x, items(), max_pending=3)
+        next(results)
+        self.assertLessEqual(len(consumed), 4)
+        results.close()
+
+    def test_when_shutdown_then_start_again_on_next_submission(self):
+        self.assertEqual(self.pool.submit(lambda: 1).result(), 1)
+        self.pool.shutdown()
+        self.assertEqual(self.pool.submit(lambda: 2).result(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
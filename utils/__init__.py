@@ -1,7 +1,9 @@
-import multiprocessing
-from multiprocessing.pool import ThreadPool
+import itertools
 from tqdm import tqdm
 
+from api_client import rank_table
+from utils.worker_pool import WorkerPool, shared_worker_pool
+
 
 def write_text(path: str, content: str, command: str):
     with open(path, command, encoding="utf-8") as f_out:
@@ -10,59 +12,36 @@ def write_text(path: str, content: str, command: str):
 
 
 def rank_to_number(tier: str, division: str) -> int:
-    if division == "" and tier == "":
-        return 0
-    if division == "I":
-        index = 0
-    elif division == "II":
-        index = -1
-    elif division == "III":
-        index = -2
-    elif division == "IV":
-        index = -3
-    else:
-        raise ValueError(f"Division is not valid: {division}")
-
-    if tier == "IRON":
-        index += 4 * 1
-    elif tier == "BRONZE":
-        index += 4 * 2
-    elif tier == "SILVER":
-        index += 4 * 3
-    elif tier == "GOLD":
-        index += 4 * 4
-    elif tier == "PLATINUM":
-        index += 4 * 5
-    elif tier == "DIAMOND":
-        index += 4 * 6
-    elif tier == "MASTER":
-        index += 4 * 6 + 1
-    elif tier == "GRANDMASTER":
-        index += 4 * 6 + 2
-    elif tier == "CHALLENGER":
-        index += 4 * 6 + 3
-    else:
-        raise ValueError(f"Tier is not valid: {tier}")
-    return index
-
-
-def run_multithread(func, iter, update=lambda x: None, use_tqdm=False, tqdm_decs=""):
+    """Raise ValueError for an unknown tier or division"""
+    return rank_table.rank_to_number(tier, division, strict=True)
+
+
+def iter_chunks(iterable, size: int):
+    """Yield lists of 'size' items from an iterable, the last one may be shorter"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_multithread(
+    func,
+    iter,
+    update=lambda x: None,
+    use_tqdm=False,
+    tqdm_decs="",
+    pool: WorkerPool = None,
+):
     """Apply a function to an iterable and update the results with
     an update function through multi-thread
-    """
-    cpu_count = multiprocessing.cpu_count()
-    MAX_THREAD = 8
-
-    with ThreadPool(min(cpu_count, MAX_THREAD)) as pool:
-        if use_tqdm:
-            item_count = len(iter)
-            for result in tqdm(
-                pool.imap_unordered(func, iter),
-                total=item_count,
-                desc=tqdm_decs,
-            ):
-                update(result)
 
-        else:
-            for result in pool.imap_unordered(func, iter):
-                update(result)
+    The work is submitted to the shared worker pool unless a pool is given.
+    """
+    pool = pool or shared_worker_pool
+    results = pool.imap_unordered(func, iter)
+    if use_tqdm:
+        results = tqdm(results, total=len(iter), desc=tqdm_decs)
+    for result in results:
+        update(result)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+
+
+class BufferedLineWriter:
+    """Append lines to a file in groups instead of opening the file per line.
+
+    Buffered lines are written when 'max_lines' are gathered or 'max_delay'
+    seconds after the first of them, and on close, which also runs at exit.
+    The file is kept open between writes. 'fsync' decides when written lines are
+    forced to the disk: NEVER, ON_FLUSH (every group) or ON_CLOSE.
+    """
+
+    NEVER = "never"
+    ON_FLUSH = "flush"
+    ON_CLOSE = "close"
+
+    def __init__(
+        self,
+        path: str,
+        max_lines: int = 256,
+        max_delay: float = 1.0,
+        fsync: str = ON_CLOSE,
+    ):
+        if fsync not in (self.NEVER, self.ON_FLUSH, self.ON_CLOSE):
+            raise ValueError(f"fsync policy is not valid: {fsync}")
+        self.path = path
+        self.max_lines = max_lines
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.flushes = 0  # groups written
+        self._lock = threading.Lock()
+        self._buffer: list[str] = []
+        self._file = None
+        self._timer: threading.Timer = None
+
+    def write(self, line: str):
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.max_lines:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            atexit.register(self.close)
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        if self.fsync == self.ON_FLUSH:
+            os.fsync(self._file.fileno())
+        self._buffer.clear()
+        self.flushes += 1
+
+    def close(self):
+        """Write the buffered lines and close the file, which is opened again
+        on the next write"""
+        with self._lock:
+            self._flush()
+            if self._file is None:
+                return
+            if self.fsync != self.NEVER:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            atexit.unregister(self.close)
+
+    def __enter__(self) -> BufferedLineWriter:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
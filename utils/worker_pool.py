@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+
+class WorkerPool:
+    """Long-lived thread pool for I/O bound work, shared by every sampler.
+
+    Threads are started on first use and reused by every call until shutdown,
+    after which the pool starts again on the next submission. Tasks submitted
+    from a worker of the pool are run in the worker, so that nested calls can not
+    wait for a slot held by their own caller.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "worker-pool"):
+        self.max_workers = max_workers  # may be changed before the pool starts
+        self.thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor: ThreadPoolExecutor = None
+        self.queued = 0  # submitted but not started
+        self.active = 0
+        self.completed = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix=self.thread_name_prefix
+                    )
+        return self._executor
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, "in_worker", False)
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        if self.in_worker():
+            future = Future()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            self.queued += 1
+        try:
+            future = self.executor.submit(self._run, func, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._forget_cancelled)
+        return future
+
+    def _run(self, func: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        self._local.in_worker = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._local.in_worker = False
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _forget_cancelled(self, future: Future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def imap_unordered(
+        self, func: Callable, iterable: Iterable, max_pending: int = None
+    ):
+        """Yield func(item) of each item in the order of completion.
+
+        At most 'max_pending' items, twice the workers by default, are submitted
+        ahead, so a long iterable is not queued at once.
+        """
+        if self.in_worker():
+            yield from map(func, iterable)
+            return
+        max_pending = max_pending or self.max_workers * 2
+        pending = set()
+        try:
+            for item in iterable:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(self.submit(func, item))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+            }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop the threads after running tasks, and queued ones unless cancelled"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+# shared by every sampler in a process, resized from settings in "app"
+shared_worker_pool = WorkerPool(64)